@@ -0,0 +1,266 @@
+import asyncio
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from catalog import OPTIMIZE_METRICS, best_marketplace, normalize_catalog
+from pricing import calculate_amazon, calculate_mercado_livre, calculate_shopee
+from pricing_batch import BATCH_DEFAULTS, BATCH_PARAMS, BATCH_TEXT_PARAMS, price_batch
+
+
+# ─────────────────────────────────────────────────────────────
+# PRICING API
+# ─────────────────────────────────────────────────────────────
+# Run with: uvicorn api:app --host 0.0.0.0 --port 8000 [--workers N]
+CALCULATORS = {
+    "mercado_livre": calculate_mercado_livre,
+    "amazon": calculate_amazon,
+    "shopee": calculate_shopee,
+}
+
+# Inputs a request may leave out, as in the catalog tab
+API_DEFAULTS = {
+    "category": "Outros",
+    "extra_cost": 0.0,
+    "shipping_cost": 0.0,
+    "weight_g": 0.0,
+    "tax_pct": 0.0,
+    "fixed_expenses_per_unit": 0.0,
+    "desired_margin_pct": 0.0,
+    "other_pct": 0.0,
+}
+
+# Pool processes for batch requests (API_WORKERS=0 prices them in a thread instead)
+API_WORKERS = int(os.environ.get("API_WORKERS", str(os.cpu_count() or 1)))
+# Batches up to this many items skip the pool: pickling would cost more than pricing
+API_INLINE_ITEMS = 2000
+API_CHUNK_ITEMS = 10_000
+API_MAX_ITEMS = 200_000
+# Bodies larger than this are parsed in a thread instead of on the event loop
+API_INLINE_BODY_BYTES = 64 * 1024
+
+
+class APIError(Exception):
+    """Error answered as {"error": message} with an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        # Both in args so the error survives the trip back from a pool process
+        super().__init__(status, message)
+        self.status = status
+        self.message = message
+
+
+def _finite(records: list) -> list:
+    # JSON has no NaN/inf; report them as null
+    for record in records:
+        for key, value in record.items():
+            if isinstance(value, float) and not math.isfinite(value):
+                record[key] = None
+    return records
+
+
+def _records(df: pd.DataFrame) -> list:
+    """Rows of `df` as dicts of plain Python values; much faster than to_dict(orient="records")."""
+    columns = list(df.columns)
+    rows = zip(*(df[c].to_numpy().tolist() for c in columns))
+    return _finite([dict(zip(columns, row)) for row in rows])
+
+
+def _encode(records: list) -> str:
+    """JSON array of `records` without its brackets, so chunks can be joined with commas."""
+    return json.dumps(records, ensure_ascii=False, allow_nan=False, separators=(",", ":"))[1:-1]
+
+
+def _check_fields(platform: str, fields, label: str, extra=()) -> None:
+    """422 for any of `fields` that calculate_* for `platform` does not take."""
+    unknown = set(fields) - set(BATCH_PARAMS[platform]) - set(extra)
+    if unknown:
+        raise APIError(422, f"Unknown {label} for {platform}: {sorted(unknown)}")
+
+
+def _null_error(field: str) -> APIError:
+    return APIError(422, f"'{field}' must be given and not null.")
+
+
+def price_one(platform: str, item: dict) -> dict:
+    """calculate_* for a single SKU, with API_DEFAULTS for omitted inputs.
+
+    A null input counts as omitted when it has a default; a null option or
+    category, or a null input without a default, is a 422.
+    """
+    params = BATCH_PARAMS[platform]
+    _check_fields(platform, item, "fields", extra={"sku"})
+    kwargs = {p: API_DEFAULTS[p] for p in params if p in API_DEFAULTS}
+    for key, value in item.items():
+        if key == "sku":
+            continue
+        if value is None:
+            if key in BATCH_TEXT_PARAMS or key not in {**BATCH_DEFAULTS, **API_DEFAULTS}:
+                raise _null_error(key)
+            continue
+        kwargs[key] = value
+    try:
+        result = CALCULATORS[platform](**kwargs)
+    except TypeError as e:
+        raise APIError(422, str(e)) from None
+    except KeyError as e:
+        raise APIError(422, f"Unknown option or category: {e}") from None
+    if "sku" in item:
+        result = {"sku": item["sku"], **result}
+    return _finite([result])[0]
+
+
+def price_items(platform: str, items: list, defaults: dict) -> list:
+    """price_batch over a list of SKU dicts; rows match calculate_* exactly.
+
+    Nulls follow price_one, so an item prices the same alone or in a batch.
+    """
+    frame = pd.DataFrame.from_records(items)
+    _check_fields(platform, frame.columns, "fields", extra={"sku"})
+    _check_fields(platform, defaults, "defaults")
+    constants = {**API_DEFAULTS, **defaults}
+    fill = {**BATCH_DEFAULTS, **constants}
+    for column in frame.columns.drop("sku", errors="ignore"):
+        if not frame[column].isna().any():
+            continue
+        # A column that is missing for some rows falls back to the default;
+        # an explicit null option or category is never priced as another one
+        if column not in fill or (column in BATCH_TEXT_PARAMS and any(item.get(column, "") is None for item in items)):
+            raise _null_error(column)
+        frame[column] = frame[column].fillna(fill[column])
+    try:
+        priced = price_batch(frame, platform, **constants)
+    except KeyError as e:
+        raise APIError(422, f"Missing input or unknown option/category: {e}") from None
+    except (TypeError, ValueError) as e:
+        raise APIError(422, str(e)) from None
+    if "sku" in frame.columns:
+        priced.insert(0, "sku", frame["sku"].to_numpy())
+    return _records(priced)
+
+
+async def _read_json(request) -> dict:
+    raw = await request.body()
+    try:
+        body = json.loads(raw) if len(raw) <= API_INLINE_BODY_BYTES else await asyncio.to_thread(json.loads, raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise APIError(400, "Request body must be JSON.") from None
+    if not isinstance(body, dict):
+        raise APIError(400, "Request body must be a JSON object.")
+    return body
+
+
+def _batch_items(body: dict) -> list:
+    items = body.get("items")
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise APIError(422, "'items' must be a list of objects.")
+    if len(items) > API_MAX_ITEMS:
+        raise APIError(413, f"At most {API_MAX_ITEMS:,} items per request.")
+    return items
+
+
+async def run_batch(request, func, items: list, *args) -> Response:
+    """{"count", "results"} response of func(items_chunk, *args), computed off the event loop.
+
+    Large batches are split across the process pool. Each chunk comes
+    back already JSON-encoded, so neither the records nor their encoding
+    touch the event loop.
+    """
+    pool = request.app.state.pool
+    loop = asyncio.get_running_loop()
+    if pool is None or len(items) <= API_INLINE_ITEMS:
+        parts = [await asyncio.to_thread(func, items, *args)]
+    else:
+        chunks = [items[i:i + API_CHUNK_ITEMS] for i in range(0, len(items), API_CHUNK_ITEMS)]
+        parts = await asyncio.gather(*(loop.run_in_executor(pool, func, chunk, *args) for chunk in chunks))
+    body = '{"count":%d,"results":[%s]}' % (len(items), ",".join(part for part in parts if part))
+    return Response(body, media_type="application/json")
+
+
+def _price_chunk(items: list, platform: str, defaults: dict) -> str:
+    return _encode(price_items(platform, items, defaults))
+
+
+def _best_chunk(items: list, metric: str, options: dict) -> str:
+    catalog = normalize_catalog(pd.DataFrame.from_records(items))
+    return _encode(_records(best_marketplace(catalog, metric, **options)))
+
+
+async def health(request):
+    return JSONResponse({"status": "ok", "workers": API_WORKERS, "platforms": sorted(CALCULATORS)})
+
+
+async def price(request):
+    """POST /v1/price/{platform}: one SKU object, or {"items": [...], "defaults": {...}}."""
+    platform = request.path_params["platform"]
+    if platform not in CALCULATORS:
+        raise APIError(404, f"Unknown platform {platform!r}. Use one of {sorted(CALCULATORS)}.")
+    body = await _read_json(request)
+    if "items" not in body:
+        return JSONResponse(price_one(platform, body))
+
+    items = _batch_items(body)
+    defaults = body.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise APIError(422, "'defaults' must be an object.")
+    _check_fields(platform, defaults, "defaults")
+    if not items:
+        return JSONResponse({"count": 0, "results": []})
+    return await run_batch(request, _price_chunk, items, platform, defaults)
+
+
+async def best(request):
+    """POST /v1/best: {"items": [...], "metric": "price"|"profit"|"margin"|"roi", "options": {...}}.
+
+    "price" (the default) ranks by the lowest price reaching each item's
+    desired margin; the others compare channels at each item's sale_price.
+    """
+    body = await _read_json(request)
+    items = _batch_items(body)
+    metric = body.get("metric", "price")
+    if metric not in OPTIMIZE_METRICS:
+        raise APIError(422, f"Unknown metric {metric!r}. Use one of {sorted(OPTIMIZE_METRICS)}.")
+    options = body.get("options") or {}
+    if not isinstance(options, dict):
+        raise APIError(422, "'options' must be an object.")
+    unknown = set(options) - {"shopee_seller_type", "fixed_expenses_per_unit", "other_pct"}
+    if unknown:
+        raise APIError(422, f"Unknown options: {sorted(unknown)}")
+    if not items:
+        return JSONResponse({"count": 0, "results": []})
+    try:
+        return await run_batch(request, _best_chunk, items, metric, options)
+    except (KeyError, ValueError) as e:
+        raise APIError(422, str(e)) from None
+
+
+async def api_error(request, exc: APIError):
+    return JSONResponse({"error": exc.message}, status_code=exc.status)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    app.state.pool = ProcessPoolExecutor(API_WORKERS) if API_WORKERS > 0 else None
+    try:
+        yield
+    finally:
+        if app.state.pool is not None:
+            app.state.pool.shutdown(cancel_futures=True)
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health),
+        Route("/v1/price/{platform}", price, methods=["POST"]),
+        Route("/v1/best", best, methods=["POST"]),
+    ],
+    exception_handlers={APIError: api_error},
+    lifespan=lifespan,
+)
@@ -1,639 +1,41 @@
-import math
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 import time
 
+import io
 import os
-import pdfplumber
 import re
-import duckduckgo_search
-try:
-    from duckduckgo_search import DDGS
-except ImportError:
-    DDGS = None
-
-import google.generativeai as genai
-
-# ─────────────────────────────────────────────────────────────
-# PAGE CONFIG
-# ─────────────────────────────────────────────────────────────
-st.set_page_config(
-    page_title="Calculadora de Lucro | Marketplace",
-    page_icon="💰",
-    layout="wide",
-    initial_sidebar_state="collapsed",
+import uuid
+
+from cache import DataFrameCache, SharedCache, content_key
+from catalog import (
+    MARKETPLACES as CATALOG_MARKETPLACES,
+    OPTIMIZE_METRICS,
+    best_marketplace,
+    catalog_template,
+    normalize_catalog,
+    page_of,
+    price_catalog,
+    read_catalog,
 )
-
-if "saved_simulations" not in st.session_state:
-    st.session_state["saved_simulations"] = []
-
-
-# ─────────────────────────────────────────────────────────────
-# MARKETPLACE FEE DATA
-# ─────────────────────────────────────────────────────────────
-MERCADO_LIVRE = {
-    "name": "Mercado Livre",
-    "icon": "🟡",
-    "ad_types": {
-        "Clássico": {
-            "Acessórios para Veículos": 13.0,
-            "Alimentos e Bebidas": 12.0,
-            "Bebês": 14.0,
-            "Beleza e Cuidado Pessoal": 14.0,
-            "Brinquedos e Hobbies": 14.0,
-            "Calçados, Roupas e Bolsas": 14.0,
-            "Casa, Móveis e Decoração": 13.0,
-            "Celulares e Telefones": 12.0,
-            "Eletrodomésticos": 11.0,
-            "Eletrônicos, Áudio e Vídeo": 12.0,
-            "Esportes e Fitness": 14.0,
-            "Ferramentas": 12.0,
-            "Games": 12.0,
-            "Informática": 12.0,
-            "Instrumentos Musicais": 12.0,
-            "Livros, Revistas e Comics": 16.0,
-            "Saúde": 14.0,
-            "Outros": 13.0,
-        },
-        "Premium": {
-            "Acessórios para Veículos": 18.0,
-            "Alimentos e Bebidas": 17.0,
-            "Bebês": 18.0,
-            "Beleza e Cuidado Pessoal": 18.0,
-            "Brinquedos e Hobbies": 18.0,
-            "Calçados, Roupas e Bolsas": 18.0,
-            "Casa, Móveis e Decoração": 18.0,
-            "Celulares e Telefones": 16.0,
-            "Eletrodomésticos": 16.0,
-            "Eletrônicos, Áudio e Vídeo": 16.0,
-            "Esportes e Fitness": 18.0,
-            "Ferramentas": 17.0,
-            "Games": 17.0,
-            "Informática": 16.0,
-            "Instrumentos Musicais": 17.0,
-            "Livros, Revistas e Comics": 19.0,
-            "Saúde": 18.0,
-            "Outros": 17.0,
-        },
-    },
-    "fixed_fees": [
-        (29.0, 6.25),
-        (50.0, 6.50),
-        (79.0, 6.75),
-    ],
-}
-
-AMAZON = {
-    "name": "Amazon",
-    "icon": "📦",
-    "logistics": {
-        "FBM (Vendedor envia)": "fbm",
-        "DBA (Amazon envia)": "dba",
-    },
-    "dba_fees": {
-        "fixed": [ # For price < 79.00
-            (30.00, 4.50),
-            (49.99, 6.50),
-            (78.99, 6.75),
-        ],
-        "weight": [ # For price >= 79.00 (Standard size examples - SP Capital base)
-            (250, 19.95),
-            (500, 20.45),
-            (1000, 21.45),
-            (2000, 22.45),
-            (5000, 23.45),
-            (9000, 25.45),
-            (13000, 28.45),
-            (17000, 31.45),
-            (23000, 35.45),
-            (30000, 39.45), # Cap at 30kg for simplicity in example
-        ]
-    },
-    "categories": {
-        "Automotivo": 12.0,
-        "Bebês": 12.0,
-        "Beleza": 12.0,
-        "Brinquedos e Jogos": 13.0,
-        "Casa": 12.0,
-        "Computadores": 12.0,
-        "Cozinha": 12.0,
-        "Eletrônicos": 12.0,
-        "Esportes e Aventura": 12.0,
-        "Ferramentas e Construção": 12.0,
-        "Games e Consoles": 12.0,
-        "Instrumentos Musicais": 12.0,
-        "Livros": 15.0,
-        "Moda": 13.0,
-        "Pet Shop": 12.0,
-        "Papelaria e Escritório": 12.0,
-        "Saúde": 10.0,
-        "Outros": 12.0,
-    },
-}
-
-SHOPEE = {
-    "name": "Shopee",
-    "icon": "🟠",
-    "base_commission": 14.0,
-    "free_shipping_extra": 6.0,
-    "fixed_fee": 4.0,
-    "cnpj_transaction_fee": 2.0,
-    "categories": {
-        "Acessórios de Moda": 14.0,
-        "Beleza e Saúde": 14.0,
-        "Brinquedos": 14.0,
-        "Casa e Decoração": 14.0,
-        "Celulares e Acessórios": 14.0,
-        "Eletrônicos": 14.0,
-        "Esportes e Lazer": 14.0,
-        "Ferramentas": 14.0,
-        "Informática": 14.0,
-        "Livros": 14.0,
-        "Moda Feminina": 14.0,
-        "Moda Masculina": 14.0,
-        "Pet Shop": 14.0,
-        "Bebês e Crianças": 14.0,
-        "Outros": 14.0,
-    },
-}
-
-
-# ─────────────────────────────────────────────────────────────
-# CALCULATION ENGINE
-# ─────────────────────────────────────────────────────────────
-def calc_ml_fixed_fee(sale_price: float) -> float:
-    """Calculate Mercado Livre fixed fee based on price range."""
-    if sale_price >= 79.0:
-        return 0.0
-    for threshold, fee in MERCADO_LIVRE["fixed_fees"]:
-        if sale_price <= threshold:
-            return fee
-    return 0.0
-
-
-def calculate_mercado_livre(
-    cost: float,
-    ad_type: str,
-    category: str,
-    extra_cost: float,
-    shipping_cost: float, # Cost if Free Shipping applies (>= 79)
-    tax_pct: float,
-    fixed_expenses_per_unit: float,
-    desired_margin_pct: float,
-    other_pct: float,
-    include_fixed_fee: bool = True,
-) -> dict:
-    commission_pct = MERCADO_LIVRE["ad_types"][ad_type][category]
-    
-    def get_fixed_fee(p):
-        if p >= 79.00: return 0.0
-        for threshold, fee in MERCADO_LIVRE["fixed_fees"]:
-            if p <= threshold: return fee
-        return 0.0
-
-    tax_factor = tax_pct / 100
-    commission_factor = commission_pct / 100
-    other_factor = other_pct / 100
-    margin_factor = desired_margin_pct / 100
-    
-    divisor = 1 - (commission_factor + tax_factor + margin_factor + other_factor)
-    
-    suggested_price = 0.0
-    
-    if divisor > 0.01:
-        # Regime 1: Price < 79. Check tiers.
-        # Tier 1: <= 29. Fee 6.25. No Shipping.
-        fee_tier1 = 6.25 if include_fixed_fee else 0.0
-        p1 = (cost + extra_cost + fixed_expenses_per_unit + fee_tier1) / divisor
-        if p1 <= 29.00:
-            suggested_price = p1
-        else:
-            # Tier 2: 29 < p <= 50. Fee 6.50.
-            fee_tier2 = 6.50 if include_fixed_fee else 0.0
-            p2 = (cost + extra_cost + fixed_expenses_per_unit + fee_tier2) / divisor
-            if p2 <= 50.00:
-                suggested_price = p2
-            else:
-                # Tier 3: 50 < p < 79. Fee 6.75.
-                fee_tier3 = 6.75 if include_fixed_fee else 0.0
-                p3 = (cost + extra_cost + fixed_expenses_per_unit + fee_tier3) / divisor
-                if p3 < 79.00:
-                    suggested_price = p3
-                else:
-                    # Regime 2: >= 79. No Fixed Fee. YES Shipping deduction.
-                    # Standard logic: Fee is 0 if price >= 79. So include_fixed_fee doesn't matter here for the fee itself,
-                    # but logic says "No Fixed Fee". 
-                    p4 = (cost + extra_cost + fixed_expenses_per_unit + shipping_cost) / divisor
-                    suggested_price = max(79.00, p4)
-                    
-    final_price = round(suggested_price, 2)
-    
-    # Recalculate actuals
-    real_fixed_fee = get_fixed_fee(final_price) if include_fixed_fee else 0.0
-    real_shipping = shipping_cost if final_price >= 79.00 else 0.0
-    
-    commission = final_price * commission_factor
-    tax = final_price * tax_factor
-    other = final_price * other_factor
-    
-    total_fees = commission + real_fixed_fee + other
-    
-    # Total Cost = Product + Extra + FixedExp + Shipping + Fees + Tax
-    total_cost = cost + extra_cost + fixed_expenses_per_unit + real_shipping + total_fees + tax
-    profit = final_price - total_cost
-    
-    margin = (profit / final_price * 100) if final_price > 0 else 0
-    roi_base = cost + extra_cost + real_shipping + fixed_expenses_per_unit
-    roi = (profit / roi_base * 100) if roi_base > 0 else 0
-
-    return {
-        "profit": profit,
-        "margin": margin,
-        "roi": roi,
-        "total_fees": total_fees + tax,
-        "commission": commission,
-        "commission_pct": commission_pct,
-        "fixed_fee": real_fixed_fee,
-        "shipping_cost": real_shipping, # Add this for specific display if needed
-        "tax": tax,
-        "you_receive": final_price - total_fees - tax - real_shipping,
-        "suggested_price": final_price,
-        "total_cost": total_cost,
-    }
-
-
-def calculate_amazon(
-    cost: float,
-    logistics: str, # "dba" or "fbm"
-    category: str,
-    extra_cost: float,
-    shipping_cost: float,
-    weight_g: float,
-    tax_pct: float,
-    fixed_expenses_per_unit: float,
-    desired_margin_pct: float,
-    other_pct: float,
-) -> dict:
-    commission_pct = AMAZON["categories"][category]
-
-    def get_dba_fee(price, weight):
-        if price < 79.00:
-            if price <= 30.00: return AMAZON["dba_fees"]["fixed"][0][1]
-            if price <= 49.99: return AMAZON["dba_fees"]["fixed"][1][1]
-            return AMAZON["dba_fees"]["fixed"][2][1]
-        else:
-            for w, fee in AMAZON["dba_fees"]["weight"]:
-                if weight <= w: return fee
-            return AMAZON["dba_fees"]["weight"][-1][1]
-
-    suggested_price = 0.0
-    tax_factor = tax_pct / 100
-    commission_factor = commission_pct / 100
-    other_factor = other_pct / 100
-    margin_factor = desired_margin_pct / 100
-    
-    divisor = 1 - (commission_factor + tax_factor + margin_factor + other_factor)
-    
-    if divisor <= 0.01:
-        suggested_price = 0.0
-    else:
-        if logistics == "dba":
-            # Iterative check for tiers
-            p_check = (cost + extra_cost + fixed_expenses_per_unit + 4.50) / divisor
-            if p_check <= 30.00:
-                suggested_price = p_check
-            else:
-                p_check = (cost + extra_cost + fixed_expenses_per_unit + 6.50) / divisor
-                if p_check <= 49.99:
-                    suggested_price = p_check
-                else:
-                    p_check = (cost + extra_cost + fixed_expenses_per_unit + 6.75) / divisor
-                    if p_check < 79.00:
-                        suggested_price = p_check
-                    else:
-                        w_fee = 0.0
-                        for w, fee in AMAZON["dba_fees"]["weight"]:
-                            if weight_g <= w: 
-                                w_fee = fee
-                                break
-                        else:
-                            w_fee = AMAZON["dba_fees"]["weight"][-1][1]
-                        suggested_price = max(79.00, (cost + extra_cost + fixed_expenses_per_unit + w_fee) / divisor)
-        else:
-            suggested_price = (cost + extra_cost + fixed_expenses_per_unit + shipping_cost) / divisor
-
-    final_price = round(suggested_price, 2)
-    
-    logistics_fee = 0.0
-    if logistics == "dba":
-        logistics_fee = get_dba_fee(final_price, weight_g)
-
-    commission = final_price * commission_factor
-    tax = final_price * tax_factor
-    other = final_price * other_factor
-    
-    total_fees = commission + logistics_fee + other
-    fbm_cost = shipping_cost if logistics == "fbm" else 0.0
-    
-    # Revenue - Expenses
-    profit = final_price - (cost + extra_cost + fixed_expenses_per_unit + fbm_cost + total_fees + tax)
-    
-    margin = (profit / final_price * 100) if final_price > 0 else 0
-    roi_base = cost + extra_cost + fbm_cost
-    roi = (profit / roi_base * 100) if roi_base > 0 else 0
-
-    return {
-        "profit": profit,
-        "margin": margin,
-        "roi": roi,
-        "total_fees": total_fees + tax,
-        "commission": commission,
-        "commission_pct": commission_pct,
-        "plan_fee": logistics_fee,
-        "tax": tax,
-        "you_receive": final_price - total_fees - tax,
-        "suggested_price": final_price,
-        "total_cost": roi_base + total_fees + tax + fixed_expenses_per_unit, 
-    }
-
-
-def calculate_shopee(
-    cost: float,
-    category: str,
-    seller_type: str,
-    free_shipping: bool,
-    extra_cost: float,
-    shipping_cost: float,
-    tax_pct: float,
-    fixed_expenses_per_unit: float,
-    desired_margin_pct: float,
-    other_pct: float,
-) -> dict:
-    commission_pct = SHOPEE["categories"][category] # Base commission
-    
-    if free_shipping:
-        commission_pct += 6.0 # Add 6% for free shipping program
-        
-    # Iterative Price Calc
-    tax_factor = tax_pct / 100
-    commission_factor = commission_pct / 100
-    other_factor = other_pct / 100
-    margin_factor = desired_margin_pct / 100
-    
-    # Try Standard Fee (4.00)
-    divisor_std = 1 - (commission_factor + tax_factor + margin_factor + other_factor)
-    suggested_price = 0.0
-    
-    if divisor_std > 0.01:
-        p_std = (cost + extra_cost + shipping_cost + fixed_expenses_per_unit + 4.00) / divisor_std
-        if p_std >= 8.00:
-            suggested_price = p_std
-        else:
-            # Try Small Item Fee (50% of Price)
-            # Price = (Costs) / (1 - VarFees - 0.5)
-            # VarFees includes Commission!
-            # Example: 14% comm + 50% fixed = 64% fees
-            divisor_small = 1 - (commission_factor + tax_factor + margin_factor + other_factor + 0.5)
-            if divisor_small > 0.01:
-                p_small = (cost + extra_cost + shipping_cost + fixed_expenses_per_unit) / divisor_small
-                suggested_price = p_small
-            else:
-                suggested_price = 0.0 
-    
-    final_price = round(suggested_price, 2)
-    
-    # Metrics
-    if final_price > 0 and final_price < 8.00:
-        real_fixed_fee = final_price * 0.5
-    else:
-        real_fixed_fee = 4.00
-        
-    commission = final_price * commission_factor
-    tax = final_price * tax_factor
-    other = final_price * other_factor
-    
-    total_fees = commission + real_fixed_fee + other
-    total_cost = cost + extra_cost + shipping_cost + fixed_expenses_per_unit + total_fees + tax
-    profit = final_price - total_cost
-    
-    margin = (profit / final_price * 100) if final_price > 0 else 0
-    roi_base = cost + extra_cost + shipping_cost + fixed_expenses_per_unit
-    roi = (profit / roi_base * 100) if roi_base > 0 else 0
-
-    return {
-        "profit": profit,
-        "margin": margin,
-        "roi": roi,
-        "total_fees": total_fees + tax,
-        "commission": commission,
-        "commission_pct": commission_pct,
-        "fixed_fee": real_fixed_fee,
-        "tax": tax,
-        "you_receive": final_price - total_fees - tax,
-        "suggested_price": final_price,
-        "total_cost": total_cost,
-    }
-
-
- 
-
-
-
-# ─────────────────────────────────────────────────────────────
-# CHART BUILDERS
-# ─────────────────────────────────────────────────────────────
-CHART_LAYOUT = dict(
-    paper_bgcolor="rgba(0,0,0,0)",
-    plot_bgcolor="rgba(0,0,0,0)",
-    font=dict(family="Inter, SF Pro Display, -apple-system, sans-serif", color="#e0e0e0", size=13),
-    margin=dict(l=20, r=20, t=40, b=40),
-    xaxis=dict(
-        showgrid=False,
-        showline=False,
-        zeroline=False,
-        tickfont=dict(size=12, color="#a0a0a0"),
-    ),
-    yaxis=dict(
-        showgrid=True,
-        gridcolor="rgba(255,255,255,0.06)",
-        showline=False,
-        zeroline=False,
-        tickfont=dict(size=12, color="#a0a0a0"),
-        tickprefix="R$ ",
-    ),
-    hoverlabel=dict(
-        bgcolor="rgba(30,30,40,0.95)",
-        bordercolor="rgba(255,255,255,0.1)",
-        font_size=13,
-        font_color="#fff",
-    ),
-    bargap=0.35,
+from categories import RuleEngine, categorize_series
+from charts import build_breakeven_chart, build_comparison_chart, build_projection_chart, build_sensitivity_heatmap
+from enrichment import CategoryCache, Enricher, make_backend
+from exports import EXPORT_FORMATS, columnar_exports_available, ledger_table, to_arrow_table, write_csv, write_table
+from ledger import LedgerStore, select_rows, summarize_ledger
+from pricing import (
+    AMAZON,
+    MERCADO_LIVRE,
+    SHOPEE,
+    calc_ml_fixed_fee,
+    calculate_amazon,
+    calculate_mercado_livre,
+    calculate_shopee,
 )
-
-UNITS_PER_DAY = [5, 10, 20, 30, 50, 100]
-
-
-def build_projection_chart(
-    profit_per_unit: float,
-    title: str,
-    color_gradient: list[str],
-) -> go.Figure:
-    """Build a bar chart showing monthly profit projections."""
-    monthly = [profit_per_unit * u * 30 for u in UNITS_PER_DAY]
-    labels = [f"{u} vendas/dia" for u in UNITS_PER_DAY]
-
-    colors = []
-    for val in monthly:
-        if val >= 0:
-            colors.append(color_gradient[0])
-        else:
-            colors.append("#ff4d6a")
-
-    fig = go.Figure()
-    fig.add_trace(
-        go.Bar(
-            x=labels,
-            y=monthly,
-            marker=dict(
-                color=colors,
-                cornerradius=8,
-                line=dict(width=0),
-            ),
-            text=[f"R$ {v:,.2f}" for v in monthly],
-            textposition="outside",
-            textfont=dict(size=12, color="#e0e0e0"),
-            hovertemplate="<b>%{x}</b><br>Lucro mensal: R$ %{y:,.2f}<extra></extra>",
-        )
-    )
-    fig.update_layout(
-        title=dict(text=title, font=dict(size=16, color="#fff"), x=0, xanchor="left"),
-        height=380,
-        **CHART_LAYOUT,
-    )
-    return fig
-
-
-def build_comparison_chart(
-    profit_without: float,
-    profit_with: float,
-) -> go.Figure:
-    """Build a grouped bar chart comparing profit with/without fixed expenses."""
-    monthly_without = [profit_without * u * 30 for u in UNITS_PER_DAY]
-    monthly_with = [profit_with * u * 30 for u in UNITS_PER_DAY]
-    labels = [f"{u}/dia" for u in UNITS_PER_DAY]
-
-    fig = go.Figure()
-    fig.add_trace(
-        go.Bar(
-            name="Sem despesas fixas",
-            x=labels,
-            y=monthly_without,
-            marker=dict(color="rgba(0, 210, 140, 0.85)", cornerradius=6),
-            hovertemplate="<b>Sem desp. fixas</b><br>%{x}: R$ %{y:,.2f}<extra></extra>",
-        )
-    )
-    fig.add_trace(
-        go.Bar(
-            name="Com despesas fixas",
-            x=labels,
-            y=monthly_with,
-            marker=dict(color="rgba(0, 150, 255, 0.85)", cornerradius=6),
-            hovertemplate="<b>Com desp. fixas</b><br>%{x}: R$ %{y:,.2f}<extra></extra>",
-        )
-    )
-    fig.update_layout(
-        title=dict(
-            text="📊 Comparativo: Com vs Sem Despesas Fixas (Lucro Mensal)",
-            font=dict(size=16, color="#fff"),
-            x=0,
-            xanchor="left",
-        ),
-        barmode="group",
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            font=dict(size=12, color="#ccc"),
-            bgcolor="rgba(0,0,0,0)",
-        ),
-        height=400,
-        **CHART_LAYOUT,
-    )
-    return fig
-
-
-def build_breakeven_chart(
-    fixed_costs: float,
-    contribution_margin: float,
-) -> go.Figure:
-    """Build a chart visualizing the break-even point."""
-    if contribution_margin <= 0:
-        return None
-
-    breakeven_units = fixed_costs / contribution_margin if contribution_margin > 0 else 0
-    
-    # Create a range of units around the break-even point
-    max_units = max(int(breakeven_units * 2), 50)
-    step = max(1, max_units // 20)
-    units_range = list(range(0, max_units + step, step))
-    
-    # Calculate profit for each unit count
-    # Profit = (Margin * Units) - Fixed Costs
-    profits = [(contribution_margin * u) - fixed_costs for u in units_range]
-    
-    # Colors: Red below zero, Green above
-    colors = ["#ff453a" if p < 0 else "#30d158" for p in profits]
-
-    fig = go.Figure()
-    
-    # Add Profit Line
-    fig.add_trace(
-        go.Scatter(
-            x=units_range,
-            y=profits,
-            mode="lines+markers",
-            line=dict(color="#0a84ff", width=3),
-            marker=dict(size=6, color=colors, line=dict(color="#fff", width=1)),
-            name="Lucro Líquido",
-            hovertemplate="<b>%{x} vendas</b><br>Lucro: R$ %{y:,.2f}<extra></extra>",
-        )
-    )
-    
-    # Add Break-even Line (Zero)
-    fig.add_hline(
-        y=0,
-        line_dash="dash",
-        line_color="rgba(255,255,255,0.3)",
-        annotation_text="Ponto de Equilíbrio",
-        annotation_position="bottom right",
-    )
-    
-    # Add Vertical Line at Break-even units
-    fig.add_vline(
-        x=breakeven_units,
-        line_dash="dot",
-        line_color="#ffd60a",
-        annotation_text=f"Breakeven: {int(math.ceil(breakeven_units))} un.",
-        annotation_position="top left",
-    )
-
-    fig.update_layout(
-        title=dict(
-            text=f"🎯 Ponto de Equilíbrio: {int(math.ceil(breakeven_units))} vendas/mês",
-            font=dict(size=16, color="#fff"),
-            x=0,
-            xanchor="left",
-        ),
-        xaxis_title="Quantidade de Vendas",
-        yaxis_title="Lucro Líquido (R$)",
-        height=400,
-        **CHART_LAYOUT,
-    )
-    return fig
+from pricing_batch import price_batch
+from sensitivity import SENSITIVITY_AXES, SENSITIVITY_POINTS, axis_values, sensitivity_grid
+from simulations import SIMULATION_LABELS, SimulationBuffer, SimulationStore
+from statements import find_statement_columns, iter_pdf_transactions, parse_statement_files, read_statement_csv
 
 
 # ─────────────────────────────────────────────────────────────
@@ -992,13 +394,41 @@ def render_results(result: dict, title: str = "📊 Resultados por Venda"):
     st.markdown(f'<div class="results-row-2">{row2_html}</div>', unsafe_allow_html=True)
 
 
+def build_chart_figures(
+    result_no_fixed: dict,
+    result_with_fixed: dict | None,
+    has_fixed_expenses: bool,
+    total_fixed_expenses: float = 0.0,
+) -> dict:
+    """Build the projection figures shown by render_charts."""
+    figures = {
+        "projection": build_projection_chart(
+            result_no_fixed["profit"],
+            "💰 Projeção Mensal (Margem de Contribuição)",
+            ["rgba(48, 209, 88, 0.8)"],
+        ),
+    }
+    if has_fixed_expenses and result_with_fixed is not None:
+        figures["comparison"] = build_comparison_chart(
+            result_no_fixed["profit"],
+            result_with_fixed["profit"],
+        )
+        # Contribution margin is the profit without fixed expenses
+        figures["breakeven"] = build_breakeven_chart(total_fixed_expenses, result_no_fixed["profit"])
+    return figures
+
+
 def render_charts(
     result_no_fixed: dict,
     result_with_fixed: dict | None,
     has_fixed_expenses: bool,
     total_fixed_expenses: float = 0.0,
+    figures: dict | None = None,
 ):
-    """Render projection charts."""
+    """Render projection charts, reusing prebuilt `figures` when given."""
+    if figures is None:
+        figures = build_chart_figures(result_no_fixed, result_with_fixed, has_fixed_expenses, total_fixed_expenses)
+
     st.markdown("---")
     
     st.markdown(
@@ -1006,12 +436,7 @@ def render_charts(
         unsafe_allow_html=True,
     )
 
-    fig1 = build_projection_chart(
-        result_no_fixed["profit"],
-        "💰 Projeção Mensal (Margem de Contribuição)",
-        ["rgba(48, 209, 88, 0.8)"],
-    )
-    st.plotly_chart(fig1, use_container_width=True, config={"displayModeBar": False})
+    st.plotly_chart(figures["projection"], use_container_width=True, config={"displayModeBar": False})
 
 
 
@@ -1020,16 +445,10 @@ def render_charts(
         c_chart1, c_chart2 = st.columns(2)
         
         with c_chart1:
-             fig2 = build_comparison_chart(
-                result_no_fixed["profit"],
-                result_with_fixed["profit"],
-            )
-             st.plotly_chart(fig2, use_container_width=True, config={"displayModeBar": False})
+             st.plotly_chart(figures["comparison"], use_container_width=True, config={"displayModeBar": False})
              
         with c_chart2:
-             # Contribution margin is the profit without fixed expenses
-             contribution_margin = result_no_fixed["profit"]
-             fig3 = build_breakeven_chart(total_fixed_expenses, contribution_margin)
+             fig3 = figures["breakeven"]
              if fig3:
                  st.plotly_chart(fig3, use_container_width=True, config={"displayModeBar": False})
              else:
@@ -1177,6 +596,124 @@ def render_fixed_expenses() -> dict:
 # ─────────────────────────────────────────────────────────────
 # MARKETPLACE TABS
 # ─────────────────────────────────────────────────────────────
+# One cache for the whole server: every session reuses the results, figures
+# and batch outputs any other session already computed. Bounded by
+# SHARED_CACHE_MAX_MB of estimated memory, entries expire after
+# SHARED_CACHE_TTL seconds.
+SHARED_CACHE_MAX_BYTES = int(os.environ.get("SHARED_CACHE_MAX_MB", "256")) * 2**20
+SHARED_CACHE_TTL = float(os.environ.get("SHARED_CACHE_TTL", "3600"))
+
+
+@st.cache_resource
+def get_calc_cache() -> SharedCache:
+    """Server-wide cache of tab results, chart figures and batch outputs (values are read-only)."""
+    return SharedCache(SHARED_CACHE_MAX_BYTES, SHARED_CACHE_TTL)
+
+
+def compute_tab(platform: str, calculate, inputs: dict, fixed: dict) -> dict:
+    """Results (without/with fixed expenses) and chart figures for one tab.
+
+    Memoized on the platform, every widget input and the shared fixed
+    expenses, so returning to an earlier combination skips all the work.
+    """
+    key = (
+        platform,
+        tuple(sorted(inputs.items())),
+        fixed["per_unit"],
+        fixed["other_pct"],
+        fixed["has_expenses"],
+        fixed["total_monthly_fixed"],
+    )
+
+    def compute():
+        result_no_fixed = calculate(**inputs, fixed_expenses_per_unit=0.0, other_pct=0.0)
+        result_with_fixed = None
+        if fixed["has_expenses"]:
+            result_with_fixed = calculate(
+                **inputs, fixed_expenses_per_unit=fixed["per_unit"], other_pct=fixed["other_pct"]
+            )
+        return {"no_fixed": result_no_fixed, "with_fixed": result_with_fixed}
+
+    results = get_calc_cache().get_or_compute(key, compute)
+    # Figures are cached on their own key (the results), so inputs that give
+    # the same numbers share one set of charts
+    figures = get_calc_cache().get_or_compute(
+        ("charts", results["no_fixed"]["profit"], results["with_fixed"] and results["with_fixed"]["profit"],
+         fixed["has_expenses"], fixed["total_monthly_fixed"]),
+        lambda: build_chart_figures(
+            results["no_fixed"], results["with_fixed"], fixed["has_expenses"], fixed["total_monthly_fixed"]
+        ),
+    )
+    return {**results, "figures": figures}
+
+
+SENSITIVITY_LABELS = {
+    "sale_price": "Preço de Venda (R$)",
+    "cost": "Custo (R$)",
+    "desired_margin_pct": "Margem Desejada (%)",
+    "tax_pct": "Imposto (%)",
+}
+
+# Fee tier boundaries that show up as sharp color steps on the map
+SENSITIVITY_TIERS = {
+    "mercado_livre": "faixas da taxa fixa abaixo de R$ 79 e frete pago pelo vendedor a partir de R$ 79",
+    "amazon": "faixas de tarifa DBA por preço abaixo de R$ 79 e por peso acima",
+    "shopee": "tarifa de item pequeno (50% do preço) abaixo de R$ 8",
+}
+
+
+def render_sensitivity(platform: str, inputs: dict, fixed: dict):
+    """Heatmap of profit/margin over a 2D sweep around the tab's current inputs."""
+    with st.expander("🌡️ Mapa de Sensibilidade", expanded=False):
+        if not st.toggle("Mostrar mapa", value=False, key=f"{platform}_sens_show"):
+            st.caption(f"Lucro ou margem em uma grade de {SENSITIVITY_POINTS}×{SENSITIVITY_POINTS} cenários.")
+            return
+        c1, c2 = st.columns(2)
+        with c1:
+            axes = st.radio(
+                "Eixos",
+                list(SENSITIVITY_AXES),
+                format_func=lambda a: " × ".join(SENSITIVITY_LABELS[p] for p in reversed(SENSITIVITY_AXES[a])),
+                horizontal=True,
+                key=f"{platform}_sens_axes",
+            )
+        with c2:
+            metric = st.radio(
+                "Métrica", ["profit", "margin"], format_func={"profit": "Lucro", "margin": "Margem"}.get,
+                horizontal=True, key=f"{platform}_sens_metric",
+            )
+
+        params = dict(
+            inputs,
+            fixed_expenses_per_unit=fixed["per_unit"] if fixed["has_expenses"] else 0.0,
+            other_pct=fixed["other_pct"] if fixed["has_expenses"] else 0.0,
+        )
+        key = ("sensitivity", platform, tuple(sorted(params.items())), axes, metric)
+
+        def compute():
+            x_param, y_param = SENSITIVITY_AXES[axes]
+            suggested = price_batch(pd.DataFrame(index=[0]), platform, **params)["suggested_price"].iloc[0]
+            x_values = axis_values(x_param, params, suggested)
+            y_values = axis_values(y_param, params, suggested)
+            start = time.perf_counter()
+            grid = sensitivity_grid(platform, x_param, x_values, y_param, y_values, **params)
+            seconds = time.perf_counter() - start
+            current = {**params, "sale_price": suggested}
+            figure = build_sensitivity_heatmap(
+                x_values, y_values, grid[metric], (current[x_param], current[y_param]),
+                SENSITIVITY_LABELS[x_param], SENSITIVITY_LABELS[y_param],
+                "Lucro" if metric == "profit" else "Margem", money=metric == "profit",
+            )
+            return {"figure": figure, "seconds": seconds, "points": grid[metric].size}
+
+        computed = get_calc_cache().get_or_compute(key, compute)
+        st.plotly_chart(computed["figure"], use_container_width=True, config={"displayModeBar": False})
+        st.caption(
+            f"{computed['points']:,} cenários calculados em {computed['seconds'] * 1000:.0f} ms. "
+            f"Saltos de cor marcam mudanças de faixa: {SENSITIVITY_TIERS[platform]}."
+        )
+
+
 def tab_mercado_livre(fixed: dict, product_name: str):
     col1, col2 = st.columns([1, 1], gap="large")
 
@@ -1287,15 +824,13 @@ def tab_mercado_livre(fixed: dict, product_name: str):
                     help="Gastos a mais por venda: Embalagem, fita, etiqueta, brinde, etc.",
                 )
 
-    result_no_fixed = calculate_mercado_livre(
-        cost, ad_type, category, extra_cost, shipping, tax_pct, 0.0, desired_margin, 0.0, include_fixed_fee
+    inputs = dict(
+        cost=cost, ad_type=ad_type, category=category, extra_cost=extra_cost, shipping_cost=shipping,
+        tax_pct=tax_pct, desired_margin_pct=desired_margin, include_fixed_fee=include_fixed_fee,
     )
-
-    result_with_fixed = None
-    if fixed["has_expenses"]:
-        result_with_fixed = calculate_mercado_livre(
-            cost, ad_type, category, extra_cost, shipping, tax_pct, fixed["per_unit"], desired_margin, fixed["other_pct"], include_fixed_fee
-        )
+    computed = compute_tab("Mercado Livre", calculate_mercado_livre, inputs, fixed)
+    result_no_fixed = computed["no_fixed"]
+    result_with_fixed = computed["with_fixed"]
 
     with col2:
         render_results(result_no_fixed, "📊 Resultados (Sem Despesas Fixas)")
@@ -1303,7 +838,10 @@ def tab_mercado_livre(fixed: dict, product_name: str):
             # Removed separator
             render_results(result_with_fixed, "💼 Resultados (Com Despesas Fixas)")
 
-    render_charts(result_no_fixed, result_with_fixed, fixed["has_expenses"], fixed["total_monthly_fixed"])
+    render_charts(
+        result_no_fixed, result_with_fixed, fixed["has_expenses"], fixed["total_monthly_fixed"], computed["figures"]
+    )
+    render_sensitivity("mercado_livre", inputs, fixed)
 
     if st.button("💾 Salvar Simulação (Mercado Livre)", type="primary", use_container_width=True):
         save_simulation(
@@ -1421,15 +959,13 @@ def tab_amazon(fixed: dict, product_name: str):
                     help="Gastos a mais por venda: Embalagem, fita, etiqueta, brinde, etc.",
                 )
 
-    result_no_fixed = calculate_amazon(
-        cost, logistics, category, extra_cost, shipping_cost, weight_g, tax_pct, 0.0, desired_margin, 0.0
+    inputs = dict(
+        cost=cost, logistics=logistics, category=category, extra_cost=extra_cost, shipping_cost=shipping_cost,
+        weight_g=weight_g, tax_pct=tax_pct, desired_margin_pct=desired_margin,
     )
-
-    result_with_fixed = None
-    if fixed["has_expenses"]:
-        result_with_fixed = calculate_amazon(
-            cost, logistics, category, extra_cost, shipping_cost, weight_g, tax_pct, fixed["per_unit"], desired_margin, fixed["other_pct"]
-        )
+    computed = compute_tab("Amazon", calculate_amazon, inputs, fixed)
+    result_no_fixed = computed["no_fixed"]
+    result_with_fixed = computed["with_fixed"]
 
     with col2:
         render_results(result_no_fixed, "📊 Resultados (Sem Despesas Fixas)")
@@ -1437,7 +973,10 @@ def tab_amazon(fixed: dict, product_name: str):
             # Removed separator
             render_results(result_with_fixed, "💼 Resultados (Com Despesas Fixas)")
 
-    render_charts(result_no_fixed, result_with_fixed, fixed["has_expenses"], fixed["total_monthly_fixed"])
+    render_charts(
+        result_no_fixed, result_with_fixed, fixed["has_expenses"], fixed["total_monthly_fixed"], computed["figures"]
+    )
+    render_sensitivity("amazon", inputs, fixed)
 
     if st.button("💾 Salvar Simulação (Amazon)", type="primary", use_container_width=True):
         save_simulation(
@@ -1548,15 +1087,13 @@ def tab_shopee(fixed: dict, product_name: str):
                     help="Gastos a mais por venda: Embalagem, fita, etiqueta, brinde, etc.",
                 )
 
-    result_no_fixed = calculate_shopee(
-        cost, category, seller_type, free_shipping, extra_cost, shipping, tax_pct, 0.0, desired_margin, 0.0
+    inputs = dict(
+        cost=cost, category=category, seller_type=seller_type, free_shipping=free_shipping, extra_cost=extra_cost,
+        shipping_cost=shipping, tax_pct=tax_pct, desired_margin_pct=desired_margin,
     )
-
-    result_with_fixed = None
-    if fixed["has_expenses"]:
-        result_with_fixed = calculate_shopee(
-            cost, category, seller_type, free_shipping, extra_cost, shipping, tax_pct, fixed["per_unit"], desired_margin, fixed["other_pct"]
-        )
+    computed = compute_tab("Shopee", calculate_shopee, inputs, fixed)
+    result_no_fixed = computed["no_fixed"]
+    result_with_fixed = computed["with_fixed"]
 
     with col2:
         render_results(result_no_fixed, "📊 Resultados (Sem Despesas Fixas)")
@@ -1564,7 +1101,10 @@ def tab_shopee(fixed: dict, product_name: str):
             # Removed separator
             render_results(result_with_fixed, "💼 Resultados (Com Despesas Fixas)")
 
-    render_charts(result_no_fixed, result_with_fixed, fixed["has_expenses"], fixed["total_monthly_fixed"])
+    render_charts(
+        result_no_fixed, result_with_fixed, fixed["has_expenses"], fixed["total_monthly_fixed"], computed["figures"]
+    )
+    render_sensitivity("shopee", inputs, fixed)
 
     if st.button("💾 Salvar Simulação (Shopee)", type="primary", use_container_width=True):
         save_simulation(
@@ -1576,11 +1116,158 @@ def tab_shopee(fixed: dict, product_name: str):
         st.success("✅ Simulação salva com sucesso!")
 
 
+BATCH_PAGE_SIZES = [25, 50, 100, 250]
+
+
+def tab_batch(fixed: dict):
+    """Price a whole catalog (CSV/XLSX) on the three marketplaces at once."""
+    st.markdown("Envie um catálogo com uma linha por SKU: custo, categoria, peso (g), frete, imposto (%) e margem (%).")
+    c_upload, c_template = st.columns([3, 1])
+    with c_upload:
+        catalog_file = st.file_uploader("Catálogo (CSV ou XLSX)", type=["csv", "xlsx"], key="batch_catalog")
+    with c_template:
+        st.write("")
+        st.download_button("📄 Modelo de catálogo", data=catalog_template(), file_name="catalogo_modelo.csv", mime="text/csv")
+
+    with st.expander("🛒 Opções por Marketplace", expanded=False):
+        o1, o2, o3 = st.columns(3)
+        with o1:
+            ml_ad_type = st.selectbox("Mercado Livre: Tipo de Anúncio", list(MERCADO_LIVRE["ad_types"].keys()), key="batch_ml_ad_type")
+            ml_fixed_fee = st.checkbox("Cobrar Taxa Fixa?", value=True, key="batch_ml_fixed_fee")
+        with o2:
+            amazon_display = st.selectbox("Amazon: Logística", list(AMAZON["logistics"].keys()), key="batch_amz_logistics")
+        with o3:
+            shopee_seller = st.radio("Shopee: Tipo de Vendedor", ["CPF", "CNPJ"], horizontal=True, key="batch_sp_seller")
+            shopee_free_shipping = st.checkbox("Programa de Frete Grátis", value=False, key="batch_sp_free_shipping")
+
+    if not catalog_file:
+        return
+
+    options = dict(
+        ml_ad_type=ml_ad_type,
+        ml_include_fixed_fee=ml_fixed_fee,
+        amazon_logistics=AMAZON["logistics"][amazon_display],
+        shopee_seller_type=shopee_seller,
+        shopee_free_shipping=shopee_free_shipping,
+        fixed_expenses_per_unit=fixed["per_unit"] if fixed["has_expenses"] else 0.0,
+        other_pct=fixed["other_pct"] if fixed["has_expenses"] else 0.0,
+    )
+    key = ("catalog", content_key(catalog_file.getvalue(), catalog_file.name), tuple(sorted(options.items())))
+
+    def compute():
+        start = time.perf_counter()
+        catalog = normalize_catalog(read_catalog(io.BytesIO(catalog_file.getvalue()), catalog_file.name))
+        result, remapped = price_catalog(catalog, **options)
+        return {"catalog": catalog, "result": result, "remapped": remapped, "seconds": time.perf_counter() - start}
+
+    try:
+        priced = get_calc_cache().get_or_compute(key, compute)
+    except (ValueError, ImportError) as e:
+        st.error(f"Não foi possível ler o catálogo: {e}")
+        return
+
+    result = priced["result"]
+    st.caption(f"{len(result):,} SKUs precificados em {priced['seconds']:.2f}s")
+    for platform, count in priced["remapped"].items():
+        if count:
+            st.caption(f"⚠️ {count:,} SKUs sem categoria válida em {CATALOG_MARKETPLACES[platform][0]} foram calculados como 'Outros'.")
+
+    # Only the visible page goes to the browser
+    s1, s2, s3, s4 = st.columns([2, 1, 1, 1])
+    with s1:
+        sort_by = st.selectbox("Ordenar por", ["(ordem do arquivo)", *result.columns], key="batch_sort_by")
+    with s2:
+        descending = st.toggle("Decrescente", value=True, key="batch_sort_desc")
+    with s3:
+        page_size = st.selectbox("Linhas por página", BATCH_PAGE_SIZES, index=1, key="batch_page_size")
+    pages = max(1, -(-len(result) // page_size))
+    with s4:
+        page = st.number_input(f"Página (de {pages:,})", min_value=1, max_value=pages, value=1, step=1, key="batch_page")
+
+    view = page_of(result, None if sort_by == "(ordem do arquivo)" else sort_by, not descending, page - 1, page_size)
+    money = {c: "R$ {:,.2f}" for c in result.columns if c.startswith(("Preço", "Lucro", "Taxas", "Custo"))}
+    pct = {c: "{:.1f}%" for c in result.columns if c.endswith("(%)")}
+    st.dataframe(view.style.format({**money, **pct}), use_container_width=True, hide_index=True)
+
+    # Writing 100k priced rows takes seconds, so files are built on request
+    # and kept in this session (cached values are shared and read-only)
+    # instead of on every rerun
+    exports = st.session_state.get("batch_exports")
+    if exports is None or exports[0] != key:
+        exports = st.session_state["batch_exports"] = (key, {})
+    exports = exports[1]
+    if not exports:
+        if st.button("⬇️ Preparar arquivos para download", key="batch_prepare_exports"):
+            with st.spinner("Gerando arquivos..."):
+                exports["csv"] = write_csv(result)
+                if columnar_exports_available():
+                    exports["parquet"] = write_table(to_arrow_table(result, category_columns=["Categoria"]), "parquet")
+    if exports:
+        e1, e2, _ = st.columns([1, 1, 3])
+        with e1:
+            st.download_button("📥 Baixar CSV", data=exports["csv"], file_name="catalogo_precificado.csv", mime="text/csv")
+        if "parquet" in exports:
+            extension, mime = EXPORT_FORMATS["parquet"]
+            with e2:
+                st.download_button(
+                    "📦 Baixar Parquet", data=exports["parquet"], file_name=f"catalogo_precificado{extension}", mime=mime
+                )
+
+    render_best_marketplace(key, priced, options)
+
+
+def render_best_marketplace(catalog_key: tuple, priced: dict, options: dict):
+    """Best channel/option combination per SKU of a priced catalog."""
+    st.markdown("### 🏆 Melhor Canal por SKU")
+    st.caption(
+        "Compara ML Clássico/Premium (com e sem taxa fixa), Amazon FBM/DBA e Shopee com e sem frete grátis. "
+        "Lucro, margem e ROI são comparados no preço de venda do catálogo (coluna sale_price/preço de venda)."
+    )
+    metric_labels = {
+        "price": "Menor preço p/ margem alvo", "profit": "Lucro (R$)", "margin": "Margem (%)", "roi": "ROI (%)",
+    }
+    catalog = priced["catalog"]
+    has_sale_price = "sale_price" in catalog.columns and catalog["sale_price"].notna().all()
+    metrics = list(OPTIMIZE_METRICS) if has_sale_price else ["price"]
+    if not has_sale_price:
+        st.info("Inclua o preço de venda de cada SKU no catálogo para comparar lucro, margem e ROI entre canais.")
+    metric = st.radio(
+        "Critério", metrics, format_func=metric_labels.get, horizontal=True, key="batch_best_metric"
+    )
+
+    def compute():
+        start = time.perf_counter()
+        best = best_marketplace(
+            catalog,
+            metric,
+            shopee_seller_type=options["shopee_seller_type"],
+            fixed_expenses_per_unit=options["fixed_expenses_per_unit"],
+            other_pct=options["other_pct"],
+        )
+        return best, time.perf_counter() - start
+
+    # One ranking per criterion, cached next to the priced catalog
+    best, seconds = get_calc_cache().get_or_compute(("catalog_best", catalog_key, metric), compute)
+    st.caption(f"{len(best):,} SKUs x 8 combinações avaliados em {seconds:.2f}s")
+
+    b1, b2 = st.columns([1, 2])
+    with b1:
+        wins = best["Melhor Canal"].value_counts().rename_axis("Canal").reset_index(name="SKUs")
+        st.dataframe(wins, use_container_width=True, hide_index=True)
+    with b2:
+        page = st.session_state.get("batch_page", 1) - 1
+        page_size = st.session_state.get("batch_page_size", BATCH_PAGE_SIZES[1])
+        view = page_of(best, None, True, page, page_size)
+        money = {c: "R$ {:,.2f}" for c in ("Preço", "Lucro")}
+        pct = {c: "{:.1f}%" for c in ("Margem (%)", "ROI (%)")}
+        st.dataframe(view.style.format({**money, **pct}, precision=2), use_container_width=True, hide_index=True)
+
+
 # ─────────────────────────────────────────────────────────────
 # MAIN APP
 # ─────────────────────────────────────────────────────────────
 def save_simulation(platform: str, product_name: str, result_no_fixed: dict, result_with_fixed: dict | None):
-    """Save the current simulation to session state."""
+    """Save the current simulation to the persistent simulations store."""
     
     # Determine which result to use (prefer with fixed expenses if available)
     target_result = result_with_fixed if result_with_fixed else result_no_fixed
@@ -1610,7 +1297,15 @@ def save_simulation(platform: str, product_name: str, result_no_fixed: dict, res
         "Imposto (R$)": round(target_result["tax"], 2),
     }
     
-    st.session_state["saved_simulations"].append(record)
+    owner = current_owner()
+    store = get_simulation_store()
+    buffer = get_simulation_buffer()
+    store.add(owner, record)
+    buffer.append(record)
+    st.session_state["simulation_buffer"] = (owner, store.version(owner), buffer)
+
+
+SIMULATION_PAGE_SIZES = [25, 50, 100, 250]
 
 
 def render_saved_simulations():
@@ -1618,40 +1313,106 @@ def render_saved_simulations():
     st.markdown("---")
     st.markdown("## 📋 Simulações Salvas")
 
-    if not st.session_state["saved_simulations"]:
+    store = get_simulation_store()
+    owner = current_owner()
+    buffer = get_simulation_buffer()
+    if not len(buffer):
         st.info("Nenhuma simulação salva ainda. Faça um cálculo e clique em 'Salvar Simulação'.")
         return
 
-    # Convert to DataFrame
-    df = pd.DataFrame(st.session_state["saved_simulations"])
-    
-    # Reorder columns for better readability if they exist
-    cols = [
-        "Data/Hora", "Produto", "Plataforma", 
-        "Custo (R$)", "Venda (R$)", "Lucro (R$)", 
-        "Margem (%)", "ROI (%)", "Custo Total (R$)"
-    ]
-    # Filter only columns that actually exist in df
-    cols = [c for c in cols if c in df.columns]
-    # Add remaining columns
-    remaining = [c for c in df.columns if c not in cols]
-    df = df[cols + remaining]
-
-    st.dataframe(df, use_container_width=True)
-
-    c1, c2 = st.columns([1, 4])
-    with c1:
-        # Export button
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Baixar CSV",
-            data=csv,
-            file_name=f"simulacoes_lucro_{int(time.time())}.csv",
-            mime="text/csv",
-        )
-    with c2:
-        if st.button("🗑️ Limpar Lista"):
-            st.session_state["saved_simulations"] = []
+    # Filters and sorting are array operations on the columnar buffer; only
+    # the visible page is taken out of its zero-copy DataFrame view
+    f1, f2, f3, f4, f5 = st.columns([2, 2, 2, 1, 1])
+    with f1:
+        product = st.selectbox("Produto", ["(todos)", *buffer.distinct("Produto")], key="sims_product")
+    with f2:
+        platform = st.selectbox("Plataforma", ["(todas)", *buffer.distinct("Plataforma")], key="sims_platform")
+    with f3:
+        sort_by = st.selectbox("Ordenar por", list(SIMULATION_LABELS.values()), key="sims_sort_by")
+    with f4:
+        page_size = st.selectbox("Por página", SIMULATION_PAGE_SIZES, key="sims_page_size")
+    filters = dict(
+        product=None if product == "(todos)" else product,
+        platform=None if platform == "(todas)" else platform,
+    )
+    positions = buffer.select(sort_by=sort_by, **filters)
+    total = len(positions)
+    pages = max(1, -(-total // page_size))
+    with f5:
+        page = st.number_input(f"Página (de {pages:,})", min_value=1, max_value=pages, value=1, step=1, key="sims_page")
+
+    frame = buffer.frame()
+    df = frame.take(positions[(page - 1) * page_size:page * page_size])
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    st.caption(f"{total:,} simulações")
+
+    # Files cover every filtered record; built on request and kept until the data or filters change
+    export_key = (len(buffer), tuple(filters.items()), sort_by)
+    exports = st.session_state.get("simulation_exports")
+    if exports is not None and exports[0] != export_key:
+        exports = None
+
+    c1, c2, c3, c4 = st.columns([1, 1, 1, 2])
+    if exports is None:
+        with c1:
+            if st.button("⬇️ Preparar downloads", key="sims_prepare_exports"):
+                full = frame.take(positions)
+                files = {"csv": write_csv(full)}
+                if columnar_exports_available():
+                    table = to_arrow_table(
+                        full,
+                        datetime_columns=["Data/Hora"],
+                        decimal_columns=[c for c in full.columns if c.endswith("(R$)")],
+                        category_columns=["Produto", "Plataforma"],
+                        date_format="%Y-%m-%d %H:%M:%S",
+                    )
+                    for fmt in ("parquet", "arrow"):
+                        files[fmt] = write_table(table, fmt)
+                exports = (export_key, int(time.time()), files)
+                st.session_state["simulation_exports"] = exports
+    if exports is not None:
+        _, stamp, files = exports
+        for col, fmt, label in ((c1, "csv", "📥 Baixar CSV"), (c2, "parquet", "📦 Parquet"), (c3, "arrow", "🏹 Arrow")):
+            if fmt in files:
+                extension, mime = EXPORT_FORMATS[fmt]
+                with col:
+                    st.download_button(
+                        label=label,
+                        data=files[fmt],
+                        file_name=f"simulacoes_lucro_{stamp}{extension}",
+                        mime=mime,
+                    )
+    with c4:
+        if st.button("🗑️ Limpar Lista", help="Apaga somente as suas simulações salvas."):
+            store.clear(owner)
+            buffer.clear()
+            st.session_state.pop("simulation_exports", None)
+            st.rerun()
+
+
+def render_cache_debug():
+    """Debug panel with the server-wide cache counters and per-entry sizes."""
+    with st.expander("🐞 Debug: Cache de Cálculos", expanded=True):
+        stats = get_calc_cache().stats()
+        d1, d2, d3, d4, d5 = st.columns(5)
+        d1.metric("Hits", stats["hits"])
+        d2.metric("Misses", stats["misses"])
+        d3.metric("Taxa de acerto", f"{stats['hit_rate'] * 100:.1f}%")
+        d4.metric("Memória", f"{stats['bytes'] / 2**20:.1f}/{stats['max_bytes'] / 2**20:.0f} MB")
+        d5.metric("Entradas", stats["size"], f"-{stats['evicted']} LRU / -{stats['expired']} TTL", delta_color="off")
+
+        for label, cache in (("Cálculos e gráficos", get_calc_cache()), ("Extratos", get_statement_cache())):
+            entries = pd.DataFrame(cache.entries())
+            if entries.empty:
+                continue
+            entries["key"] = entries["key"].map(lambda k: str(k)[:80])
+            entries["KB"] = entries.pop("bytes") / 1024
+            st.markdown(f"**{label}** ({len(entries)} entradas, mais recentes primeiro)")
+            st.dataframe(entries.iloc[::-1], use_container_width=True, hide_index=True)
+
+        if st.button("Limpar caches", key="clear_calc_cache", help="Esvazia os cálculos, gráficos e extratos em cache."):
+            get_calc_cache().clear()
+            get_statement_cache().clear()
             st.rerun()
 
 
@@ -1711,7 +1472,7 @@ def render_calculator_view(product_name: str):
             unsafe_allow_html=True,
         )
     # Tabs
-    tab1, tab2, tab3 = st.tabs(["Mercado Livre", "Amazon", "Shopee"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Mercado Livre", "Amazon", "Shopee", "📦 Lote (Catálogo)"])
 
     with tab1:
         tab_mercado_livre(fixed, product_name)
@@ -1719,10 +1480,16 @@ def render_calculator_view(product_name: str):
         tab_amazon(fixed, product_name)
     with tab3:
         tab_shopee(fixed, product_name)
+    with tab4:
+        tab_batch(fixed)
         
     # Saved Simulations Section
     render_saved_simulations()
 
+    # Cache counters, only with ?debug=1 in the URL
+    if st.query_params.get("debug") == "1":
+        render_cache_debug()
+
     # Footer
     # Footer -> Moved to main()
 
@@ -1730,113 +1497,13 @@ def render_calculator_view(product_name: str):
 
 def parse_pdf(uploaded_file):
     """Parses a PDF file and returns a DataFrame with Description and Value."""
-    data = []
-    with pdfplumber.open(uploaded_file) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if not text:
-                continue
-            
-            lines = text.split('\n')
-            for line in lines:
-                line_lower = line.lower()
-                
-                # 1. BLOCKLIST: Ignore headers, footers, and summary lines
-                ignore_terms = [
-                    "saldo", "limite", "período", "visualização", "extrato", 
-                    "lançamentos", "agência", "conta:", "banco", "itaú", 
-                    "uniclass", "total", "s a l d o", "automático", "provisão"
-                ]
-                if any(term in line_lower for term in ignore_terms):
-                    continue
-                
-                # 2. DATE REQUIREMENT: Transactions must have a date (DD/MM)
-                # This filters out random numbers or unrelated text
-                if not re.search(r'\d{2}/\d{2}', line):
-                    continue
-
-                # Heuristic: Find lines that end with a number (Value)
-                # Regex looks for common currency formats at the end of parts of the line
-                # It tries to find the last valid money pattern in the line
-                # Matches: 1.200,50 | 1200.50 | 50,00 | -50,00
-                
-                # Strategy: Split line by spaces, look from end for a value
-                parts = line.split()
-                if not parts:
-                    continue
-                
-                # Check the last few parts for a value
-                value_found = None
-                desc_parts = []
-                
-                # Traverse backwards to find the value
-                # We need to be careful about lines with multiple values (e.g. "R$ 0,00 R$ 100,00")
-                # Usually the last one is the transaction amount or balance.
-                # Use a specific regex to identify money-like tokens
-                # Matches: 1.200,00 | 1,200.00 | 50,00 | -50,00 | 50.00
-                
-                for i in range(len(parts) - 1, -1, -1):
-                    part = parts[i]
-                    # Clean part to check if float
-                    clean_part = part.replace('R$', '').replace('.', '').replace(',', '.')
-                    # Handle negative numbers
-                    if clean_part.startswith('-'):
-                        clean_part = clean_part[1:]
-                        
-                    # Basic digit check
-                    if clean_part.replace('.', '', 1).isdigit():
-                        try:
-                             val_str = part.replace('R$', '')
-                             # Heuristic for PT-BR (comma as decimal separator)
-                             # Valid formats: 1.000,00 | 100,00 | 0,50
-                             if ',' in val_str:
-                                 # If dot is also present, it must be before comma (1.000,00)
-                                 if '.' in val_str and val_str.find('.') > val_str.find(','):
-                                     continue # Invalid format like 1,000.00 (US) interpreted as PT-BR text? 
-                                     # Actually let's just support PT-BR for now as it's the context
-                                 
-                                 val_float = float(val_str.replace('.', '').replace(',', '.'))
-                             else:
-                                 # No comma. Could be 100 (int) or 100.00 (US).
-                                 # If it has a dot and it is at the end - 3, likely US.
-                                 # But if valid integer, assume integer.
-                                 val_float = float(val_str)
-                             
-                             # We already filtered headers, so if we found a value here, it's likely the transaction amount.
-                             value_found = val_float
-                             desc_parts = parts[:i]
-                             break
-                        except:
-                             continue
-                
-                if value_found is not None and desc_parts:
-                    description = " ".join(desc_parts)
-                    
-                    # Extra cleanup for description
-                    # Remove Date from start (DD/MM/YYYY or DD/MM)
-                    description = re.sub(r'^\d{2}/\d{2}(/\d{2,4})?', '', description).strip()
-                    
-                    # Ignore common useless lines
-                    desc_lower = description.lower()
-                    if desc_lower in ["saldo do dia", "saldo anterior", "s a l d o", "total", "saldo"]:
-                        continue
-                        
-                    # Filter out lines that are just a bunch of numbers/currencies
-                    # Example "R$ 0,00 R$ 100,00" -> Description becomes "R$ 0,00"
-                    
-                    # 1. Clean description of R$ and punctuation
-                    desc_clean = re.sub(r'[R$.%,-]', '', description).replace(' ', '')
-                    
-                    # 2. Count letters and digits in CLEAN description
-                    digits = sum(c.isdigit() for c in desc_clean)
-                    letters = sum(c.isalpha() for c in desc_clean)
-                    
-                    # If mostly numbers or very few letters, discard
-                    # Heuristic: < 3 real letters (excluding R$) OR mostly digits
-                    if letters < 3 or (digits > 4 and letters < 5): 
-                         continue
-                        
-                    data.append({"Descrição": description, "Valor": value_found})
+    progress_bar = st.progress(0.0, text="Lendo PDF...")
+
+    def report(done, total):
+        progress_bar.progress(done / total, text=f"Lendo página {done} de {total}...")
+
+    data = list(iter_pdf_transactions(uploaded_file, progress=report))
+    progress_bar.empty()
 
     if not data:
         return pd.DataFrame()
@@ -1844,7 +1511,173 @@ def parse_pdf(uploaded_file):
     return pd.DataFrame(data)
 
 
+def parse_csv(uploaded_file):
+    """Reads a bank CSV export in chunks, reporting throughput in rows/s."""
+    progress_bar = st.progress(0.0, text="Lendo CSV...")
+
+    def report(rows, fraction, elapsed):
+        rate = rows / elapsed if elapsed > 0 else 0
+        progress_bar.progress(fraction, text=f"{rows:,} linhas lidas ({rate:,.0f} linhas/s)...")
+
+    start = time.perf_counter()
+    df = read_statement_csv(uploaded_file, progress=report)
+    elapsed = time.perf_counter() - start
+    progress_bar.empty()
+
+    if elapsed > 0:
+        st.caption(f"CSV lido: {len(df):,} linhas em {elapsed:.2f}s ({len(df) / elapsed:,.0f} linhas/s)")
+    return df
+
+
+# Parsed statements are shared by every session on this server, keyed by the
+# hash of the uploaded bytes. Set STATEMENT_CACHE_DIR to spill evicted
+# frames to Parquet instead of dropping them.
+STATEMENT_CACHE_MAX_BYTES = 512 * 2**20
+
+
+@st.cache_resource
+def get_statement_cache() -> DataFrameCache:
+    return DataFrameCache(
+        STATEMENT_CACHE_MAX_BYTES, spill_dir=os.environ.get("STATEMENT_CACHE_DIR"), ttl_seconds=SHARED_CACHE_TTL
+    )
+
+
+def load_statement(uploaded_file, parse):
+    """Parse an uploaded statement once per content; reruns reuse the cached frame."""
+    key = content_key(uploaded_file.getvalue(), parse.__name__)
+    return get_statement_cache().get_or_compute(key, lambda: parse(uploaded_file))
+
+
+# Web lookups for 'Outros' descriptions, opt-in: they send transaction
+# descriptions to a search engine. ENRICHMENT_BACKEND is "off" (the
+# default), "ddgs", or "local:<mapping.json>" for an offline stand-in.
+ENRICHMENT_CACHE_DB = os.environ.get("ENRICHMENT_CACHE_DB", "enrichment_cache.sqlite")
+ENRICHMENT_MAX_LOOKUPS = 50
+
+
+@st.cache_resource
+def get_enrichment_cache() -> CategoryCache:
+    return CategoryCache(ENRICHMENT_CACHE_DB)
+
+
+@st.cache_resource
+def get_enrichment_backend():
+    return make_backend(os.environ.get("ENRICHMENT_BACKEND", "off"))
+
+
+# Who owns saved simulations and the ledger history. A logged-in user (when
+# [auth] is configured in .streamlit/secrets.toml) is keyed by e-mail.
+# Otherwise WORKSPACE_ID puts every visitor of a single-tenant deployment in
+# one shared workspace; without it each browser gets a random token kept in
+# the page URL (?w=...), so reloading or bookmarking the page reopens the
+# same data. Anyone with that link sees it, like a password.
+WORKSPACE_ID = os.environ.get("WORKSPACE_ID", "").strip()
+OWNER_QUERY_PARAM = "w"
+_OWNER_TOKEN_RE = re.compile(r"^[0-9a-f]{32}$")
+# Browser-token data nobody added to for this many days is deleted at startup (0 keeps it)
+ANONYMOUS_RETENTION_DAYS = float(os.environ.get("ANONYMOUS_RETENTION_DAYS", "90"))
+
+
+def purge_anonymous_owners(store):
+    """Drop data no visitor can reach any more: stale browser tokens, and per-session keys from older versions."""
+    store.purge("session:")
+    if ANONYMOUS_RETENTION_DAYS > 0:
+        store.purge("browser:", time.time() - ANONYMOUS_RETENTION_DAYS * 86400)
+
+
+# Consolidated history of analyzed statements (see ledger.LedgerStore)
+LEDGER_DB = os.environ.get("LEDGER_DB", "ledger.sqlite")
+
+
+@st.cache_resource
+def get_ledger_store() -> LedgerStore:
+    store = LedgerStore(LEDGER_DB)
+    purge_anonymous_owners(store)
+    return store
+
+
+# Saved calculator simulations (see simulations.SimulationStore)
+SIMULATIONS_DB = os.environ.get("SIMULATIONS_DB", "simulations.sqlite")
+
+
+@st.cache_resource
+def get_simulation_store() -> SimulationStore:
+    store = SimulationStore(SIMULATIONS_DB)
+    purge_anonymous_owners(store)
+    return store
+
+
+def current_owner() -> str:
+    """Key that scopes saved simulations and the ledger: the logged-in user, the workspace, or this browser's token."""
+    if st.user.get("is_logged_in") and st.user.get("email"):
+        return f"user:{st.user['email']}"
+    if WORKSPACE_ID:
+        return f"workspace:{WORKSPACE_ID}"
+    token = st.query_params.get(OWNER_QUERY_PARAM, "")
+    if not _OWNER_TOKEN_RE.match(token):
+        token = uuid.uuid4().hex
+        st.query_params[OWNER_QUERY_PARAM] = token
+    return f"browser:{token}"
+
+
+def get_simulation_buffer() -> SimulationBuffer:
+    """In-memory columnar copy of the current owner's stored simulations, kept per session.
+
+    Rebuilt from the store when the owner's records changed elsewhere
+    (e.g. the same user saving from another tab).
+    """
+    store = get_simulation_store()
+    owner = current_owner()
+    version = store.version(owner)
+    cached = st.session_state.get("simulation_buffer")
+    if cached is None or cached[0] != owner or cached[1] != version:
+        cached = (owner, version, SimulationBuffer.from_store(store, owner))
+        st.session_state["simulation_buffer"] = cached
+    return cached[2]
+
+
+@st.cache_resource(max_entries=16)
+def get_rule_engine(rules_json: bytes) -> RuleEngine:
+    """Compile a client's rule file once per content."""
+    return RuleEngine.from_json(io.BytesIO(rules_json))
+
+
+def load_statements(uploaded_files) -> pd.DataFrame:
+    """Parse several statements in parallel into one normalized frame, with per-file timings."""
+    key = content_key(b"".join(content_key(f.getvalue(), f.name).encode() for f in uploaded_files), "multi")
+    timings = []
+
+    def parse():
+        progress_bar = st.progress(0.0, text=f"Lendo {len(uploaded_files)} arquivos...")
+
+        def report(done, total):
+            progress_bar.progress(done / total, text=f"{done} de {total} arquivos lidos...")
+
+        start = time.perf_counter()
+        df, file_timings = parse_statement_files(uploaded_files, progress=report)
+        progress_bar.empty()
+        timings.extend(file_timings)
+        timings.append({"name": "Total", "rows": len(df), "seconds": time.perf_counter() - start, "error": None})
+        return df
+
+    df = get_statement_cache().get_or_compute(key, parse)
+    if timings:
+        st.dataframe(
+            pd.DataFrame(timings).rename(columns={"name": "Arquivo", "rows": "Linhas", "seconds": "Tempo (s)", "error": "Erro"}),
+            use_container_width=True,
+            hide_index=True,
+        )
+        for t in timings:
+            if t["error"]:
+                st.warning(f"Não foi possível ler {t['name']}: {t['error']}")
+    else:
+        st.caption(f"{len(uploaded_files)} arquivos já lidos anteriormente (cache).")
+    return df
+
+
 def render_financial_view():
+    import plotly.express as px
+
     st.markdown("## 📂 Organização Financeira")
     st.info("Faça upload de uma planilha (CSV) para análise de gastos com IA.")
 
@@ -1857,7 +1690,7 @@ def render_financial_view():
             if st.button("🔄 Converter PDF em CSV"):
                 with st.spinner("Lendo documento com inteligência de padrões..."):
                     try:
-                        df_converted = parse_pdf(pdf_to_convert)
+                        df_converted = load_statement(pdf_to_convert, parse_pdf)
                         
                         if not df_converted.empty:
                             st.success(f"Sucesso! Encontrei {len(df_converted)} transações.")
@@ -1879,58 +1712,48 @@ def render_financial_view():
 
     # 1. Main Analysis Upload
     st.divider()
-    uploaded_file = st.file_uploader("Upload CSV ou PDF Financeiro para Análise", type=["csv", "pdf"])
+    uploaded_files = st.file_uploader(
+        "Upload CSV ou PDF Financeiro para Análise",
+        type=["csv", "pdf"],
+        accept_multiple_files=True,
+        help="Envie vários extratos de uma vez (ex: 12 meses); eles são lidos em paralelo e analisados juntos.",
+    )
+    uploaded_file = uploaded_files[0] if len(uploaded_files or []) == 1 else None
+    enrich_unknowns = st.checkbox(
+        "🌐 Buscar na web a categoria de transações 'Outros'",
+        value=False,
+        disabled=get_enrichment_backend() is None,
+        help="Envia as descrições das transações 'Outros' a um buscador externo (ENRICHMENT_BACKEND). "
+        "Resultados ficam em cache local; descrições já consultadas não são buscadas de novo.",
+    )
+    save_to_history = st.checkbox(
+        "🗄️ Adicionar ao histórico consolidado",
+        value=False,
+        help="Guarda as transações analisadas no seu histórico local. Lançamentos já importados são ignorados; "
+        "lançamentos iguais (data, descrição e valor) dentro do mesmo extrato são mantidos.",
+    )
+    rules_file = st.file_uploader(
+        "Regras de categorização do cliente (JSON, opcional)",
+        type=["json"],
+        key="category_rules",
+        help="Lista de regras por palavra-chave, regex, faixa de valor ou contraparte. Sem arquivo, usa as categorias padrão.",
+    )
     
     
-    if uploaded_file:
+    if uploaded_files:
+        upload_key = tuple((f.name, f.size) for f in uploaded_files)
         try:
-            if uploaded_file.name.endswith('.csv'):
-                # Smart CSV Loader
+            if uploaded_file is None:
+                df = load_statements(uploaded_files)
+            elif uploaded_file.name.endswith('.csv'):
                 try:
-                    # 1. Read first few lines to find the header
-                    # Common bank columns
-                    COMMON_HEADERS = [
-                        "data", "date", "lançamento", "historico", "descrição", "description", 
-                        "valor", "amount", "value", "saldo", "balance", "documento"
-                    ]
-                    
-                    # Read only start of file to detect format
-                    content = uploaded_file.getvalue().decode("utf-8", errors="ignore")
-                    lines = content.split('\n')
-                    
-                    skip_rows = 0
-                    sep = ','
-                    found_header = False
-                    
-                    for i, line in enumerate(lines[:20]): # Check first 20 lines
-                        line_lower = line.lower()
-                        # Count matches of common headers in this line
-                        matches = sum(1 for h in COMMON_HEADERS if h in line_lower)
-                        
-                        if matches >= 2: # At least 2 known columns found
-                            skip_rows = i
-                            found_header = True
-                            # Detect separator
-                            if ';' in line:
-                                sep = ';'
-                            else:
-                                sep = ','
-                            break
-                    
-                    if not found_header:
-                        # Fallback: Try reading normally with python engine to handle bad lines
-                        uploaded_file.seek(0)
-                        df = pd.read_csv(uploaded_file, sep=None, engine='python', on_bad_lines='skip')
-                    else:
-                        uploaded_file.seek(0)
-                        df = pd.read_csv(uploaded_file, skiprows=skip_rows, sep=sep, on_bad_lines='skip')
-                        
+                    df = load_statement(uploaded_file, parse_csv)
                 except Exception as e:
                     st.error(f"Não foi possível ler o CSV. Erro: {e}")
                     df = pd.DataFrame()
             elif uploaded_file.name.endswith('.pdf'):
                 with st.spinner("📄 Lendo PDF..."):
-                    df = parse_pdf(uploaded_file)
+                    df = load_statement(uploaded_file, parse_pdf)
                     if df.empty:
                         st.warning("Não consegui encontrar transações financeiras claras neste PDF.")
             else:
@@ -1944,9 +1767,7 @@ def render_financial_view():
                 # Normalize columns to find 'Description' and 'Value'
                 cols = [c.lower() for c in df.columns]
                 
-                desc_col = next((c for c in df.columns if "desc" in c.lower() or "nome" in c.lower() or "empresa" in c.lower() or "historico" in c.lower()), None)
-                val_col = next((c for c in df.columns if "valor" in c.lower() or "value" in c.lower() or "amount" in c.lower() or "preço" in c.lower()), None)
-                date_col = next((c for c in df.columns if "data" in c.lower() or "date" in c.lower() or "dt" in c.lower() or "periodo" in c.lower()), None)
+                desc_col, val_col, date_col = find_statement_columns(df.columns)
                 
                 if not desc_col or not val_col:
                     st.error("Não foi possível identificar automaticamente as colunas de 'Descrição' e 'Valor'. Verifique se o CSV tem cabeçalhos como 'Descrição', 'Empresa', 'Valor', 'Amount'.")
@@ -1976,91 +1797,66 @@ def render_financial_view():
                     
                     # ─── DATA ANALYSIS & PROCESSING ───
                     
-                    # 1. Categorization Logic (Define FIRST to use in filtering)
-                    def categorize(desc):
-                        desc = str(desc).lower()
-                        # Investments ( Broader list)
-                        investment_keywords = [
-                            'cdb', 'lci', 'lca', 'tesouro', 'selic', 'ipca', 
-                            'aplicacao', 'aplic', 'poupanca', 'b3', 'bm&f', 
-                            'corretora', 'fundo', 'ativo', 'investimento', 'aporte',
-                            'banco inter', 'nu invest', 'clear', 'rico', 'xp', 'btg', 'genial', 'modal', 'easynvest', 'orama',
-                            'cripto', 'binance', 'bitcoin', 'btc', 'eth', 'avenue', 'nomad',
-                            'fii', 'acoes', 'dividendos', 'jcp', 'rendimento', 'proventos', 'custodia',
-                            'vgbl', 'pgbl', 'previdencia'
-                        ]
-                        if any(x in desc for x in investment_keywords):
-                            return 'Investimento'
-                        if any(x in desc for x in ['facebook', 'google', 'ads', 'anuncio', 'marketing', 'propaganda']):
-                            return 'Marketing'
-                        if any(x in desc for x in ['uber', '99', 'posto', 'gasolina', 'estacionamento', 'transporte']):
-                            return 'Transporte/Logística'
-                        if any(x in desc for x in ['aws', 'host', 'site', 'software', 'ferramenta', 'adobe', 'chatgpt', 'openai']):
-                            return 'Software/Serviços'
-                        if any(x in desc for x in ['imposto', 'das', 'darf', 'inss', 'simples', 'guia', 'tributo']):
-                            return 'Impostos'
-                        if any(x in desc for x in ['ifood', 'restaurante', 'cafe', 'almoco', 'jantar', 'mercado']):
-                            return 'Alimentação'
-                        if any(x in desc for x in ['salario', 'prolabore', 'funcionario', 'pagamento', 'folha']):
-                            return 'Pessoal'
-                        return 'Outros'
-
-                    df['Categoria'] = df[desc_col].apply(categorize)
+                    # 1. Categorization (Define FIRST to use in filtering)
+                    if rules_file:
+                        try:
+                            engine = get_rule_engine(rules_file.getvalue())
+                        except ValueError as e:
+                            st.error(f"Arquivo de regras inválido: {e}")
+                            engine = None
+                    else:
+                        engine = None
+
+                    if engine is not None:
+                        counterparty_col = next((c for c in df.columns if "contraparte" in c.lower() or "favorecido" in c.lower()), None)
+                        df['Categoria'] = engine.categorize_frame(df, desc_col, val_col, counterparty_col)
+                        with st.expander("⏱️ Perfil das Regras", expanded=False):
+                            st.dataframe(
+                                engine.last_stats.rename(columns={"rule": "Regra", "category": "Categoria", "hits": "Acertos", "seconds": "Tempo (ms)"})
+                                .assign(**{"Tempo (ms)": lambda t: t["Tempo (ms)"] * 1000})
+                                .style.format({"Tempo (ms)": "{:,.2f}"}),
+                                use_container_width=True,
+                                hide_index=True,
+                            )
+                    else:
+                        df['Categoria'] = categorize_series(df[desc_col])
 
                     # ─── AUTOMATIC WEB ENRICHMENT ───
                     # Analyze 'Outros' to find better categories
-                    unknowns = df[df['Categoria'] == 'Outros'][desc_col].unique()
-                    
-                    if DDGS and len(unknowns) > 0:
-                        st.info("⚠️ Busca automática na Web desativada temporariamente para correção de erro.")
-                        # TODO: Reimplement safely
-                        pass
-
-                    # 2. Separate Groups
-                    # Income: > 0
-                    df_income = df[df[val_col] > 0].copy()
-                    
-                    # Outflows: < 0
-                    df_outflows = df[df[val_col] < 0].copy()
-                    
-                    # Split Outflows into Expenses vs Investments
-                    df_investment = df_outflows[df_outflows['Categoria'] == 'Investimento'].copy()
-                    df_expense = df_outflows[df_outflows['Categoria'] != 'Investimento'].copy()
-                    
-                    # 3. Calculations
-                    total_income = df_income[val_col].sum()
-                    
-                    # Total actually spent (burned)
-                    total_expense = df_expense[val_col].abs().sum()
-                    
-                    # Total saved/invested
-                    total_invested = df_investment[val_col].abs().sum()
-                    
-                    # Balance (Cash Flow: Income - All Outflows)
-                    # Note: From a cash flow perspective, money left the account so it affects the immediate balance.
-                    # But for "Wealth" perspective, it's still yours.
-                    # Let's show "Saldo em Conta" (Cash flow) and "Resultado Operacional" (Income - Expenses)
-                    
-                    total_outflow = total_expense + total_invested
-                    
-                    # Balance Definitions
-                    # Saldo Operacional: Income - Actual Expenses (This is what the user calls "Positivo")
-                    balance = total_income - total_expense 
-                    
-                    # Liquid Balance: What is actually left in the checking account after investing
-                    liquid_balance = total_income - (total_expense + total_invested)
-                    
-                    # Aggregations for Expenses (visuals)
-                    category_totals = df_expense.groupby('Categoria')[val_col].sum().abs().reset_index().sort_values(by=val_col, ascending=False)
-                    
-                    # Find Biggest Expense (excluding investments)
-                    if not df_expense.empty:
-                        biggest_expense_row = df_expense.loc[df_expense[val_col].idxmin()] # min because it's negative
-                        biggest_expense_name = biggest_expense_row[desc_col]
-                        biggest_expense_val = abs(biggest_expense_row[val_col])
-                    else:
-                        biggest_expense_name = "N/A"
-                        biggest_expense_val = 0
+                    unknowns = df.loc[df['Categoria'] == 'Outros', desc_col].dropna().unique()
+
+                    backend = get_enrichment_backend()
+                    if enrich_unknowns and backend is not None and len(unknowns) > 0:
+                        enricher = Enricher(backend, get_enrichment_cache(), max_lookups=ENRICHMENT_MAX_LOOKUPS)
+                        with st.spinner(f"🌐 Buscando categorias para {len(unknowns)} descrições desconhecidas..."):
+                            found = enricher.enrich(unknowns)
+                        if found:
+                            is_unknown = df['Categoria'] == 'Outros'
+                            df.loc[is_unknown, 'Categoria'] = df.loc[is_unknown, desc_col].map(found).fillna('Outros')
+                        stats = enricher.stats()
+                        st.caption(
+                            f"🌐 Enriquecimento: {len(found)} de {len(unknowns)} descrições categorizadas · "
+                            f"cache nesta análise: {stats['hits']} acertos / {stats['misses']} faltas ({stats['hit_rate'] * 100:.0f}%) · "
+                            f"{stats['requests']} consultas, {stats['errors']} falhas"
+                        )
+
+                    if save_to_history:
+                        added = get_ledger_store().append(current_owner(), df, date_col, desc_col, val_col, source=", ".join(f.name for f in uploaded_files))
+                        st.caption(
+                            f"🗄️ Histórico: {added['inserted']:,} novas transações, {added['duplicates']:,} já existentes"
+                            + (f" · meses recalculados: {', '.join(m or 'sem data' for m in added['months'])}" if added["months"] else "")
+                        )
+
+                    # 2. Aggregations (single pass, no filtered copies)
+                    summary = summarize_ledger(df, desc_col, val_col)
+                    total_income = summary["total_income"]
+                    total_expense = summary["total_expense"]
+                    total_invested = summary["total_invested"]
+                    balance = summary["balance"]
+                    liquid_balance = summary["liquid_balance"]
+                    category_totals = summary["category_totals"]
+                    biggest_expense_name, biggest_expense_val = summary["biggest_expense"]
+                    rows = summary["rows"]
 
                     # ─── ANALYST NARRATIVE GENERATION ───
                     st.divider()
@@ -2123,9 +1919,8 @@ def render_financial_view():
                          c_chart, c_table = st.columns([2, 1])
                          
                          with c_chart:
-                            # Create Top 10 Expenses DataFrame
-                            top_expenses = df_expense.sort_values(by=val_col, ascending=True).head(10) # ascending=True because values are negative
-                            top_expenses[val_col] = top_expenses[val_col].abs() # Make positive for chart
+                            # Top 10 Expenses, already positive for the chart
+                            top_expenses = summary["top_expenses"]
                             
                             fig = px.bar(
                                 top_expenses, 
@@ -2185,9 +1980,9 @@ def render_financial_view():
                     tab_in, tab_out, tab_inv = st.tabs(["🟢 Entradas", "🔴 Despesas", "📈 Investimentos"])
                     
                     with tab_in:
-                        if not df_income.empty:
+                        if len(rows["income"]):
                             st.dataframe(
-                                df_income[[date_col, desc_col, val_col]].rename(columns={date_col: "Data", desc_col: "Descrição", val_col: "Valor"}).style.format({"Valor": "R$ {:,.2f}"}),
+                                select_rows(df, rows["income"], [date_col, desc_col, val_col]).rename(columns={date_col: "Data", desc_col: "Descrição", val_col: "Valor"}).style.format({"Valor": "R$ {:,.2f}"}),
                                 use_container_width=True,
                                 hide_index=True
                             )
@@ -2195,9 +1990,9 @@ def render_financial_view():
                             st.info("Nenhuma entrada registrada.")
                             
                     with tab_out:
-                        if not df_expense.empty:
+                        if len(rows["expense"]):
                             st.dataframe(
-                                df_expense[[date_col, desc_col, 'Categoria', val_col]].rename(columns={date_col: "Data", desc_col: "Descrição", val_col: "Valor"}).sort_values(by="Valor", ascending=True).style.format({"Valor": "R$ {:,.2f}"}),
+                                select_rows(df, rows["expense"], [date_col, desc_col, 'Categoria', val_col]).rename(columns={date_col: "Data", desc_col: "Descrição", val_col: "Valor"}).sort_values(by="Valor", ascending=True).style.format({"Valor": "R$ {:,.2f}"}),
                                 use_container_width=True,
                                 hide_index=True
                             )
@@ -2205,10 +2000,10 @@ def render_financial_view():
                             st.info("Nenhuma despesa registrada.")
 
                     with tab_inv:
-                         if not df_investment.empty:
+                         if len(rows["investment"]):
                             st.success(f"Total Investido: R$ {total_invested:,.2f}")
                             st.dataframe(
-                                df_investment[[date_col, desc_col, val_col]].rename(columns={date_col: "Data", desc_col: "Descrição", val_col: "Valor"}).style.format({"Valor": "R$ {:,.2f}"}),
+                                select_rows(df, rows["investment"], [date_col, desc_col, val_col]).rename(columns={date_col: "Data", desc_col: "Descrição", val_col: "Valor"}).style.format({"Valor": "R$ {:,.2f}"}),
                                 use_container_width=True,
                                 hide_index=True
                             )
@@ -2216,22 +2011,122 @@ def render_financial_view():
                             st.info("Nenhum investimento identificado neste período.")
 
 
-                    # ─── EXPORT BUTTON ───
-                    st.divider()
-                    csv_export = df.to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        label="💾 Baixar Planilha Formatada",
-                        data=csv_export,
-                        file_name="financeiro_organizado.csv",
-                        mime="text/csv",
-                        type="primary"
-                    )
+                    # ─── EXPORT SOURCE ───
+                    # Files are built by render_ledger_exports on request, which
+                    # stays on screen when the "Preparar" click reruns the page
+                    st.session_state["ledger_export_source"] = (upload_key, df, date_col, desc_col, val_col)
+
+            render_ledger_exports(upload_key)
         except Exception as e:
             st.error(f"Erro ao processar arquivo: {e}")
 
+    render_ledger_history()
+
+
+def render_ledger_exports(upload_key):
+    """Download buttons for the last analysis of the current upload.
+
+    Writing the CSV, Parquet and Arrow files costs as much as the analysis, so
+    they are built on request and kept until the analyzed rows change.
+    """
+    source = st.session_state.get("ledger_export_source")
+    if source is None or source[0] != upload_key:
+        return
+    _, df, date_col, desc_col, val_col = source
+    export_key = content_key(
+        pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes(), *df.columns, date_col, desc_col, val_col
+    )
+    exports = st.session_state.get("ledger_exports")
+    if exports is not None and exports[0] != export_key:
+        exports = None
+
+    st.divider()
+    e1, e2, e3 = st.columns(3)
+    if exports is None:
+        with e1:
+            if st.button("⬇️ Preparar downloads", key="ledger_prepare_exports"):
+                with st.spinner("Gerando arquivos..."):
+                    files = {"csv": write_csv(df)}
+                    if columnar_exports_available():
+                        ledger = ledger_table(df, date_col, desc_col, val_col, date_format="%d/%m/%Y")
+                        for fmt in ("parquet", "arrow"):
+                            files[fmt] = write_table(ledger, fmt)
+                exports = st.session_state["ledger_exports"] = (export_key, files)
+    if exports is not None:
+        files = exports[1]
+        with e1:
+            st.download_button(
+                label="💾 Baixar Planilha Formatada",
+                data=files["csv"],
+                file_name="financeiro_organizado.csv",
+                mime="text/csv",
+                type="primary"
+            )
+        for col, fmt, label in ((e2, "parquet", "📦 Baixar Parquet"), (e3, "arrow", "🏹 Baixar Arrow")):
+            if fmt in files:
+                extension, mime = EXPORT_FORMATS[fmt]
+                with col:
+                    st.download_button(
+                        label=label,
+                        data=files[fmt],
+                        file_name=f"financeiro_organizado{extension}",
+                        mime=mime,
+                    )
+
+
+def render_ledger_history():
+    """Consolidated history of every statement added to the ledger store."""
+    import plotly.express as px
+
+    store = get_ledger_store()
+    owner = current_owner()
+    months = [m for m in store.months(owner) if m]
+    if not months:
+        return
+
+    st.divider()
+    with st.expander(f"🗄️ Histórico Consolidado ({months[0]} a {months[-1]})", expanded=False):
+        if len(months) > 1:
+            start, end = st.select_slider("Período", options=months, value=(months[0], months[-1]), key="ledger_period")
+        else:
+            start = end = months[0]
+        summary = store.summary(owner, start, end)
+
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("💰 Receitas", f"R$ {summary['total_income']:,.2f}")
+        k2.metric("💸 Despesas", f"R$ {summary['total_expense']:,.2f}")
+        k3.metric("📈 Investido", f"R$ {summary['total_invested']:,.2f}")
+        k4.metric("⚖️ Superávit/Saldo", f"R$ {summary['balance']:,.2f}", delta=f"Em conta: R$ {summary['liquid_balance']:,.2f}")
+
+        per_month = summary["per_month"].reindex(columns=["income", "expense", "investment"], fill_value=0.0).abs()
+        per_month = per_month.rename(columns={"income": "Receitas", "expense": "Despesas", "investment": "Investimentos"})
+        fig = px.bar(
+            per_month.reset_index(),
+            x="month",
+            y=["Receitas", "Despesas", "Investimentos"],
+            barmode="group",
+            color_discrete_map={"Receitas": "#636EFA", "Despesas": "#EF553B", "Investimentos": "#00CC96"},
+            title="Evolução Mensal",
+        )
+        fig.update_layout(xaxis_title=None, yaxis_title="Valor (R$)", legend_title=None)
+        st.plotly_chart(fig, use_container_width=True)
+
+        if not summary["category_totals"].empty:
+            st.dataframe(
+                summary["category_totals"].rename(columns={"category": "Categoria", "total": "Valor"}).style.format({"Valor": "R$ {:,.2f}"}),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+        if st.button("🗑️ Limpar Histórico", key="clear_ledger", help="Apaga somente o seu histórico."):
+            store.clear(owner)
+            st.rerun()
+
 
 
 def render_chat_view():
+    import google.generativeai as genai
+
     st.markdown("## 💬 Chat Financeiro (IA)")
     
     # 1. API Key Setup (Hardcoded as requested)
@@ -2379,6 +2274,13 @@ def render_chat_view():
 
 
 def main():
+    st.set_page_config(
+        page_title="Calculadora de Lucro | Marketplace",
+        page_icon="💰",
+        layout="wide",
+        initial_sidebar_state="collapsed",
+    )
+
     inject_css()
     
     if "current_view" not in st.session_state:
@@ -0,0 +1,153 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+# Load test for the pricing API (api.py): concurrent keep-alive clients
+# replaying single-SKU and batch requests, reporting latency percentiles
+# and throughput. Starts its own uvicorn server unless --url is given.
+
+# Marketplace options sent with every request
+PLATFORM_OPTIONS = {
+    "mercado_livre": {"ad_type": "Clássico"},
+    "amazon": {"logistics": "dba"},
+    "shopee": {"seller_type": "CPF", "free_shipping": False},
+}
+
+
+def synthetic_items(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "sku": f"SKU-{seed}-{i}",
+            "cost": round(rng.uniform(2, 400), 2),
+            "category": "Outros",
+            "shipping_cost": round(rng.uniform(0, 35), 2),
+            "tax_pct": rng.choice([0.0, 4.0, 6.0, 10.0]),
+            "desired_margin_pct": rng.choice([5.0, 10.0, 15.0, 20.0]),
+        }
+        for i in range(count)
+    ]
+
+
+def worker(url, requests, latencies, errors):
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=120)
+    for path, body in requests:
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            conn.close()
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=120)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run(url: str, name: str, requests: list, concurrency: int, skus_per_request: int):
+    per_client = [requests[i::concurrency] for i in range(concurrency)]
+    latencies, errors = [], []
+    threads = [threading.Thread(target=worker, args=(url, chunk, latencies, errors)) for chunk in per_client]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    done = len(latencies)
+    print(
+        f"{name:<22} {done:>6} req  {done / elapsed:>9,.1f} req/s  {done * skus_per_request / elapsed:>11,.0f} SKUs/s"
+        f"  p50 {np.percentile(ms, 50):>8.1f} ms  p99 {np.percentile(ms, 99):>8.1f} ms"
+        + (f"  {len(errors)} erros" if errors else "")
+    )
+
+
+def wait_ready(url: str, server, seconds: float = 30.0):
+    parsed = urlparse(url)
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        if server is not None and server.poll() is not None:
+            sys.exit("uvicorn saiu antes de ficar pronto")
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit(f"{url} não respondeu em {seconds:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API de precificação")
+    parser.add_argument("--url", help="API já em execução (padrão: sobe uvicorn local)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--server-workers", type=int, default=1, help="processos uvicorn (--workers)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="requisições de 1 SKU")
+    parser.add_argument("--batches", type=int, default=40, help="requisições em lote")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--platform", default="mercado_livre", choices=sorted(PLATFORM_OPTIONS))
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api:app", "--port", str(args.port),
+             "--workers", str(args.server_workers), "--log-level", "warning"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    try:
+        wait_ready(url, server)
+        path = f"/v1/price/{args.platform}"
+        options = PLATFORM_OPTIONS[args.platform]
+
+        singles = [
+            (path, json.dumps({**item, **options}))
+            for item in synthetic_items(args.requests, seed=1)
+        ]
+        batches = [
+            (path, json.dumps({"items": synthetic_items(args.batch_size, seed=100 + i), "defaults": options}))
+            for i in range(args.batches)
+        ]
+        # Ranked by profit at a common sale price per SKU
+        best = [
+            ("/v1/best", json.dumps({
+                "items": [{**item, "sale_price": round(item["cost"] * 1.8, 2)}
+                          for item in synthetic_items(args.batch_size, seed=200 + i)],
+                "metric": "profit",
+            }))
+            for i in range(max(1, args.batches // 4))
+        ]
+
+        print(f"{url}  concorrência {args.concurrency}  plataforma {args.platform}")
+        run(url, "1 SKU", singles, args.concurrency, 1)
+        run(url, f"lote {args.batch_size:,} SKUs", batches, args.concurrency, args.batch_size)
+        run(url, f"melhor canal {args.batch_size:,}", best, args.concurrency, args.batch_size)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
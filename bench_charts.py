@@ -0,0 +1,198 @@
+import base64
+import json
+import math
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from charts import CHART_LAYOUT, UNITS_PER_DAY, build_breakeven_chart, build_comparison_chart, build_projection_chart
+
+RUNS = 200
+
+
+def legacy_build_projection_chart(profit_per_unit, title, color_gradient):
+    """Projection chart as it was built in app.py, kept as the baseline."""
+    monthly = [profit_per_unit * u * 30 for u in UNITS_PER_DAY]
+    labels = [f"{u} vendas/dia" for u in UNITS_PER_DAY]
+    colors = [color_gradient[0] if val >= 0 else "#ff4d6a" for val in monthly]
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=labels,
+            y=monthly,
+            marker=dict(color=colors, cornerradius=8, line=dict(width=0)),
+            text=[f"R$ {v:,.2f}" for v in monthly],
+            textposition="outside",
+            textfont=dict(size=12, color="#e0e0e0"),
+            hovertemplate="<b>%{x}</b><br>Lucro mensal: R$ %{y:,.2f}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=dict(text=title, font=dict(size=16, color="#fff"), x=0, xanchor="left"),
+        height=380,
+        **CHART_LAYOUT,
+    )
+    return fig
+
+
+def legacy_build_comparison_chart(profit_without, profit_with):
+    """Comparison chart as it was built in app.py, kept as the baseline."""
+    monthly_without = [profit_without * u * 30 for u in UNITS_PER_DAY]
+    monthly_with = [profit_with * u * 30 for u in UNITS_PER_DAY]
+    labels = [f"{u}/dia" for u in UNITS_PER_DAY]
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            name="Sem despesas fixas",
+            x=labels,
+            y=monthly_without,
+            marker=dict(color="rgba(0, 210, 140, 0.85)", cornerradius=6),
+            hovertemplate="<b>Sem desp. fixas</b><br>%{x}: R$ %{y:,.2f}<extra></extra>",
+        )
+    )
+    fig.add_trace(
+        go.Bar(
+            name="Com despesas fixas",
+            x=labels,
+            y=monthly_with,
+            marker=dict(color="rgba(0, 150, 255, 0.85)", cornerradius=6),
+            hovertemplate="<b>Com desp. fixas</b><br>%{x}: R$ %{y:,.2f}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=dict(
+            text="📊 Comparativo: Com vs Sem Despesas Fixas (Lucro Mensal)",
+            font=dict(size=16, color="#fff"),
+            x=0,
+            xanchor="left",
+        ),
+        barmode="group",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1,
+            font=dict(size=12, color="#ccc"),
+            bgcolor="rgba(0,0,0,0)",
+        ),
+        height=400,
+        **CHART_LAYOUT,
+    )
+    return fig
+
+
+def legacy_build_breakeven_chart(fixed_costs, contribution_margin):
+    """Break-even chart as it was built in app.py, kept as the baseline."""
+    if contribution_margin <= 0:
+        return None
+
+    breakeven_units = fixed_costs / contribution_margin
+    max_units = max(int(breakeven_units * 2), 50)
+    step = max(1, max_units // 20)
+    units_range = list(range(0, max_units + step, step))
+    profits = [(contribution_margin * u) - fixed_costs for u in units_range]
+    colors = ["#ff453a" if p < 0 else "#30d158" for p in profits]
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=units_range,
+            y=profits,
+            mode="lines+markers",
+            line=dict(color="#0a84ff", width=3),
+            marker=dict(size=6, color=colors, line=dict(color="#fff", width=1)),
+            name="Lucro Líquido",
+            hovertemplate="<b>%{x} vendas</b><br>Lucro: R$ %{y:,.2f}<extra></extra>",
+        )
+    )
+    fig.add_hline(
+        y=0,
+        line_dash="dash",
+        line_color="rgba(255,255,255,0.3)",
+        annotation_text="Ponto de Equilíbrio",
+        annotation_position="bottom right",
+    )
+    fig.add_vline(
+        x=breakeven_units,
+        line_dash="dot",
+        line_color="#ffd60a",
+        annotation_text=f"Breakeven: {int(math.ceil(breakeven_units))} un.",
+        annotation_position="top left",
+    )
+    fig.update_layout(
+        title=dict(
+            text=f"🎯 Ponto de Equilíbrio: {int(math.ceil(breakeven_units))} vendas/mês",
+            font=dict(size=16, color="#fff"),
+            x=0,
+            xanchor="left",
+        ),
+        xaxis_title="Quantidade de Vendas",
+        yaxis_title="Lucro Líquido (R$)",
+        height=400,
+        **CHART_LAYOUT,
+    )
+    return fig
+
+
+def _plain(value):
+    # Plotly serializes NumPy arrays as {"dtype", "bdata"}; lists stay lists
+    if isinstance(value, dict):
+        if value.keys() == {"dtype", "bdata"}:
+            return np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"]).tolist()
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def figure_json(fig) -> dict:
+    """Figure JSON with arrays as plain lists and projection labels in one form.
+
+    The legacy projection formats its labels in Python (`text`); the
+    template lets the browser do it (`texttemplate`). The Python labels
+    are checked against the same format before being dropped.
+    """
+    spec = _plain(json.loads(fig.to_json()))
+    for trace in spec["data"]:
+        if "text" in trace:
+            assert trace.pop("text") == [f"R$ {v:,.2f}" for v in trace["y"]]
+            trace["texttemplate"] = "R$ %{y:,.2f}"
+    return spec
+
+
+CASES = {
+    "projection": (
+        lambda i: legacy_build_projection_chart(12.5 - i * 0.1, "📈 Projeção de Lucro", ["#30d158"]),
+        lambda i: build_projection_chart(12.5 - i * 0.1, "📈 Projeção de Lucro", ["#30d158"]),
+    ),
+    "comparison": (
+        lambda i: legacy_build_comparison_chart(12.5 - i * 0.1, 8.0 - i * 0.1),
+        lambda i: build_comparison_chart(12.5 - i * 0.1, 8.0 - i * 0.1),
+    ),
+    "breakeven": (
+        lambda i: legacy_build_breakeven_chart(1500.0 + i, 12.5),
+        lambda i: build_breakeven_chart(1500.0 + i, 12.5),
+    ),
+}
+
+
+def time_ms(build) -> float:
+    start = time.perf_counter()
+    for i in range(RUNS):
+        build(i)
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+if __name__ == "__main__":
+    print(f"Média por gráfico em {RUNS} execuções:")
+    print(f"{'gráfico':<12}{'antes (ms)':>12}{'depois (ms)':>13}{'ganho':>8}")
+    for name, (legacy, build) in CASES.items():
+        for i in (0, 50, 125, RUNS - 1):
+            assert figure_json(legacy(i)) == figure_json(build(i)), (name, i)
+        before = time_ms(legacy)
+        after = time_ms(build)
+        print(f"{name:<12}{before:>12.2f}{after:>13.2f}{before / after:>7.1f}x")
@@ -0,0 +1,96 @@
+import random
+import re
+import time
+
+from statements import IGNORE_DESCRIPTIONS, parse_statement_line
+
+LINES = 200_000
+
+WORDS = ["PIX", "TRANSF", "PAGAMENTO", "MERCADO", "UBER", "IFOOD", "Supermercado", "Posto", "TED", "Aluguel", "Energia"]
+
+
+def legacy_parse_statement_line(line: str):
+    """Line parser as it was before the compiled tokenizer, kept as the baseline."""
+    line_lower = line.lower()
+    ignore_terms = [
+        "saldo", "limite", "período", "visualização", "extrato",
+        "lançamentos", "agência", "conta:", "banco", "itaú",
+        "uniclass", "total", "s a l d o", "automático", "provisão"
+    ]
+    if any(term in line_lower for term in ignore_terms):
+        return None
+    if not re.search(r'\d{2}/\d{2}', line):
+        return None
+
+    parts = line.split()
+    value_found = None
+    desc_parts = []
+    for i in range(len(parts) - 1, -1, -1):
+        part = parts[i]
+        clean_part = part.replace('R$', '').replace('.', '').replace(',', '.')
+        if clean_part.startswith('-'):
+            clean_part = clean_part[1:]
+        if clean_part.replace('.', '', 1).isdigit():
+            try:
+                val_str = part.replace('R$', '')
+                if ',' in val_str:
+                    if '.' in val_str and val_str.find('.') > val_str.find(','):
+                        continue
+                    val_float = float(val_str.replace('.', '').replace(',', '.'))
+                else:
+                    val_float = float(val_str)
+                value_found = val_float
+                desc_parts = parts[:i]
+                break
+            except ValueError:
+                continue
+
+    if value_found is None or not desc_parts:
+        return None
+
+    description = re.sub(r'^\d{2}/\d{2}(/\d{2,4})?', '', " ".join(desc_parts)).strip()
+    if description.lower() in IGNORE_DESCRIPTIONS:
+        return None
+    desc_clean = re.sub(r'[R$.%,-]', '', description).replace(' ', '')
+    digits = sum(c.isdigit() for c in desc_clean)
+    letters = sum(c.isalpha() for c in desc_clean)
+    if letters < 3 or (digits > 4 and letters < 5):
+        return None
+    return description, value_found
+
+
+def synthetic_statement(n: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        date = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}"
+        desc = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        value = rng.uniform(-5000, 5000)
+        pt_br = f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        kind = rng.random()
+        if kind < 0.1:
+            lines.append(f"SALDO DO DIA {pt_br}")
+        elif kind < 0.2:
+            lines.append(f"{date} R$ 0,00 R$ {pt_br}")
+        elif kind < 0.3:
+            lines.append(f"{date} {desc} {value:.2f}")
+        else:
+            lines.append(f"{date} {desc} {pt_br}")
+    return lines
+
+
+def lines_per_second(parse, lines: list[str]) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        parse(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+lines = synthetic_statement(LINES)
+assert [legacy_parse_statement_line(l) for l in lines] == [parse_statement_line(l) for l in lines]
+
+before = lines_per_second(legacy_parse_statement_line, lines)
+after = lines_per_second(parse_statement_line, lines)
+print(f"{LINES} linhas sintéticas")
+print(f"antes:  {before:>12,.0f} linhas/s")
+print(f"depois: {after:>12,.0f} linhas/s ({after / before:.1f}x)")
@@ -0,0 +1,347 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+# ─────────────────────────────────────────────────────────────
+# SHARED COMPUTATION CACHE
+# ─────────────────────────────────────────────────────────────
+def estimate_size(obj, _seen=None) -> int:
+    """Approximate bytes held by `obj`, counting shared sub-objects once.
+
+    Understands DataFrames/Series (deep memory usage), NumPy arrays,
+    Plotly figures and the usual containers; anything else counts as its
+    sys.getsizeof.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if hasattr(obj, "memory_usage"):
+        # pandas: a Series of per-column bytes for frames, an int otherwise
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if hasattr(obj, "nbytes") and hasattr(obj, "dtype"):
+        return int(obj.nbytes)
+    if hasattr(obj, "_data") and hasattr(obj, "_layout"):
+        # Plotly figure: its trace and layout property dicts
+        return estimate_size(obj._data, _seen) + estimate_size(obj._layout, _seen)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen) for item in obj)
+    return size
+
+
+class SharedCache:
+    """Process-wide cache for computed values, bounded by bytes and age.
+
+    Meant to be created once per server (st.cache_resource) and shared by
+    every session. Entries are evicted least-recently-used once their
+    combined estimate_size exceeds `max_bytes`, and expire `ttl_seconds`
+    after being computed. Concurrent misses on the same key compute it
+    once; the other callers wait for that result. Values are returned
+    as stored, so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, ttl_seconds: float | None = 3600.0, sizeof=estimate_size):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.expired = 0
+        self._data = OrderedDict()  # key -> [value, bytes, created, last_used, hits]
+        self._bytes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return self._live(key) is not None
+
+    def _live(self, key):
+        """Entry for `key` unless expired, in which case it is dropped (lock held)."""
+        entry = self._data.get(key)
+        if entry is not None and self.ttl_seconds is not None and time.time() - entry[2] > self.ttl_seconds:
+            self._drop(key)
+            self.expired += 1
+            return None
+        return entry
+
+    def _drop(self, key):
+        self._bytes -= self._data.pop(key)[1]
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, calling `compute()` on a miss."""
+        while True:
+            with self._lock:
+                entry = self._live(key)
+                if entry is not None:
+                    self.hits += 1
+                    entry[3] = time.time()
+                    entry[4] += 1
+                    self._data.move_to_end(key)
+                    return entry[0]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._pending[key] = threading.Event()
+                    break
+            # Another session is computing this key; reuse its result
+            pending.wait()
+
+        try:
+            value = compute()
+            size = self.sizeof(value)
+            with self._lock:
+                now = time.time()
+                self._data[key] = [value, size, now, now, 0]
+                self._bytes += size
+                # Keep at least the newest entry even if it alone exceeds the budget
+                while self._bytes > self.max_bytes and len(self._data) > 1:
+                    self._drop(next(iter(self._data)))
+                    self.evicted += 1
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evicted = self.expired = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._data),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+    def entries(self) -> list:
+        """One dict per entry, least recently used first: key, bytes, hits, age and idle seconds."""
+        now = time.time()
+        with self._lock:
+            return [
+                {"key": key, "bytes": size, "hits": hits, "age": now - created, "idle": now - last_used}
+                for key, (_, size, created, last_used, hits) in self._data.items()
+            ]
+
+
+# ─────────────────────────────────────────────────────────────
+# PARSED STATEMENT CACHE
+# ─────────────────────────────────────────────────────────────
+def content_key(data: bytes, *parts) -> str:
+    """Stable key for an uploaded file: SHA-256 of its bytes plus optional tags."""
+    digest = hashlib.sha256(data)
+    for part in parts:
+        digest.update(b"\0" + str(part).encode())
+    return digest.hexdigest()
+
+
+class DataFrameCache:
+    """Content-addressed DataFrame cache bounded by memory footprint.
+
+    Entries are evicted least-recently-used once their combined
+    `memory_usage(deep=True)` exceeds `max_bytes`. With a `spill_dir`, evicted
+    frames are written there as Parquet (needs pyarrow) and read back on the
+    next hit; the spill directory is itself capped at `max_spill_bytes`.
+    With `ttl_seconds`, a frame is reparsed once that long has passed since
+    it was cached. Callers get a copy, so mutating the result never alters
+    the cache.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, spill_dir: str | None = None, max_spill_bytes: int = 2 * 2**30,
+                 ttl_seconds: float | None = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._created = {}
+        self._entry_hits = {}
+        self._bytes = 0
+        self._spilled = OrderedDict()
+        self._spilled_bytes = 0
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data or key in self._spilled
+
+    def get_or_compute(self, key: str, compute):
+        """Return a copy of the frame cached under `key`, calling `compute()` on a miss."""
+        with self._lock:
+            if key in self._created and self.ttl_seconds is not None:
+                if time.time() - self._created[key] > self.ttl_seconds:
+                    self._expire(key)
+            df = self._data.get(key)
+            if df is not None:
+                self.hits += 1
+                self._entry_hits[key] += 1
+                self._data.move_to_end(key)
+                return df.copy()
+            df = self._load_spilled(key)
+            if df is not None:
+                self.spill_hits += 1
+                evicted = self._store(key, df)
+            else:
+                self.misses += 1
+        if df is not None:
+            self._spill(evicted)
+            return df.copy()
+
+        # Parse outside the lock so other sessions are not blocked meanwhile
+        df = compute()
+        evicted = []
+        with self._lock:
+            if key not in self._data:
+                if key in self._spilled:
+                    # Spilled by another session while this one was parsing
+                    self._drop_spilled(key)
+                self._created[key] = time.time()
+                evicted = self._store(key, df)
+        self._spill(evicted)
+        return df.copy()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._spilled):
+                self._drop_spilled(key)
+            self._data.clear()
+            self._sizes.clear()
+            self._created.clear()
+            self._entry_hits.clear()
+            self._bytes = 0
+            self.hits = self.spill_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.spill_hits + self.misses
+        return {
+            "hits": self.hits,
+            "spill_hits": self.spill_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.spill_hits) / lookups if lookups else 0.0,
+            "size": len(self._data),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "spilled": len(self._spilled),
+            "spilled_bytes": self._spilled_bytes,
+        }
+
+    def entries(self) -> list:
+        """One dict per in-memory frame, least recently used first: key, bytes, hits and age in seconds."""
+        now = time.time()
+        with self._lock:
+            return [
+                {"key": key, "bytes": self._sizes[key], "hits": self._entry_hits[key], "age": now - self._created[key]}
+                for key in self._data
+            ]
+
+    def _store(self, key: str, df) -> list:
+        """Cache `df` under `key` (lock held); returns the evicted (key, frame) pairs to spill."""
+        size = int(df.memory_usage(deep=True).sum())
+        self._data[key] = df
+        self._sizes[key] = size
+        self._created.setdefault(key, time.time())
+        self._entry_hits.setdefault(key, 0)
+        self._bytes += size
+        evicted = []
+        # Keep at least the newest entry even if it alone exceeds the budget
+        while self._bytes > self.max_bytes and len(self._data) > 1:
+            old_key, old_df = self._data.popitem(last=False)
+            self._bytes -= self._sizes.pop(old_key)
+            self._entry_hits.pop(old_key)
+            if self.spill_dir and old_key not in self._spilled:
+                evicted.append((old_key, old_df))
+            elif old_key not in self._spilled:
+                self._created.pop(old_key)
+        return evicted
+
+    def _expire(self, key: str):
+        """Forget `key` in memory and on disk (lock held)."""
+        if key in self._data:
+            del self._data[key]
+            self._bytes -= self._sizes.pop(key)
+            self._entry_hits.pop(key)
+        if key in self._spilled:
+            self._drop_spilled(key)
+        self._created.pop(key, None)
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.parquet")
+
+    def _spill(self, evicted: list):
+        """Write evicted frames as Parquet without holding the lock, then index them."""
+        for key, df in evicted:
+            path = self._spill_path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                df.to_parquet(tmp)
+            except (ImportError, ValueError, TypeError, OSError):
+                # No pyarrow, or a frame Parquet cannot represent: just drop it
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                tmp = None
+            with self._lock:
+                # Cleared or expired, cached again or already spilled while writing
+                if tmp is None or key not in self._created or key in self._data or key in self._spilled:
+                    if tmp is not None:
+                        os.remove(tmp)
+                    if key not in self._data and key not in self._spilled:
+                        self._created.pop(key, None)
+                    continue
+                os.replace(tmp, path)
+                size = os.path.getsize(path)
+                self._spilled[key] = size
+                self._spilled_bytes += size
+                while self._spilled_bytes > self.max_spill_bytes and self._spilled:
+                    old_key = next(iter(self._spilled))
+                    self._drop_spilled(old_key)
+                    self._created.pop(old_key, None)
+
+    def _load_spilled(self, key: str):
+        if key not in self._spilled:
+            return None
+        import pandas as pd
+
+        try:
+            df = pd.read_parquet(self._spill_path(key))
+        except (ImportError, ValueError, OSError):
+            df = None
+            self._created.pop(key, None)
+        self._drop_spilled(key)
+        return df
+
+    def _drop_spilled(self, key: str):
+        self._spilled_bytes -= self._spilled.pop(key)
+        try:
+            os.remove(self._spill_path(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,317 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from pricing import AMAZON, MERCADO_LIVRE, SHOPEE
+from pricing_batch import evaluate_batch, price_batch
+from statements import CSV_CHUNK_ROWS, CSV_SNIFF_BYTES, sniff_csv
+
+
+# ─────────────────────────────────────────────────────────────
+# SKU CATALOGS
+# ─────────────────────────────────────────────────────────────
+# Canonical column -> accepted headers (compared lowercased and stripped)
+CATALOG_ALIASES = {
+    "sku": ("sku", "codigo", "código", "produto", "product", "nome"),
+    "cost": ("cost", "custo", "preço de custo", "preco de custo"),
+    "category": ("category", "categoria"),
+    "weight_g": ("weight_g", "weight", "peso", "peso (g)", "peso_g"),
+    "shipping_cost": ("shipping_cost", "shipping", "frete"),
+    "tax_pct": ("tax_pct", "tax", "imposto", "imposto (%)"),
+    "desired_margin_pct": ("desired_margin_pct", "margin", "margem", "margem (%)"),
+    "extra_cost": ("extra_cost", "extra", "custo extra", "embalagem"),
+    "sale_price": ("sale_price", "price", "preço de venda", "preco de venda", "preço", "preco", "venda"),
+}
+
+CATALOG_DEFAULTS = {
+    "category": "Outros",
+    "weight_g": 0.0,
+    "shipping_cost": 0.0,
+    "tax_pct": 0.0,
+    "desired_margin_pct": 0.0,
+    "extra_cost": 0.0,
+}
+
+# Marketplace -> (short label, category table); a catalog may carry a
+# per-marketplace column such as "category_mercado_livre" next to "category"
+MARKETPLACES = {
+    "mercado_livre": ("ML", MERCADO_LIVRE["ad_types"]["Clássico"]),
+    "amazon": ("Amazon", AMAZON["categories"]),
+    "shopee": ("Shopee", SHOPEE["categories"]),
+}
+
+# Result columns kept per marketplace, with their display names
+RESULT_COLUMNS = {
+    "suggested_price": "Preço {}",
+    "profit": "Lucro {}",
+    "margin": "Margem {} (%)",
+    "roi": "ROI {} (%)",
+    "total_fees": "Taxas {}",
+}
+
+
+def read_catalog(uploaded, name: str | None = None) -> pd.DataFrame:
+    """Read a catalog upload (CSV or XLSX) into a raw DataFrame."""
+    name = (name or getattr(uploaded, "name", "")).lower()
+    if name.endswith((".xlsx", ".xls")):
+        # Needs openpyxl, an optional dependency
+        return pd.read_excel(uploaded)
+
+    uploaded.seek(0)
+    fmt = sniff_csv(uploaded.read(CSV_SNIFF_BYTES))
+    uploaded.seek(0)
+    return pd.read_csv(
+        uploaded, sep=fmt["sep"], skiprows=fmt["skiprows"], encoding=fmt["encoding"],
+        decimal=fmt["decimal"], thousands="." if fmt["decimal"] == "," else None, engine="c",
+    )
+
+
+def iter_catalog(source, name: str | None = None, chunk_rows: int = CSV_CHUNK_ROWS):
+    """Yield a catalog file (CSV or Parquet) as raw DataFrames of up to `chunk_rows` rows.
+
+    `source` is a binary file object; only one chunk is in memory at a
+    time. CSVs are sniffed as in read_catalog. Parquet needs pyarrow.
+    """
+    name = (name or getattr(source, "name", "")).lower()
+    if name.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+        return
+
+    source.seek(0)
+    fmt = sniff_csv(source.read(CSV_SNIFF_BYTES))
+    source.seek(0)
+    reader = pd.read_csv(
+        source, sep=fmt["sep"], skiprows=fmt["skiprows"], encoding=fmt["encoding"],
+        decimal=fmt["decimal"], thousands="." if fmt["decimal"] == "," else None, engine="c",
+        chunksize=chunk_rows,
+    )
+    with reader:
+        yield from reader
+
+
+def normalize_catalog(raw: pd.DataFrame) -> pd.DataFrame:
+    """Rename known headers to canonical columns, fill optional ones and coerce types.
+
+    Extra columns are kept, so per-marketplace category columns survive.
+    The sale price is optional and stays missing (NaN) where not given.
+    Raises ValueError when there is no cost column.
+    """
+    headers = {str(c).strip().lower(): c for c in raw.columns}
+    renames = {}
+    for canonical, aliases in CATALOG_ALIASES.items():
+        match = next((headers[a] for a in aliases if a in headers), None)
+        if match is not None and match not in renames:
+            renames[match] = canonical
+    df = raw.rename(columns=renames)
+    if "cost" not in df.columns:
+        raise ValueError("Catalog needs a cost column (cost/custo).")
+
+    if "sku" not in df.columns:
+        df["sku"] = np.arange(1, len(df) + 1).astype(str)
+    for column, default in CATALOG_DEFAULTS.items():
+        if column not in df.columns:
+            df[column] = default
+    for column in ("cost", "weight_g", "shipping_cost", "tax_pct", "desired_margin_pct", "extra_cost"):
+        df[column] = pd.to_numeric(df[column], errors="coerce").fillna(CATALOG_DEFAULTS.get(column, 0.0))
+    if "sale_price" in df.columns:
+        df["sale_price"] = pd.to_numeric(df["sale_price"], errors="coerce")
+    df["category"] = df["category"].fillna(CATALOG_DEFAULTS["category"]).astype(str).str.strip()
+    return df.reset_index(drop=True)
+
+
+def _marketplace_categories(catalog: pd.DataFrame, platform: str) -> tuple[pd.Series, int]:
+    """Category column for one marketplace, unknown names mapped to "Outros"; also the count remapped."""
+    column = f"category_{platform}"
+    categories = catalog[column] if column in catalog.columns else catalog["category"]
+    categories = categories.fillna("Outros").astype(str).str.strip()
+    known = categories.isin(MARKETPLACES[platform][1].keys())
+    return categories.where(known, "Outros"), int((~known).sum())
+
+
+def price_catalog(catalog: pd.DataFrame, ml_ad_type: str = "Clássico", ml_include_fixed_fee: bool = True,
+                  amazon_logistics: str = "fbm", shopee_seller_type: str = "CPF", shopee_free_shipping: bool = False,
+                  fixed_expenses_per_unit: float = 0.0, other_pct: float = 0.0) -> tuple[pd.DataFrame, dict]:
+    """Price every SKU of a normalized catalog on the three marketplaces.
+
+    One price_batch call per marketplace, so a 100k-SKU catalog is a few
+    array passes. Returns a wide frame (SKU, Categoria, Custo, then
+    RESULT_COLUMNS per marketplace) and, per marketplace, how many rows
+    fell back to the "Outros" category.
+    """
+    common = {
+        "cost": catalog["cost"],
+        "extra_cost": catalog["extra_cost"],
+        "shipping_cost": catalog["shipping_cost"],
+        "tax_pct": catalog["tax_pct"],
+        "desired_margin_pct": catalog["desired_margin_pct"],
+    }
+    specific = {
+        "mercado_livre": ({}, {"ad_type": ml_ad_type, "include_fixed_fee": ml_include_fixed_fee}),
+        "amazon": ({"weight_g": catalog["weight_g"]}, {"logistics": amazon_logistics}),
+        "shopee": ({}, {"seller_type": shopee_seller_type, "free_shipping": shopee_free_shipping}),
+    }
+
+    out = {"SKU": catalog["sku"], "Categoria": catalog["category"], "Custo": catalog["cost"]}
+    remapped = {}
+    for platform, (label, _) in MARKETPLACES.items():
+        columns, constants = specific[platform]
+        categories, remapped[platform] = _marketplace_categories(catalog, platform)
+        priced = price_batch(
+            pd.DataFrame({**common, **columns, "category": categories}),
+            platform,
+            fixed_expenses_per_unit=fixed_expenses_per_unit,
+            other_pct=other_pct,
+            **constants,
+        )
+        for key, title in RESULT_COLUMNS.items():
+            out[title.format(label)] = priced[key].to_numpy()
+    return pd.DataFrame(out), remapped
+
+
+def page_of(df: pd.DataFrame, sort_by: str | None, ascending: bool, page: int, page_size: int) -> pd.DataFrame:
+    """One page of `df` after sorting by `sort_by`, without sorting or copying the whole frame.
+
+    The sort is an argsort of one column; only the page's rows are taken.
+    """
+    if sort_by:
+        values = df[sort_by].to_numpy()
+        order = np.argsort(values, kind="stable")
+        if not ascending:
+            order = order[::-1]
+    else:
+        order = np.arange(len(df))
+    return df.take(order[page * page_size:(page + 1) * page_size])
+
+
+def catalog_template() -> bytes:
+    """Example catalog CSV with every recognized column."""
+    example = pd.DataFrame({
+        "sku": ["FONE-001", "CAPA-002"],
+        "cost": [45.90, 8.50],
+        "category": ["Eletrônicos", "Outros"],
+        "weight_g": [250, 80],
+        "shipping_cost": [19.90, 0.0],
+        "tax_pct": [6.0, 6.0],
+        "desired_margin_pct": [20.0, 25.0],
+        "extra_cost": [2.0, 0.5],
+        "sale_price": [99.90, 29.90],
+    })
+    buffer = io.BytesIO()
+    example.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+# ─────────────────────────────────────────────────────────────
+# BEST MARKETPLACE
+# ─────────────────────────────────────────────────────────────
+# Every channel x option combination compared per SKU, in tie-break order
+CHANNELS = (
+    ("ML Clássico", "mercado_livre", {"ad_type": "Clássico", "include_fixed_fee": True}),
+    ("ML Clássico sem taxa fixa", "mercado_livre", {"ad_type": "Clássico", "include_fixed_fee": False}),
+    ("ML Premium", "mercado_livre", {"ad_type": "Premium", "include_fixed_fee": True}),
+    ("ML Premium sem taxa fixa", "mercado_livre", {"ad_type": "Premium", "include_fixed_fee": False}),
+    ("Amazon FBM", "amazon", {"logistics": "fbm"}),
+    ("Amazon DBA", "amazon", {"logistics": "dba"}),
+    ("Shopee", "shopee", {"free_shipping": False}),
+    ("Shopee Frete Grátis", "shopee", {"free_shipping": True}),
+)
+
+# "price" ranks by the lowest price reaching the SKU's target margin; the
+# others rank every channel at the SKU's own sale price
+OPTIMIZE_METRICS = {"price": "Preço", "profit": "Lucro", "margin": "Margem (%)", "roi": "ROI (%)"}
+
+CHANNEL_RESULTS = ("suggested_price", "profit", "margin", "roi")
+
+
+def evaluate_channels(catalog: pd.DataFrame, shopee_seller_type: str = "CPF", fixed_expenses_per_unit: float = 0.0,
+                      other_pct: float = 0.0, at_sale_price: bool = False) -> dict:
+    """Price every SKU of a normalized catalog on every entry of CHANNELS.
+
+    By default each channel gets the price that reaches the SKU's target
+    margin (price_batch). With `at_sale_price`, every channel is evaluated
+    at the catalog's sale_price column instead (evaluate_batch), so their
+    profits are comparable. The combinations of one marketplace are
+    stacked into a single frame (the catalog repeated once per option
+    set), so the whole evaluation is one batch call per marketplace.
+    Returns {result key: array of shape (SKUs, channels)} for each key in
+    CHANNEL_RESULTS; "suggested_price" is the sale price when evaluated at it.
+    """
+    n = len(catalog)
+    base = {
+        "cost": catalog["cost"].to_numpy(dtype=float),
+        "extra_cost": catalog["extra_cost"].to_numpy(dtype=float),
+        "shipping_cost": catalog["shipping_cost"].to_numpy(dtype=float),
+        "tax_pct": catalog["tax_pct"].to_numpy(dtype=float),
+        "desired_margin_pct": catalog["desired_margin_pct"].to_numpy(dtype=float),
+        "weight_g": catalog["weight_g"].to_numpy(dtype=float),
+    }
+    if at_sale_price:
+        base["sale_price"] = catalog["sale_price"].to_numpy(dtype=float)
+    run = evaluate_batch if at_sale_price else price_batch
+    out = {key: np.empty((n, len(CHANNELS))) for key in CHANNEL_RESULTS}
+
+    for platform in MARKETPLACES:
+        slots = [i for i, (_, p, _) in enumerate(CHANNELS) if p == platform]
+        k = len(slots)
+        categories, _ = _marketplace_categories(catalog, platform)
+        stacked = {name: np.tile(values, k) for name, values in base.items()}
+        stacked["category"] = np.tile(categories.to_numpy(dtype=object), k)
+        # Option columns: block j of the stacked frame carries channel slots[j]'s options
+        for option in CHANNELS[slots[0]][2]:
+            stacked[option] = np.repeat([CHANNELS[i][2][option] for i in slots], n)
+        priced = run(
+            pd.DataFrame(stacked),
+            platform,
+            seller_type=shopee_seller_type,
+            fixed_expenses_per_unit=fixed_expenses_per_unit,
+            other_pct=other_pct,
+        )
+        for key in CHANNEL_RESULTS:
+            out[key][:, slots] = priced[key].to_numpy().reshape(k, n).T
+    return out
+
+
+def best_marketplace(catalog: pd.DataFrame, metric: str = "price", **options) -> pd.DataFrame:
+    """Best channel per SKU by `metric` ("price", "profit", "margin" or "roi").
+
+    "price" picks the channel with the lowest price that still reaches the
+    SKU's target margin. The other metrics compare every channel at the
+    same price, the catalog's sale_price, and raise ValueError if some SKU
+    has none. Options go to evaluate_channels. The result has the best
+    channel and its price, profit, margin and ROI, the runner-up channel
+    and by how much the winner beats it (R$ cheaper for "price"). Ties go
+    to the channel listed first in CHANNELS.
+    """
+    if metric not in OPTIMIZE_METRICS:
+        raise ValueError(f"Unknown metric {metric!r}. Use one of {sorted(OPTIMIZE_METRICS)}.")
+    if metric == "price":
+        results = evaluate_channels(catalog, **options)
+        scores = -results["suggested_price"]
+    else:
+        missing = len(catalog) if "sale_price" not in catalog.columns else int(catalog["sale_price"].isna().sum())
+        if missing:
+            raise ValueError(f"Ranking by {metric} needs a sale price (sale_price/preço de venda); "
+                             f"{missing:,} SKUs have none.")
+        results = evaluate_channels(catalog, at_sale_price=True, **options)
+        scores = results[metric]
+    rows = np.arange(len(catalog))
+
+    # Stable descending order per row: best first, runner-up second
+    order = np.argsort(-scores, axis=1, kind="stable")
+    best, second = order[:, 0], order[:, 1]
+    names = np.array([name for name, _, _ in CHANNELS], dtype=object)
+
+    return pd.DataFrame({
+        "SKU": catalog["sku"].to_numpy(),
+        "Melhor Canal": names[best],
+        "Preço": results["suggested_price"][rows, best],
+        "Lucro": results["profit"][rows, best],
+        "Margem (%)": results["margin"][rows, best],
+        "ROI (%)": results["roi"][rows, best],
+        "2º Canal": names[second],
+        f"Vantagem ({OPTIMIZE_METRICS[metric]})": scores[rows, best] - scores[rows, second],
+    })
@@ -0,0 +1,301 @@
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# ─────────────────────────────────────────────────────────────
+# TRANSACTION CATEGORIES
+# ─────────────────────────────────────────────────────────────
+# Checked in this order: a description matching keywords of several
+# categories gets the first one listed
+CATEGORY_KEYWORDS = (
+    ("Investimento", (
+        "cdb", "lci", "lca", "tesouro", "selic", "ipca",
+        "aplicacao", "aplic", "poupanca", "b3", "bm&f",
+        "corretora", "fundo", "ativo", "investimento", "aporte",
+        "banco inter", "nu invest", "clear", "rico", "xp", "btg", "genial", "modal", "easynvest", "orama",
+        "cripto", "binance", "bitcoin", "btc", "eth", "avenue", "nomad",
+        "fii", "acoes", "dividendos", "jcp", "rendimento", "proventos", "custodia",
+        "vgbl", "pgbl", "previdencia",
+    )),
+    ("Marketing", ("facebook", "google", "ads", "anuncio", "marketing", "propaganda")),
+    ("Transporte/Logística", ("uber", "99", "posto", "gasolina", "estacionamento", "transporte")),
+    ("Software/Serviços", ("aws", "host", "site", "software", "ferramenta", "adobe", "chatgpt", "openai")),
+    ("Impostos", ("imposto", "das", "darf", "inss", "simples", "guia", "tributo")),
+    ("Alimentação", ("ifood", "restaurante", "cafe", "almoco", "jantar", "mercado")),
+    ("Pessoal", ("salario", "prolabore", "funcionario", "pagamento", "folha")),
+)
+
+DEFAULT_CATEGORY = "Outros"
+
+
+class KeywordCategorizer:
+    """Substring keyword categorizer compiled into one regex.
+
+    Every keyword list becomes one capture group of a single alternation,
+    in precedence order, wrapped in a lookahead so the regex is tried at
+    every position of the description without consuming it. At any position
+    the leftmost group that matches is the highest-precedence keyword
+    starting there, so the lowest group index over all positions is exactly
+    the first category (in `rules` order) with a keyword anywhere in the text.
+    """
+
+    def __init__(self, rules=CATEGORY_KEYWORDS, default: str = DEFAULT_CATEGORY):
+        self.categories = [category for category, _ in rules]
+        self.default = default
+        groups = "|".join(
+            "(" + "|".join(map(re.escape, keywords)) + ")"
+            for _, keywords in rules
+        )
+        self._pattern = re.compile(f"(?=(?:{groups}))")
+
+    def categorize(self, description) -> str:
+        """Category of one description (case-insensitive substring match)."""
+        best = None
+        for match in self._pattern.finditer(str(description).lower()):
+            if best is None or match.lastindex < best:
+                best = match.lastindex
+                if best == 1:
+                    break
+        return self.default if best is None else self.categories[best - 1]
+
+    def categorize_series(self, descriptions: pd.Series) -> pd.Series:
+        """Categorize a column, matching each distinct description only once."""
+        codes, uniques = pd.factorize(descriptions)
+        labels = np.array([self.categorize(desc) for desc in uniques] + [self.default], dtype=object)
+        # factorize marks missing values with -1, which picks the trailing default
+        return pd.Series(labels[codes], index=descriptions.index, name="Categoria")
+
+
+_default_categorizer = KeywordCategorizer()
+
+
+def categorize(description) -> str:
+    """Category of one description with the built-in keyword lists."""
+    return _default_categorizer.categorize(description)
+
+
+def categorize_series(descriptions: pd.Series) -> pd.Series:
+    """Categorize a description column with the built-in keyword lists."""
+    return _default_categorizer.categorize_series(descriptions)
+
+
+# ─────────────────────────────────────────────────────────────
+# RULE ENGINE
+# ─────────────────────────────────────────────────────────────
+RULE_KEYS = frozenset(["name", "category", "keywords", "regex", "min_value", "max_value", "counterparty"])
+
+
+def _normalize_name(name) -> str:
+    return " ".join(str(name).lower().split())
+
+
+class CategoryRule:
+    """One categorization rule; every condition it sets must hold.
+
+    - keywords: any of these substrings in the lowercased description
+    - regex: pattern searched in the description, case-insensitive
+    - min_value / max_value: inclusive bounds on the transaction value
+    - counterparty: one or more names, compared case- and space-insensitively
+      with the counterparty column (or the description when there is none)
+    """
+
+    __slots__ = ("name", "category", "keywords", "regex", "min_value", "max_value", "counterparties")
+
+    def __init__(self, category: str, name: str | None = None, keywords=(), regex: str | None = None,
+                 min_value: float | None = None, max_value: float | None = None, counterparty=None):
+        if not category:
+            raise ValueError("A rule needs a category.")
+        self.category = category
+        self.name = name or category
+        self.keywords = tuple(str(k).lower() for k in keywords)
+        try:
+            self.regex = re.compile(regex, re.IGNORECASE) if regex else None
+        except re.error as e:
+            raise ValueError(f"Rule {self.name!r}: invalid regex: {e}") from None
+        self.min_value = None if min_value is None else float(min_value)
+        self.max_value = None if max_value is None else float(max_value)
+        if isinstance(counterparty, str):
+            counterparty = [counterparty]
+        self.counterparties = frozenset(_normalize_name(c) for c in counterparty or ())
+        if not (self.keywords or self.regex or self.counterparties
+                or self.min_value is not None or self.max_value is not None):
+            raise ValueError(f"Rule {self.name!r} has no conditions.")
+
+    def __repr__(self) -> str:
+        return f"CategoryRule({self.name!r} -> {self.category!r})"
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "CategoryRule":
+        unknown = set(spec) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Unknown rule keys: {', '.join(sorted(unknown))}")
+        return cls(**spec)
+
+
+class RuleEngine:
+    """Ordered rule set compiled once and evaluated over whole DataFrames.
+
+    The first rule (in file order) whose conditions all hold decides a
+    row's category. Text conditions run on distinct descriptions only: each
+    rule's keywords are compiled into one alternation, searched once per
+    distinct description (rules with the same keywords share it),
+    counterparties are a dict from normalized name to rules, and each
+    rule's regex runs only on descriptions of rows no earlier rule has
+    claimed. Value bounds are NumPy comparisons.
+
+    Keyword hits are kept per rule rather than read from one shared regex:
+    a rule can fail on its value bounds, and a later rule with the same (or
+    an overlapping) keyword must still see the description as a match.
+
+    After each `categorize_frame` call, `last_stats` holds per-rule hits and
+    seconds, plus the shared index passes as rows named "<index: ...>".
+    """
+
+    def __init__(self, rules, default: str = DEFAULT_CATEGORY):
+        self.rules = [rule if isinstance(rule, CategoryRule) else CategoryRule.from_dict(rule) for rule in rules]
+        self.default = default
+        self.last_stats = None
+
+        # Keyword rule -> column of the hit matrix; one column per distinct keyword set
+        self._keyword_column = {}
+        self._keyword_patterns = []
+        columns = {}
+        for i, rule in enumerate(self.rules):
+            if rule.keywords:
+                key = frozenset(rule.keywords)
+                if key not in columns:
+                    columns[key] = len(self._keyword_patterns)
+                    self._keyword_patterns.append(re.compile("|".join(map(re.escape, rule.keywords))))
+                self._keyword_column[i] = columns[key]
+
+        self._counterparty_index = {}
+        for i, rule in enumerate(self.rules):
+            for name in rule.counterparties:
+                self._counterparty_index.setdefault(name, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __repr__(self) -> str:
+        return f"RuleEngine({len(self)} rules, default={self.default!r})"
+
+    @classmethod
+    def from_keywords(cls, rules=CATEGORY_KEYWORDS, default: str = DEFAULT_CATEGORY) -> "RuleEngine":
+        """Engine equivalent to KeywordCategorizer over the same keyword lists."""
+        return cls([CategoryRule(category, keywords=keywords) for category, keywords in rules], default)
+
+    @classmethod
+    def from_json(cls, source) -> "RuleEngine":
+        """Load a rule set from a JSON path or file object.
+
+        The file holds {"default": "Outros", "rules": [{...}, ...]} or just the
+        list of rules, each a dict with a "category" and any of the keys
+        documented in CategoryRule.
+        """
+        import json
+
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, encoding="utf-8") as f:
+                spec = json.load(f)
+        else:
+            spec = json.load(source)
+        if isinstance(spec, list):
+            spec = {"rules": spec}
+        return cls(spec.get("rules", []), spec.get("default", DEFAULT_CATEGORY))
+
+    def _keyword_matrix(self, uniques) -> np.ndarray:
+        """Boolean (distinct description x keyword set) hits, one search per pair."""
+        lowered = [str(desc).lower() for desc in uniques]
+        hits = np.zeros((len(uniques), len(self._keyword_patterns)), dtype=bool)
+        for col, pattern in enumerate(self._keyword_patterns):
+            search = pattern.search
+            hits[:, col] = [search(desc) is not None for desc in lowered]
+        return hits
+
+    def _counterparty_rules(self, uniques) -> list:
+        """For each distinct counterparty, the set of rules naming it."""
+        index = self._counterparty_index
+        return [frozenset(index.get(_normalize_name(name), ())) for name in uniques]
+
+    def categorize_frame(self, df: pd.DataFrame, description: str, value: str | None = None,
+                         counterparty: str | None = None) -> pd.Series:
+        """Category of every row of `df`, with profiling left in `last_stats`."""
+        n = len(df)
+        stats = []
+
+        def timed(name, category, run):
+            start = time.perf_counter()
+            hits = run()
+            stats.append({"rule": name, "category": category, "hits": hits, "seconds": time.perf_counter() - start})
+
+        desc_codes, desc_uniques = pd.factorize(df[description])
+        values = None
+        if value is not None:
+            values = pd.to_numeric(df[value], errors="coerce").to_numpy(dtype=float)
+
+        keyword_hits = None
+        if self._keyword_patterns:
+            def build_keywords():
+                nonlocal keyword_hits
+                keyword_hits = self._keyword_matrix(desc_uniques)
+                return int(keyword_hits.any(axis=1).sum())
+            timed("<index: keywords>", "", build_keywords)
+
+        cp_codes = cp_rules = None
+        if self._counterparty_index:
+            def build_counterparties():
+                nonlocal cp_codes, cp_rules
+                if counterparty is not None:
+                    cp_codes, cp_uniques = pd.factorize(df[counterparty])
+                else:
+                    cp_codes, cp_uniques = desc_codes, desc_uniques
+                cp_rules = self._counterparty_rules(cp_uniques)
+                return sum(1 for rules in cp_rules if rules)
+            timed("<index: counterparties>", "", build_counterparties)
+
+        # Rule index of the row, len(rules) for "no rule yet"; -1 codes are missing descriptions
+        assigned = np.full(n, len(self.rules), dtype=np.intp)
+        open_rows = np.ones(n, dtype=bool)
+
+        for i, rule in enumerate(self.rules):
+            def apply_rule(i=i, rule=rule):
+                mask = open_rows.copy()
+                if rule.keywords:
+                    col = keyword_hits[:, self._keyword_column[i]]
+                    mask &= (desc_codes >= 0) & col[desc_codes]
+                if rule.regex is not None and mask.any():
+                    # Only the distinct descriptions still in play
+                    candidates = np.unique(desc_codes[mask & (desc_codes >= 0)])
+                    matched = np.zeros(len(desc_uniques) + 1, dtype=bool)
+                    search = rule.regex.search
+                    matched[candidates] = [search(str(desc_uniques[c])) is not None for c in candidates]
+                    mask &= matched[desc_codes]
+                if rule.counterparties:
+                    names = np.array([i in rules for rules in cp_rules] + [False])
+                    mask &= names[cp_codes]
+                if rule.min_value is not None or rule.max_value is not None:
+                    if values is None:
+                        mask[:] = False
+                    else:
+                        if rule.min_value is not None:
+                            mask &= values >= rule.min_value
+                        if rule.max_value is not None:
+                            mask &= values <= rule.max_value
+                assigned[mask] = i
+                open_rows[mask] = False
+                return int(mask.sum())
+
+            timed(rule.name, rule.category, apply_rule)
+            if not open_rows.any():
+                # Later rules cannot claim anything; still list them in the stats
+                stats.extend({"rule": r.name, "category": r.category, "hits": 0, "seconds": 0.0}
+                             for r in self.rules[i + 1:])
+                break
+
+        self.last_stats = pd.DataFrame(stats, columns=["rule", "category", "hits", "seconds"])
+        labels = np.array([rule.category for rule in self.rules] + [self.default], dtype=object)
+        return pd.Series(labels[assigned], index=df.index, name="Categoria")
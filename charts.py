@@ -0,0 +1,295 @@
+import copy
+import functools
+import math
+
+import numpy as np
+import plotly.graph_objects as go
+
+
+# ─────────────────────────────────────────────────────────────
+# CHART BUILDERS
+# ─────────────────────────────────────────────────────────────
+CHART_LAYOUT = dict(
+    paper_bgcolor="rgba(0,0,0,0)",
+    plot_bgcolor="rgba(0,0,0,0)",
+    font=dict(family="Inter, SF Pro Display, -apple-system, sans-serif", color="#e0e0e0", size=13),
+    margin=dict(l=20, r=20, t=40, b=40),
+    xaxis=dict(
+        showgrid=False,
+        showline=False,
+        zeroline=False,
+        tickfont=dict(size=12, color="#a0a0a0"),
+    ),
+    yaxis=dict(
+        showgrid=True,
+        gridcolor="rgba(255,255,255,0.06)",
+        showline=False,
+        zeroline=False,
+        tickfont=dict(size=12, color="#a0a0a0"),
+        tickprefix="R$ ",
+    ),
+    hoverlabel=dict(
+        bgcolor="rgba(30,30,40,0.95)",
+        bordercolor="rgba(255,255,255,0.1)",
+        font_size=13,
+        font_color="#fff",
+    ),
+    bargap=0.35,
+)
+
+UNITS_PER_DAY = [5, 10, 20, 30, 50, 100]
+_UNITS_PER_DAY = np.array(UNITS_PER_DAY, dtype=float)
+
+NEGATIVE_BAR_COLOR = "#ff4d6a"
+
+# Each builder below validates a full figure once per set of static
+# arguments (title, colors) and caches it as a plain dict. A call then only
+# copies that dict, swaps in the numeric arrays and wraps it without
+# re-running Plotly's validators. Value labels are rendered client side
+# through texttemplate instead of being formatted in Python.
+
+
+@functools.lru_cache(maxsize=32)
+def _projection_template(title: str, color: str) -> dict:
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=[f"{u} vendas/dia" for u in UNITS_PER_DAY],
+            y=[0.0] * len(UNITS_PER_DAY),
+            marker=dict(
+                color=[color] * len(UNITS_PER_DAY),
+                cornerradius=8,
+                line=dict(width=0),
+            ),
+            texttemplate="R$ %{y:,.2f}",
+            textposition="outside",
+            textfont=dict(size=12, color="#e0e0e0"),
+            hovertemplate="<b>%{x}</b><br>Lucro mensal: R$ %{y:,.2f}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=dict(text=title, font=dict(size=16, color="#fff"), x=0, xanchor="left"),
+        height=380,
+        **CHART_LAYOUT,
+    )
+    return fig.to_dict()
+
+
+def build_projection_chart(
+    profit_per_unit: float,
+    title: str,
+    color_gradient: list[str],
+) -> go.Figure:
+    """Build a bar chart showing monthly profit projections."""
+    monthly = profit_per_unit * _UNITS_PER_DAY * 30
+
+    spec = copy.deepcopy(_projection_template(title, color_gradient[0]))
+    bar = spec["data"][0]
+    bar["y"] = monthly
+    bar["marker"]["color"] = np.where(monthly >= 0, color_gradient[0], NEGATIVE_BAR_COLOR)
+    return go.Figure(spec, _validate=False)
+
+
+@functools.lru_cache(maxsize=1)
+def _comparison_template() -> dict:
+    labels = [f"{u}/dia" for u in UNITS_PER_DAY]
+    zeros = [0.0] * len(UNITS_PER_DAY)
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            name="Sem despesas fixas",
+            x=labels,
+            y=zeros,
+            marker=dict(color="rgba(0, 210, 140, 0.85)", cornerradius=6),
+            hovertemplate="<b>Sem desp. fixas</b><br>%{x}: R$ %{y:,.2f}<extra></extra>",
+        )
+    )
+    fig.add_trace(
+        go.Bar(
+            name="Com despesas fixas",
+            x=labels,
+            y=zeros,
+            marker=dict(color="rgba(0, 150, 255, 0.85)", cornerradius=6),
+            hovertemplate="<b>Com desp. fixas</b><br>%{x}: R$ %{y:,.2f}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=dict(
+            text="📊 Comparativo: Com vs Sem Despesas Fixas (Lucro Mensal)",
+            font=dict(size=16, color="#fff"),
+            x=0,
+            xanchor="left",
+        ),
+        barmode="group",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1,
+            font=dict(size=12, color="#ccc"),
+            bgcolor="rgba(0,0,0,0)",
+        ),
+        height=400,
+        **CHART_LAYOUT,
+    )
+    return fig.to_dict()
+
+
+def build_comparison_chart(
+    profit_without: float,
+    profit_with: float,
+) -> go.Figure:
+    """Build a grouped bar chart comparing profit with/without fixed expenses."""
+    spec = copy.deepcopy(_comparison_template())
+    spec["data"][0]["y"] = profit_without * _UNITS_PER_DAY * 30
+    spec["data"][1]["y"] = profit_with * _UNITS_PER_DAY * 30
+    return go.Figure(spec, _validate=False)
+
+
+# Positions of the break-even marker in the template's shapes/annotations
+# (index 0 is the horizontal zero line).
+_BREAKEVEN_MARKER = 1
+
+
+@functools.lru_cache(maxsize=1)
+def _breakeven_template() -> dict:
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=[0],
+            y=[0.0],
+            mode="lines+markers",
+            line=dict(color="#0a84ff", width=3),
+            marker=dict(size=6, color=["#30d158"], line=dict(color="#fff", width=1)),
+            name="Lucro Líquido",
+            hovertemplate="<b>%{x} vendas</b><br>Lucro: R$ %{y:,.2f}<extra></extra>",
+        )
+    )
+    fig.add_hline(
+        y=0,
+        line_dash="dash",
+        line_color="rgba(255,255,255,0.3)",
+        annotation_text="Ponto de Equilíbrio",
+        annotation_position="bottom right",
+    )
+    fig.add_vline(
+        x=0,
+        line_dash="dot",
+        line_color="#ffd60a",
+        annotation_text="Breakeven",
+        annotation_position="top left",
+    )
+    fig.update_layout(
+        title=dict(
+            text="🎯 Ponto de Equilíbrio",
+            font=dict(size=16, color="#fff"),
+            x=0,
+            xanchor="left",
+        ),
+        xaxis_title="Quantidade de Vendas",
+        yaxis_title="Lucro Líquido (R$)",
+        height=400,
+        **CHART_LAYOUT,
+    )
+    return fig.to_dict()
+
+
+def build_breakeven_chart(
+    fixed_costs: float,
+    contribution_margin: float,
+) -> go.Figure:
+    """Build a chart visualizing the break-even point."""
+    if contribution_margin <= 0:
+        return None
+
+    breakeven_units = fixed_costs / contribution_margin if contribution_margin > 0 else 0
+    breakeven_label = int(math.ceil(breakeven_units))
+
+    # Create a range of units around the break-even point
+    max_units = max(int(breakeven_units * 2), 50)
+    step = max(1, max_units // 20)
+    units_range = np.arange(0, max_units + step, step)
+
+    # Profit = (Margin * Units) - Fixed Costs
+    profits = (contribution_margin * units_range) - fixed_costs
+
+    spec = copy.deepcopy(_breakeven_template())
+    line = spec["data"][0]
+    line["x"] = units_range
+    line["y"] = profits
+    # Colors: Red below zero, Green above
+    line["marker"]["color"] = np.where(profits < 0, "#ff453a", "#30d158")
+
+    layout = spec["layout"]
+    layout["shapes"][_BREAKEVEN_MARKER]["x0"] = breakeven_units
+    layout["shapes"][_BREAKEVEN_MARKER]["x1"] = breakeven_units
+    layout["annotations"][_BREAKEVEN_MARKER]["x"] = breakeven_units
+    layout["annotations"][_BREAKEVEN_MARKER]["text"] = f"Breakeven: {breakeven_label} un."
+    layout["title"]["text"] = f"🎯 Ponto de Equilíbrio: {breakeven_label} vendas/mês"
+    return go.Figure(spec, _validate=False)
+
+
+@functools.lru_cache(maxsize=16)
+def _sensitivity_template(x_title: str, y_title: str, z_title: str, z_prefix: str, z_suffix: str) -> dict:
+    fig = go.Figure()
+    fig.add_trace(
+        go.Heatmap(
+            x=[0.0],
+            y=[0.0],
+            z=[[0.0]],
+            zmid=0,
+            colorscale=[[0.0, NEGATIVE_BAR_COLOR], [0.5, "#1c1c24"], [1.0, "#30d158"]],
+            colorbar=dict(title=dict(text=z_title), tickprefix=z_prefix, ticksuffix=z_suffix),
+            hovertemplate=(
+                f"{x_title}: %{{x:,.2f}}<br>{y_title}: %{{y:,.2f}}"
+                f"<br><b>{z_title}: {z_prefix}%{{z:,.2f}}{z_suffix}</b><extra></extra>"
+            ),
+        )
+    )
+    # Marker for the current simulation
+    fig.add_trace(
+        go.Scatter(
+            x=[0.0],
+            y=[0.0],
+            mode="markers",
+            marker=dict(size=11, color="#ffd60a", symbol="x", line=dict(color="#000", width=1)),
+            hoverinfo="skip",
+            showlegend=False,
+        )
+    )
+    layout = copy.deepcopy(CHART_LAYOUT)
+    layout["yaxis"].pop("tickprefix")
+    fig.update_layout(
+        title=dict(text=f"🌡️ {z_title}: {y_title} × {x_title}", font=dict(size=16, color="#fff"), x=0, xanchor="left"),
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        height=520,
+        **layout,
+    )
+    return fig.to_dict()
+
+
+def build_sensitivity_heatmap(
+    x_values: np.ndarray,
+    y_values: np.ndarray,
+    z: np.ndarray,
+    current: tuple[float, float],
+    x_title: str,
+    y_title: str,
+    z_title: str,
+    money: bool = True,
+) -> go.Figure:
+    """Heatmap of `z` (shape len(y) x len(x)), centered on zero, with the current point marked."""
+    spec = copy.deepcopy(
+        _sensitivity_template(x_title, y_title, z_title, "R$ " if money else "", "" if money else "%")
+    )
+    heatmap, marker = spec["data"]
+    heatmap["x"] = x_values
+    heatmap["y"] = y_values
+    # float32 halves the payload sent to the browser; cents survive it
+    heatmap["z"] = np.asarray(z, dtype=np.float32)
+    marker["x"] = [current[0]]
+    marker["y"] = [current[1]]
+    return go.Figure(spec, _validate=False)
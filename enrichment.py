@@ -0,0 +1,255 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from categories import KeywordCategorizer
+
+
+# ─────────────────────────────────────────────────────────────
+# LOOKUP CACHE
+# ─────────────────────────────────────────────────────────────
+def normalize_description(description) -> str:
+    """Cache key for a description: lowercased, whitespace collapsed."""
+    return " ".join(str(description).lower().split())
+
+
+class CategoryCache:
+    """Persistent description -> category cache in SQLite, with a TTL.
+
+    Misses are cached too (category NULL), so a merchant the backend could
+    not place is not looked up again until its entry expires. Counters
+    cover this process only; the table itself survives restarts.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 30 * 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS categories ("
+            " description TEXT PRIMARY KEY,"
+            " category TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+
+    def get_many(self, keys) -> dict:
+        """Fresh entries among `keys` (normalized descriptions), as {key: category or None}."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT description, category FROM categories"
+                    f" WHERE fetched_at >= ? AND description IN ({','.join('?' * len(batch))})",
+                    [cutoff, *batch],
+                )
+                found.update(rows)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: dict):
+        """Store {key: category or None}, stamped now."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO categories (description, category, fetched_at) VALUES (?, ?, ?)",
+                [(key, category, now) for key, category in entries.items()],
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM categories WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+            self._conn.commit()
+            return cur.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM categories")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self),
+        }
+
+
+# ─────────────────────────────────────────────────────────────
+# LOOKUP BACKENDS
+# ─────────────────────────────────────────────────────────────
+# A backend is any object with `async lookup(descriptions) -> {description: category or None}`
+# for a batch of normalized descriptions. Descriptions missing from the
+# result count as "not found".
+class LocalBackend:
+    """Offline stand-in: categories from a dict, optionally with simulated latency."""
+
+    def __init__(self, mapping: dict | None = None, delay: float = 0.0):
+        self.mapping = {normalize_description(k): v for k, v in (mapping or {}).items()}
+        self.delay = delay
+
+    @classmethod
+    def from_json(cls, path, delay: float = 0.0) -> "LocalBackend":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), delay)
+
+    async def lookup(self, descriptions: list[str]) -> dict:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {desc: self.mapping.get(desc) for desc in descriptions}
+
+
+class DDGSBackend:
+    """Web search via duckduckgo-search: categorize the top results' titles and snippets."""
+
+    def __init__(self, max_results: int = 3, categorizer: KeywordCategorizer | None = None):
+        from duckduckgo_search import DDGS
+
+        self._ddgs = DDGS
+        self.max_results = max_results
+        self.categorizer = categorizer or KeywordCategorizer()
+
+    def _search(self, description: str):
+        results = self._ddgs().text(description, region="br-pt", max_results=self.max_results) or []
+        text = " ".join(f"{r.get('title', '')} {r.get('body', '')}" for r in results)
+        category = self.categorizer.categorize(text) if text else self.categorizer.default
+        return None if category == self.categorizer.default else category
+
+    async def lookup(self, descriptions: list[str]) -> dict:
+        # The client is blocking; keep it off the event loop
+        found = await asyncio.gather(*(asyncio.to_thread(self._search, desc) for desc in descriptions))
+        return dict(zip(descriptions, found))
+
+
+def make_backend(spec: str | None):
+    """Backend from a setting: "ddgs", "local:<mapping.json>", or empty/"off" for none."""
+    if not spec or spec == "off":
+        return None
+    if spec == "ddgs":
+        try:
+            return DDGSBackend()
+        except ImportError:
+            return None
+    if spec.startswith("local:"):
+        return LocalBackend.from_json(spec[len("local:"):])
+    raise ValueError(f"Unknown enrichment backend: {spec!r}")
+
+
+# ─────────────────────────────────────────────────────────────
+# ENRICHMENT STAGE
+# ─────────────────────────────────────────────────────────────
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across concurrent tasks."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class Enricher:
+    """Cached, batched, rate-limited category lookup for unknown descriptions.
+
+    Cache hits never reach the backend. Misses go out in batches of
+    `batch_size`, at most `concurrency` batches in flight and at most
+    `rate` batches per second; at most `max_lookups` descriptions are sent
+    per call, the rest stay unknown until a later call. A failed batch is
+    counted and left uncached so it is retried next time.
+
+    `stats()` covers this enricher's calls only; the cache's own counters
+    are shared by every session of the process.
+    """
+
+    def __init__(self, backend, cache: CategoryCache, batch_size: int = 8, concurrency: int = 2,
+                 rate: float = 1.0, max_lookups: int | None = None):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.rate = rate
+        self.max_lookups = max_lookups
+        self.requests = 0
+        self.looked_up = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def enrich_async(self, descriptions) -> dict:
+        """{description: category} for every description a category was found for."""
+        keys = {desc: normalize_description(desc) for desc in descriptions}
+        known = self.cache.get_many(keys.values())
+        missing = [key for key in dict.fromkeys(keys.values()) if key not in known]
+        self.cache_hits += len(known)
+        self.cache_misses += len(missing)
+        if self.max_lookups is not None:
+            missing = missing[:self.max_lookups]
+
+        if missing and self.backend is not None:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            limiter = RateLimiter(self.rate)
+
+            async def run(batch):
+                async with semaphore:
+                    await limiter.wait()
+                    self.requests += 1
+                    try:
+                        found = await self.backend.lookup(batch)
+                    except Exception:
+                        self.errors += 1
+                        return
+                    entries = {key: found.get(key) for key in batch}
+                    self.cache.put_many(entries)
+                    known.update(entries)
+                    self.looked_up += len(batch)
+
+            await asyncio.gather(*(
+                run(missing[i:i + self.batch_size]) for i in range(0, len(missing), self.batch_size)
+            ))
+
+        return {desc: known[key] for desc, key in keys.items() if known.get(key)}
+
+    def enrich(self, descriptions) -> dict:
+        """Blocking wrapper around enrich_async for callers without an event loop."""
+        return asyncio.run(self.enrich_async(descriptions))
+
+    def stats(self) -> dict:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "size": len(self.cache),
+            "requests": self.requests,
+            "looked_up": self.looked_up,
+            "errors": self.errors,
+        }
@@ -0,0 +1,109 @@
+import tempfile
+
+import pandas as pd
+
+
+# ─────────────────────────────────────────────────────────────
+# COLUMNAR EXPORTS
+# ─────────────────────────────────────────────────────────────
+# Extension and MIME type of each download format
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+LEDGER_COLUMNS = ("Data", "Descrição", "Categoria", "Valor")
+
+EXPORT_CHUNK_ROWS = 64 * 1024
+
+
+def columnar_exports_available() -> bool:
+    """Parquet/Arrow exports need pyarrow, an optional dependency."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def to_arrow_table(df: pd.DataFrame, datetime_columns=(), decimal_columns=(), category_columns=(),
+                   date_format: str | None = None):
+    """Arrow table of `df` with explicit types per column.
+
+    datetime_columns become timestamps (unparseable entries null),
+    decimal_columns decimal128(18, 2) rounded to cents, category_columns
+    dictionary-encoded strings; anything else keeps pandas' inferred type.
+    Text dates are parsed with `date_format`, or day-first when it is None.
+    """
+    import pyarrow as pa
+
+    arrays, fields = [], []
+    for name in df.columns:
+        column = df[name]
+        if name in datetime_columns:
+            if not pd.api.types.is_datetime64_any_dtype(column):
+                column = pd.to_datetime(column, format=date_format, dayfirst=True, errors="coerce")
+            array = pa.array(column, type=pa.timestamp("ms"), from_pandas=True)
+        elif name in decimal_columns:
+            cents = pd.to_numeric(column, errors="coerce").round(2)
+            array = pa.array(cents, type=pa.float64(), from_pandas=True).cast(pa.decimal128(18, 2))
+        elif name in category_columns:
+            array = pa.array(column.astype("string"), type=pa.string(), from_pandas=True).dictionary_encode()
+        else:
+            array = pa.array(column, from_pandas=True)
+        arrays.append(array)
+        fields.append(pa.field(str(name), array.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def ledger_table(df: pd.DataFrame, date: str | None, description: str, value: str, category: str = "Categoria",
+                 date_format: str | None = None):
+    """The analyzed ledger as an Arrow table with LEDGER_COLUMNS."""
+    ledger = pd.DataFrame({
+        "Data": df[date] if date is not None else None,
+        "Descrição": df[description],
+        "Categoria": df[category],
+        "Valor": df[value],
+    })
+    return to_arrow_table(
+        ledger, datetime_columns=["Data"], decimal_columns=["Valor"], category_columns=["Categoria"], date_format=date_format
+    )
+
+
+def _temp_file():
+    # Unbuffered (a raw FileIO), which st.download_button accepts as a file
+    return tempfile.TemporaryFile(buffering=0)
+
+
+def write_table(table, fmt: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Write `table` as Parquet or Arrow IPC to an anonymous temp file, rewound for reading.
+
+    Record batches are written one at a time straight to disk, so the
+    only full copy in memory is whatever reads the file afterwards (e.g.
+    st.download_button), not an intermediate bytes object plus that copy.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    out = _temp_file()
+    if fmt == "parquet":
+        with pq.ParquetWriter(out, table.schema, compression="zstd") as writer:
+            for batch in table.to_batches(max_chunksize=chunk_rows):
+                writer.write_batch(batch)
+    elif fmt == "arrow":
+        with pa.ipc.new_file(out, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=chunk_rows):
+                writer.write_batch(batch)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt!r}")
+    out.seek(0)
+    return out
+
+
+def write_csv(df: pd.DataFrame):
+    """CSV of `df` encoded to an anonymous temp file, rewound for reading."""
+    out = _temp_file()
+    df.to_csv(out, index=False, encoding="utf-8", chunksize=EXPORT_CHUNK_ROWS)
+    out.seek(0)
+    return out
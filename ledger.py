@@ -0,0 +1,359 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# ─────────────────────────────────────────────────────────────
+# LEDGER AGGREGATION
+# ─────────────────────────────────────────────────────────────
+INVESTMENT_CATEGORY = "Investimento"
+
+# Row kinds; the index doubles as the block of the bincount key space
+KINDS = ("income", "expense", "investment", "zero")
+_INCOME, _EXPENSE, _INVESTMENT, _ZERO = range(len(KINDS))
+
+
+def summarize_ledger(df: pd.DataFrame, description: str, value: str, category: str = "Categoria",
+                     top_n: int = 10) -> dict:
+    """KPIs, expense totals per category and top expenses of a categorized ledger.
+
+    Income is value > 0; outflows (value < 0) split into investments
+    (category INVESTMENT_CATEGORY) and expenses. Every row gets a
+    (kind, category) key, and one weighted bincount over that key yields
+    all totals at once, with no filtered copies of the frame. Top
+    expenses come from an argpartition over the expense values. The
+    result holds, besides the numbers, the row positions of each kind
+    (`rows`) so tables can be pulled from `df` only when displayed.
+    """
+    values = pd.to_numeric(df[value], errors="coerce").to_numpy(dtype=float)
+    codes, categories = pd.factorize(df[category])
+    n_categories = len(categories) + 1  # last slot: missing category
+
+    is_investment = np.zeros(n_categories, dtype=bool)
+    is_investment[:-1] = categories == INVESTMENT_CATEGORY
+    codes = np.where(codes < 0, n_categories - 1, codes)
+
+    kind = np.full(len(values), _ZERO, dtype=np.intp)
+    kind[values > 0] = _INCOME
+    outflow = values < 0
+    kind[outflow] = np.where(is_investment[codes[outflow]], _INVESTMENT, _EXPENSE)
+
+    key = kind * n_categories + codes
+    valid = ~np.isnan(values)
+    totals = np.bincount(key[valid], weights=values[valid], minlength=len(KINDS) * n_categories)
+    counts = np.bincount(key, minlength=len(KINDS) * n_categories)
+    totals = totals.reshape(len(KINDS), n_categories)
+    counts = counts.reshape(len(KINDS), n_categories)
+
+    total_income = float(totals[_INCOME].sum())
+    total_expense = float(np.abs(totals[_EXPENSE]).sum())
+    total_invested = float(np.abs(totals[_INVESTMENT]).sum())
+
+    # Expense totals per category, largest first
+    labels = np.append(np.asarray(categories, dtype=object), np.nan)
+    present = counts[_EXPENSE] > 0
+    category_totals = pd.DataFrame({category: labels[present], value: np.abs(totals[_EXPENSE][present])})
+    category_totals = category_totals.sort_values(by=value, ascending=False, kind="stable").reset_index(drop=True)
+
+    # Most negative expenses, ties in row order
+    expense_rows = np.flatnonzero(kind == _EXPENSE)
+    if len(expense_rows) > top_n:
+        expense_values = values[expense_rows]
+        keep = np.argpartition(expense_values, top_n - 1)[:top_n]
+        threshold = expense_values[keep].max()
+        top_rows = expense_rows[expense_values <= threshold]
+    else:
+        top_rows = expense_rows
+    top_rows = top_rows[np.lexsort((top_rows, values[top_rows]))][:top_n]
+
+    top_expenses = pd.DataFrame({
+        description: df[description].to_numpy()[top_rows],
+        value: np.abs(values[top_rows]),
+        category: labels[codes[top_rows]],
+    })
+    if len(top_rows):
+        biggest_expense = (top_expenses[description].iloc[0], float(top_expenses[value].iloc[0]))
+    else:
+        biggest_expense = ("N/A", 0.0)
+
+    return {
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "total_invested": total_invested,
+        # Saldo Operacional: income minus actual expenses
+        "balance": total_income - total_expense,
+        # What is left in the checking account after investing
+        "liquid_balance": total_income - (total_expense + total_invested),
+        "category_totals": category_totals,
+        "top_expenses": top_expenses,
+        "biggest_expense": biggest_expense,
+        "counts": {name: int(counts[i].sum()) for i, name in enumerate(KINDS)},
+        "rows": {
+            "income": np.flatnonzero(kind == _INCOME),
+            "expense": expense_rows,
+            "investment": np.flatnonzero(kind == _INVESTMENT),
+        },
+    }
+
+
+def select_rows(df: pd.DataFrame, positions: np.ndarray, columns: list) -> pd.DataFrame:
+    """Rows at `positions` restricted to `columns`, copied once."""
+    return df.iloc[positions, df.columns.get_indexer(columns)]
+
+
+# ─────────────────────────────────────────────────────────────
+# LEDGER STORE
+# ─────────────────────────────────────────────────────────────
+def transaction_key(owner: str, date: str, description, value: float, occurrence: int = 0) -> int:
+    """Stable 64-bit key of a transaction.
+
+    Built from the owner, ISO date, description, value in cents and the
+    occurrence index: the n-th row of a statement with that same date,
+    description and value. Re-importing a statement reproduces its keys,
+    while genuinely repeated same-day transactions stay distinct.
+    """
+    text = f"{owner}\x1f{date}\x1f{' '.join(str(description).split())}\x1f{round(value * 100)}\x1f{occurrence}"
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+_TRANSACTION_COLUMNS = "key, owner, month, date, description, value, category, source, added_at"
+
+
+class LedgerStore:
+    """Persistent multi-statement ledger in SQLite with monthly aggregates.
+
+    Every row belongs to an `owner` key (a user, workspace or browser token) and
+    every method only reads, changes or clears that owner's rows.
+    `append` deduplicates transactions by transaction_key and then
+    recomputes the `monthly` table only for the months that actually
+    received new rows, so history views read a few rows per month instead
+    of re-parsing every statement. Categories are stored as they were when
+    the statement was appended; `recategorize` rewrites them (and the
+    affected months) after the rules change.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS transactions (
+                key INTEGER PRIMARY KEY,
+                owner TEXT NOT NULL DEFAULT '',
+                month TEXT NOT NULL,
+                date TEXT NOT NULL,
+                description TEXT,
+                value REAL NOT NULL,
+                category TEXT,
+                source TEXT,
+                added_at REAL NOT NULL
+            );
+            """
+        )
+        # Files from before owners were tracked: their rows get owner '' (no
+        # session sees them) and the derived monthly table is rebuilt
+        if "owner" not in {row[1] for row in self._conn.execute("PRAGMA table_info(transactions)")}:
+            self._conn.executescript(
+                """
+                ALTER TABLE transactions ADD COLUMN owner TEXT NOT NULL DEFAULT '';
+                DROP INDEX IF EXISTS transactions_month;
+                DROP TABLE IF EXISTS monthly;
+                """
+            )
+        self._conn.executescript(
+            """
+            CREATE INDEX IF NOT EXISTS transactions_owner_month ON transactions (owner, month);
+            CREATE TABLE IF NOT EXISTS monthly (
+                owner TEXT NOT NULL,
+                month TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                category TEXT NOT NULL,
+                total REAL NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (owner, month, kind, category)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def count(self, owner: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM transactions WHERE owner = ?", (owner,)).fetchone()[0]
+
+    def append(self, owner: str, df: pd.DataFrame, date: str | None, description: str, value: str,
+               category: str = "Categoria", source: str | None = None) -> dict:
+        """Add a statement's rows for `owner`; returns counts of inserted/duplicate rows and the months recomputed.
+
+        Rows without a parseable date go to month "" and rows without a
+        numeric value are skipped.
+        """
+        values = pd.to_numeric(df[value], errors="coerce")
+        if date is not None:
+            dates = pd.to_datetime(df[date], dayfirst=True, errors="coerce")
+        else:
+            dates = pd.Series(pd.NaT, index=df.index)
+        iso = dates.dt.strftime("%Y-%m-%d").fillna("")
+        month = iso.str[:7]
+        valid = values.notna().to_numpy()
+
+        now = time.time()
+        descriptions = df[description][valid]
+        texts = descriptions.where(descriptions.notna(), None)
+        # n-th row of this statement with the same date, description and value
+        occurrence = pd.DataFrame({
+            "date": iso[valid],
+            "description": texts.map(lambda d: " ".join(str(d).split())),
+            "cents": (values[valid] * 100).round(),
+        }).groupby(["date", "description", "cents"], sort=False).cumcount()
+        rows = [
+            (transaction_key(owner, d, desc, v, n), owner, m, d, None if desc is None else str(desc), v, cat, source,
+             now)
+            for d, m, desc, v, cat, n in zip(
+                iso[valid].tolist(), month[valid].tolist(), texts.tolist(),
+                values[valid].tolist(), df[category][valid].tolist(), occurrence.tolist(),
+            )
+        ]
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS staging ("
+                " key INTEGER PRIMARY KEY, owner TEXT, month TEXT, date TEXT, description TEXT,"
+                " value REAL, category TEXT, source TEXT, added_at REAL)"
+            )
+            # Rows already stored (an overlapping or re-imported statement) are dropped here
+            self._conn.executemany(f"INSERT OR IGNORE INTO staging ({_TRANSACTION_COLUMNS}) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("DELETE FROM staging WHERE key IN (SELECT key FROM transactions)")
+            months = [m for (m,) in self._conn.execute("SELECT DISTINCT month FROM staging")]
+            inserted = self._conn.execute(
+                f"INSERT INTO transactions ({_TRANSACTION_COLUMNS}) SELECT {_TRANSACTION_COLUMNS} FROM staging"
+            ).rowcount
+            self._conn.execute("DELETE FROM staging")
+            self._refresh_months(owner, months)
+
+        return {"inserted": inserted, "duplicates": len(rows) - inserted, "months": sorted(months)}
+
+    def recategorize(self, owner: str, categorize) -> list:
+        """Re-run `categorize(descriptions: pd.Series) -> pd.Series` over `owner`'s rows; returns months changed."""
+        with self._lock, self._conn:
+            stored = pd.read_sql_query(
+                "SELECT key, month, description, category FROM transactions WHERE owner = ?", self._conn, params=[owner]
+            )
+            stored["new"] = categorize(stored["description"]).to_numpy()
+            changed = stored[stored["new"] != stored["category"]]
+            self._conn.executemany(
+                "UPDATE transactions SET category = ? WHERE key = ?",
+                zip(changed["new"], changed["key"].astype(int)),
+            )
+            months = sorted(changed["month"].unique())
+            self._refresh_months(owner, months)
+        return months
+
+    def _refresh_months(self, owner: str, months):
+        """Rebuild `owner`'s monthly aggregates of `months` from their transactions (lock held)."""
+        for i in range(0, len(months), 500):
+            batch = months[i:i + 500]
+            marks = ",".join("?" * len(batch))
+            self._conn.execute(f"DELETE FROM monthly WHERE owner = ? AND month IN ({marks})", [owner, *batch])
+            self._conn.execute(
+                f"""
+                INSERT INTO monthly (owner, month, kind, category, total, count)
+                SELECT owner, month,
+                       CASE WHEN value > 0 THEN 'income'
+                            WHEN value < 0 AND category = ? THEN 'investment'
+                            WHEN value < 0 THEN 'expense'
+                            ELSE 'zero' END AS kind,
+                       COALESCE(category, ''), SUM(value), COUNT(*)
+                FROM transactions
+                WHERE owner = ? AND month IN ({marks})
+                GROUP BY 1, 2, 3, 4
+                """,
+                [INVESTMENT_CATEGORY, owner, *batch],
+            )
+
+    def months(self, owner: str) -> list:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT month FROM monthly WHERE owner = ? ORDER BY month", (owner,))
+            return [m for (m,) in rows]
+
+    def monthly_totals(self, owner: str, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+        """`owner`'s aggregates per (month, kind, category), optionally for months in [start, end] ("YYYY-MM")."""
+        query = "SELECT month, kind, category, total, count FROM monthly WHERE owner = ?"
+        params = [owner]
+        if start:
+            query += " AND month >= ?"
+            params.append(start)
+        if end:
+            query += " AND month <= ?"
+            params.append(end)
+        with self._lock:
+            return pd.read_sql_query(query + " ORDER BY month, kind, category", self._conn, params=params)
+
+    def summary(self, owner: str, start: str | None = None, end: str | None = None) -> dict:
+        """KPIs and expense totals per category, as in summarize_ledger, from `owner`'s monthly aggregates."""
+        monthly = self.monthly_totals(owner, start, end)
+        by_kind = monthly.groupby("kind")["total"].sum()
+        total_income = float(by_kind.get("income", 0.0))
+        total_expense = float(abs(by_kind.get("expense", 0.0)))
+        total_invested = float(abs(by_kind.get("investment", 0.0)))
+
+        expenses = monthly[monthly["kind"] == "expense"]
+        category_totals = expenses.groupby("category", as_index=False)["total"].sum()
+        category_totals["total"] = category_totals["total"].abs()
+        category_totals = category_totals.sort_values(by="total", ascending=False).reset_index(drop=True)
+
+        per_month = monthly.pivot_table(index="month", columns="kind", values="total", aggfunc="sum", fill_value=0.0)
+        return {
+            "total_income": total_income,
+            "total_expense": total_expense,
+            "total_invested": total_invested,
+            "balance": total_income - total_expense,
+            "liquid_balance": total_income - (total_expense + total_invested),
+            "category_totals": category_totals,
+            "per_month": per_month,
+        }
+
+    def transactions(self, owner: str, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+        """`owner`'s stored rows for months in [start, end], oldest first."""
+        query = "SELECT date, description, category, value, source FROM transactions WHERE owner = ?"
+        params = [owner]
+        if start:
+            query += " AND month >= ?"
+            params.append(start)
+        if end:
+            query += " AND month <= ?"
+            params.append(end)
+        with self._lock:
+            return pd.read_sql_query(query + " ORDER BY date, key", self._conn, params=params)
+
+    def purge(self, prefix: str, before: float | None = None) -> int:
+        """Delete every owner whose key starts with `prefix` and who appended nothing since `before` (epoch seconds).
+
+        With `before` None every such owner goes. Returns how many owners were removed.
+        """
+        query = "SELECT owner FROM transactions WHERE substr(owner, 1, ?) = ? GROUP BY owner"
+        params = [len(prefix), prefix]
+        if before is not None:
+            query += " HAVING MAX(added_at) < ?"
+            params.append(before)
+        with self._lock, self._conn:
+            owners = [owner for (owner,) in self._conn.execute(query, params)]
+            self._conn.executemany("DELETE FROM transactions WHERE owner = ?", [(owner,) for owner in owners])
+            self._conn.executemany("DELETE FROM monthly WHERE owner = ?", [(owner,) for owner in owners])
+        return len(owners)
+
+    def clear(self, owner: str):
+        """Delete `owner`'s rows and aggregates; other owners' are untouched."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions WHERE owner = ?", (owner,))
+            self._conn.execute("DELETE FROM monthly WHERE owner = ?", (owner,))
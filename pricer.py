@@ -0,0 +1,226 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from catalog import CATALOG_ALIASES, MARKETPLACES, iter_catalog, normalize_catalog, price_catalog
+from pricing import AMAZON, MERCADO_LIVRE
+from statements import CSV_CHUNK_ROWS, CSV_SNIFF_BYTES, sniff_csv
+
+# Batch pricer for cron jobs: streams a catalog CSV/Parquet through
+# price_catalog (the price_batch engine, identical to calculate_*) one
+# chunk at a time and appends each priced chunk to the output file, so
+# memory stays flat however large the catalog is.
+#
+#   python pricer.py catalogo.csv -o precos.parquet --jobs 4 --shopee-free-shipping
+
+
+def _encode_csv(df, header: bool) -> bytes:
+    # Arrow's CSV writer is several times faster than to_csv on float
+    # columns and writes the same shortest round-trip digits
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return df.to_csv(index=False, header=header).encode("utf-8")
+    out = pa.BufferOutputStream()
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), out,
+                     write_options=pa_csv.WriteOptions(include_header=header))
+    return out.getvalue().to_pybytes()
+
+
+def _price_chunk(raw, start: int, options: dict, parquet: bool):
+    """Price one raw chunk in a pool process.
+
+    Returns (rows, per-marketplace "Outros" fallbacks, payload), the
+    payload already encoded for the output: CSV bytes (with the header
+    only for the first chunk) or an Arrow table for Parquet.
+    """
+    headers = {str(c).strip().lower() for c in raw.columns}
+    if headers.isdisjoint(CATALOG_ALIASES["sku"]):
+        # Number rows across the whole file, not per chunk
+        raw = raw.assign(sku=np.arange(start + 1, start + len(raw) + 1).astype(str))
+    catalog = normalize_catalog(raw)
+    catalog["sku"] = catalog["sku"].astype(str)
+    priced, remapped = price_catalog(catalog, **options)
+    if parquet:
+        import pyarrow as pa
+
+        payload = pa.Table.from_pandas(priced, preserve_index=False)
+    else:
+        payload = _encode_csv(priced, header=start == 0)
+    return len(priced), remapped, payload
+
+
+class ChunkWriter:
+    """Appends encoded chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str, parquet: bool):
+        self.path = path
+        self.parquet = parquet
+        self._file = None
+        self._writer = None
+
+    def write(self, payload):
+        if self.parquet:
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, payload.schema, compression="zstd")
+            elif payload.schema != self._writer.schema:
+                # Later chunks take the first chunk's schema (e.g. all-null columns)
+                payload = payload.cast(self._writer.schema)
+            self._writer.write_table(payload)
+        else:
+            if self._file is None:
+                self._file = open(self.path, "wb")
+            self._file.write(payload)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def _count_rows(source, parquet: bool) -> int:
+    """Data rows in the catalog, for progress only.
+
+    Parquet stores the count; for CSV it is the newlines past the sniffed
+    preamble and header, so quoted line breaks or blank lines make it an
+    overestimate.
+    """
+    if parquet:
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(source).metadata.num_rows
+    source.seek(0)
+    skiprows = sniff_csv(source.read(CSV_SNIFF_BYTES))["skiprows"]
+    source.seek(0)
+    lines, last = 0, b"\n"
+    for block in iter(lambda: source.read(1 << 20), b""):
+        lines += block.count(b"\n")
+        last = block[-1:]
+    source.seek(0)
+    return max(lines + (last != b"\n") - skiprows - 1, 0)
+
+
+class Progress:
+    """One stderr line with rows done, throughput and share of `total_rows` priced.
+
+    Counts rows once written, not bytes read: the CSV parser reads ahead
+    and chunks wait in the pool, so the file position runs ahead of the work.
+    """
+
+    def __init__(self, total_rows: int, enabled: bool, every: float = 0.5):
+        self.total_rows = total_rows
+        self.enabled = enabled
+        self.every = every
+        self.start = time.perf_counter()
+        self._shown = 0.0
+
+    def update(self, rows: int, final: bool = False):
+        now = time.perf_counter()
+        if not self.enabled or (not final and now - self._shown < self.every):
+            return
+        self._shown = now
+        elapsed = max(now - self.start, 1e-9)
+        done = 1.0 if final else min(rows / max(self.total_rows, 1), 1.0)
+        sys.stderr.write(f"\r{rows:>12,} SKUs  {rows / elapsed:>10,.0f} SKUs/s  {done:>6.1%}  {elapsed:7.1f}s")
+        if final:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+
+def run(args) -> int:
+    options = {
+        "ml_ad_type": args.ml_ad_type,
+        "ml_include_fixed_fee": not args.ml_no_fixed_fee,
+        "amazon_logistics": args.amazon_logistics,
+        "shopee_seller_type": args.shopee_seller_type,
+        "shopee_free_shipping": args.shopee_free_shipping,
+        "fixed_expenses_per_unit": args.fixed_expenses,
+        "other_pct": args.other_pct,
+    }
+    # Written next to the target and moved into place only on success
+    partial = args.output + ".partial"
+    writer = ChunkWriter(partial, parquet=args.output.lower().endswith(".parquet"))
+    remapped = dict.fromkeys(MARKETPLACES, 0)
+    rows = 0
+    pool = ProcessPoolExecutor(args.jobs) if args.jobs > 1 else None
+    pending = deque()
+    error = "interrompido"
+
+    def collect(result):
+        nonlocal rows
+        count, fallbacks, payload = result
+        writer.write(payload)
+        for platform, n in fallbacks.items():
+            remapped[platform] += n
+        rows += count
+        progress.update(rows)
+
+    try:
+        with open(args.catalog, "rb") as source:
+            total_rows = 0 if args.quiet else _count_rows(source, args.catalog.lower().endswith(".parquet"))
+            progress = Progress(total_rows, enabled=not args.quiet)
+            start = 0
+            for raw in iter_catalog(source, chunk_rows=args.chunk_rows):
+                if pool is None:
+                    collect(_price_chunk(raw, start, options, writer.parquet))
+                else:
+                    # At most two chunks per worker in flight; written in input order
+                    pending.append(pool.submit(_price_chunk, raw, start, options, writer.parquet))
+                    while len(pending) >= 2 * args.jobs or (pending and pending[0].done()):
+                        collect(pending.popleft().result())
+                start += len(raw)
+            while pending:
+                collect(pending.popleft().result())
+            progress.update(rows, final=True)
+        error = None if rows else "catálogo vazio"
+    except (OSError, ValueError, KeyError) as e:
+        error = str(e)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        writer.close()
+        if (error is not None or not rows) and os.path.exists(partial):
+            os.remove(partial)
+
+    if error is not None:
+        print(f"erro: {error}", file=sys.stderr)
+        return 1
+    os.replace(partial, args.output)
+    for platform, count in remapped.items():
+        if count:
+            print(f"aviso: {count:,} SKUs sem categoria {MARKETPLACES[platform][0]} conhecida usaram 'Outros'",
+                  file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Precifica um catálogo de SKUs (CSV/Parquet) nos três marketplaces")
+    parser.add_argument("catalog", help="catálogo .csv ou .parquet")
+    parser.add_argument("-o", "--output", required=True, help="resultado .csv ou .parquet")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="processos (padrão: número de CPUs)")
+    parser.add_argument("--chunk-rows", type=int, default=CSV_CHUNK_ROWS, help="SKUs por bloco")
+    parser.add_argument("--ml-ad-type", default="Clássico", choices=list(MERCADO_LIVRE["ad_types"]))
+    parser.add_argument("--ml-no-fixed-fee", action="store_true", help="sem a tarifa fixa do ML")
+    parser.add_argument("--amazon-logistics", default="fbm", choices=list(AMAZON["logistics"].values()))
+    parser.add_argument("--shopee-seller-type", default="CPF", choices=["CPF", "CNPJ"])
+    parser.add_argument("--shopee-free-shipping", action="store_true", help="programa de frete grátis da Shopee")
+    parser.add_argument("--fixed-expenses", type=float, default=0.0, help="despesas fixas por unidade (R$)")
+    parser.add_argument("--other-pct", type=float, default=0.0, help="outras taxas (%%)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="sem progresso no stderr")
+    args = parser.parse_args(argv)
+    if args.jobs < 1 or args.chunk_rows < 1:
+        parser.error("--jobs e --chunk-rows devem ser positivos")
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
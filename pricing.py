@@ -0,0 +1,561 @@
+import bisect
+import csv
+
+# ─────────────────────────────────────────────────────────────
+# MARKETPLACE FEE DATA
+# ─────────────────────────────────────────────────────────────
+MERCADO_LIVRE = {
+    "name": "Mercado Livre",
+    "icon": "🟡",
+    "ad_types": {
+        "Clássico": {
+            "Acessórios para Veículos": 13.0,
+            "Alimentos e Bebidas": 12.0,
+            "Bebês": 14.0,
+            "Beleza e Cuidado Pessoal": 14.0,
+            "Brinquedos e Hobbies": 14.0,
+            "Calçados, Roupas e Bolsas": 14.0,
+            "Casa, Móveis e Decoração": 13.0,
+            "Celulares e Telefones": 12.0,
+            "Eletrodomésticos": 11.0,
+            "Eletrônicos, Áudio e Vídeo": 12.0,
+            "Esportes e Fitness": 14.0,
+            "Ferramentas": 12.0,
+            "Games": 12.0,
+            "Informática": 12.0,
+            "Instrumentos Musicais": 12.0,
+            "Livros, Revistas e Comics": 16.0,
+            "Saúde": 14.0,
+            "Outros": 13.0,
+        },
+        "Premium": {
+            "Acessórios para Veículos": 18.0,
+            "Alimentos e Bebidas": 17.0,
+            "Bebês": 18.0,
+            "Beleza e Cuidado Pessoal": 18.0,
+            "Brinquedos e Hobbies": 18.0,
+            "Calçados, Roupas e Bolsas": 18.0,
+            "Casa, Móveis e Decoração": 18.0,
+            "Celulares e Telefones": 16.0,
+            "Eletrodomésticos": 16.0,
+            "Eletrônicos, Áudio e Vídeo": 16.0,
+            "Esportes e Fitness": 18.0,
+            "Ferramentas": 17.0,
+            "Games": 17.0,
+            "Informática": 16.0,
+            "Instrumentos Musicais": 17.0,
+            "Livros, Revistas e Comics": 19.0,
+            "Saúde": 18.0,
+            "Outros": 17.0,
+        },
+    },
+    "fixed_fees": [
+        (29.0, 6.25),
+        (50.0, 6.50),
+        (79.0, 6.75),
+    ],
+}
+
+AMAZON = {
+    "name": "Amazon",
+    "icon": "📦",
+    "logistics": {
+        "FBM (Vendedor envia)": "fbm",
+        "DBA (Amazon envia)": "dba",
+    },
+    "dba_fees": {
+        "fixed": [ # For price < 79.00
+            (30.00, 4.50),
+            (49.99, 6.50),
+            (78.99, 6.75),
+        ],
+        "weight": [ # For price >= 79.00 (Standard size examples - SP Capital base)
+            (250, 19.95),
+            (500, 20.45),
+            (1000, 21.45),
+            (2000, 22.45),
+            (5000, 23.45),
+            (9000, 25.45),
+            (13000, 28.45),
+            (17000, 31.45),
+            (23000, 35.45),
+            (30000, 39.45), # Cap at 30kg for simplicity in example
+        ]
+    },
+    "categories": {
+        "Automotivo": 12.0,
+        "Bebês": 12.0,
+        "Beleza": 12.0,
+        "Brinquedos e Jogos": 13.0,
+        "Casa": 12.0,
+        "Computadores": 12.0,
+        "Cozinha": 12.0,
+        "Eletrônicos": 12.0,
+        "Esportes e Aventura": 12.0,
+        "Ferramentas e Construção": 12.0,
+        "Games e Consoles": 12.0,
+        "Instrumentos Musicais": 12.0,
+        "Livros": 15.0,
+        "Moda": 13.0,
+        "Pet Shop": 12.0,
+        "Papelaria e Escritório": 12.0,
+        "Saúde": 10.0,
+        "Outros": 12.0,
+    },
+}
+
+SHOPEE = {
+    "name": "Shopee",
+    "icon": "🟠",
+    "base_commission": 14.0,
+    "free_shipping_extra": 6.0,
+    "fixed_fee": 4.0,
+    "cnpj_transaction_fee": 2.0,
+    "categories": {
+        "Acessórios de Moda": 14.0,
+        "Beleza e Saúde": 14.0,
+        "Brinquedos": 14.0,
+        "Casa e Decoração": 14.0,
+        "Celulares e Acessórios": 14.0,
+        "Eletrônicos": 14.0,
+        "Esportes e Lazer": 14.0,
+        "Ferramentas": 14.0,
+        "Informática": 14.0,
+        "Livros": 14.0,
+        "Moda Feminina": 14.0,
+        "Moda Masculina": 14.0,
+        "Pet Shop": 14.0,
+        "Bebês e Crianças": 14.0,
+        "Outros": 14.0,
+    },
+}
+
+
+# ─────────────────────────────────────────────────────────────
+# FEE SCHEDULES
+# ─────────────────────────────────────────────────────────────
+class FeeSchedule:
+    """Step function from a value (price, weight) to a fee.
+
+    Built once from (upper_bound, fee) bands, optionally (upper_bound, fee,
+    closed) where closed=False makes the bound itself fall in the next band.
+    A value gets the fee of the first band that contains it, and `above`
+    past the last band (NaN included). Lookups are a binary search, so a
+    table with hundreds of bands costs the same per call as one with three.
+    """
+
+    __slots__ = ("bounds", "fees", "closed", "above", "_monotone_divisor", "_arrays")
+
+    def __init__(self, bands, above: float | None = None):
+        bands = sorted(
+            (float(band[0]), float(band[1]), bool(band[2]) if len(band) > 2 else True)
+            for band in bands
+        )
+        if not bands:
+            raise ValueError("A fee schedule needs at least one band.")
+        self.bounds = tuple(bound for bound, _, _ in bands)
+        if len(set(self.bounds)) != len(self.bounds):
+            raise ValueError("Fee schedule bounds must be unique.")
+        self.fees = tuple(fee for _, fee, _ in bands)
+        self.closed = tuple(closed for _, _, closed in bands)
+        self.above = self.fees[-1] if above is None else float(above)
+        # Below this divisor a fee step can outgrow the price step between two
+        # bounds, and "band i admits a price" is no longer monotone in i.
+        self._monotone_divisor = max(
+            [0.0] + [
+                (self.fees[i + 1] - self.fees[i]) / (self.bounds[i + 1] - self.bounds[i])
+                for i in range(len(bands) - 1)
+            ]
+        )
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def __repr__(self) -> str:
+        return f"FeeSchedule({len(self)} bands, above={self.above})"
+
+    def _band(self, value: float) -> int:
+        i = bisect.bisect_left(self.bounds, value)
+        if i < len(self.bounds) and not self.closed[i] and self.bounds[i] == value:
+            i += 1
+        return i
+
+    def fee(self, value: float) -> float:
+        """Fee for a single value."""
+        if value != value:
+            return self.above
+        i = self._band(value)
+        return self.fees[i] if i < len(self.fees) else self.above
+
+    def _np(self):
+        import numpy as np
+
+        if self._arrays is None:
+            self._arrays = (
+                np.array(self.bounds),
+                np.array(self.fees + (self.above,)),
+                np.array(self.closed + (True,)),
+            )
+        return np, self._arrays
+
+    def fees_for(self, values):
+        """Fee for every element of an array-like, as a NumPy array."""
+        np, (bounds, fees, closed) = self._np()
+        values = np.asarray(values, dtype=float)
+        band = np.searchsorted(bounds, values, side="left")
+        edge = np.minimum(band, len(bounds) - 1)
+        band += (band < len(bounds)) & ~closed[edge] & (bounds[edge] == values)
+        return fees[band]
+
+    def solve_price(self, base: float, divisor: float, above_fee: float | None = None, include_fees: bool = True) -> float:
+        """Smallest price p with p * divisor >= base + fee(p).
+
+        `base` is the per-unit cost before fees, `divisor` the share of the
+        price left after percentage fees and margin (must be positive).
+        `above_fee` replaces `above` as the cost past the last band (e.g.
+        shipping once free shipping kicks in), and include_fees=False treats
+        every band fee as zero. The band is found by binary search; each
+        candidate is (base + fee) / divisor, raised to the band's lower
+        bound when a cheaper upper band would otherwise undercut it.
+        """
+        if above_fee is None:
+            above_fee = self.above
+        bounds, closed, n = self.bounds, self.closed, len(self.bounds)
+
+        def band_fee(i):
+            return self.fees[i] if include_fees else 0.0
+
+        def admits(i):
+            p = (base + band_fee(i)) / divisor
+            return p <= bounds[i] if closed[i] else p < bounds[i]
+
+        if not include_fees or divisor >= 2 * self._monotone_divisor:
+            lo, hi = 0, n
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if admits(mid):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            i = lo
+        else:
+            i = next((i for i in range(n) if admits(i)), n)
+
+        p = (base + (band_fee(i) if i < n else above_fee)) / divisor
+        if i > 0:
+            lower = bounds[i - 1]
+            if not closed[i - 1]:
+                p = p if p > lower else lower
+            elif not p > lower:
+                p = lower + 0.01
+        return p
+
+    def solve_prices(self, base, divisor, above_fee=None, include_fees=True):
+        """Vectorized solve_price over arrays of base, divisor, above_fee and include_fees."""
+        np, (bounds, fees, closed) = self._np()
+        base, divisor, above_fee, include_fees = np.broadcast_arrays(
+            np.asarray(base, dtype=float),
+            np.asarray(divisor, dtype=float),
+            np.asarray(self.above if above_fee is None else above_fee, dtype=float),
+            np.asarray(include_fees, dtype=bool),
+        )
+        n = len(self.bounds)
+
+        def admits(i):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                p = (base + np.where(include_fees, fees[i], 0.0)) / divisor
+            return np.where(closed[i], p <= bounds[i], p < bounds[i])
+
+        # Bisection over bands, run for every element at once.
+        lo = np.zeros(base.shape, dtype=np.intp)
+        hi = np.full(base.shape, n, dtype=np.intp)
+        while (lo < hi).any():
+            mid = (lo + hi) // 2
+            ok = admits(np.minimum(mid, n - 1))
+            active = lo < hi
+            hi = np.where(active & ok, mid, hi)
+            lo = np.where(active & ~ok, mid + 1, lo)
+        band = lo
+
+        unsafe = include_fees & (divisor < 2 * self._monotone_divisor)
+        if unsafe.any():
+            linear = np.full(base.shape, n, dtype=np.intp)
+            for i in range(n - 1, -1, -1):
+                linear = np.where(admits(i), i, linear)
+            band = np.where(unsafe, linear, band)
+
+        inner = np.minimum(band, n - 1)
+        fee = np.where(band < n, np.where(include_fees, fees[inner], 0.0), above_fee)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p = (base + fee) / divisor
+        lower_idx = np.maximum(band - 1, 0)
+        lower = bounds[lower_idx]
+        lower_open = ~closed[lower_idx]
+        clamped = np.where(lower_open, lower, lower + 0.01)
+        return np.where((band > 0) & ~(p > lower), clamped, p)
+
+    @classmethod
+    def from_csv(cls, path, bound_column: str, fee_column: str, above: float | None = None) -> "FeeSchedule":
+        """Load a schedule from a CSV file with one band per row."""
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        return cls(((row[bound_column], row[fee_column]) for row in rows), above)
+
+
+def load_fee_schedules(path, key_column: str, bound_column: str, fee_column: str) -> dict:
+    """Load one FeeSchedule per distinct `key_column` value (e.g. per region) from a CSV."""
+    bands = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            bands.setdefault(row[key_column], []).append((row[bound_column], row[fee_column]))
+    return {key: FeeSchedule(rows) for key, rows in bands.items()}
+
+
+# Free shipping (and the end of the fixed fee) starts at this price on
+# Mercado Livre; the same cutover moves Amazon DBA to weight-based fees.
+ML_FREE_SHIPPING_MIN = 79.0
+AMAZON_DBA_WEIGHT_MIN_PRICE = 79.0
+
+ML_FIXED_FEE_SCHEDULE = FeeSchedule(
+    [(bound, fee, bound < ML_FREE_SHIPPING_MIN) for bound, fee in MERCADO_LIVRE["fixed_fees"]],
+    above=0.0,
+)
+AMAZON_DBA_PRICE_SCHEDULE = FeeSchedule(
+    [*AMAZON["dba_fees"]["fixed"][:-1], (AMAZON_DBA_WEIGHT_MIN_PRICE, AMAZON["dba_fees"]["fixed"][-1][1], False)]
+)
+AMAZON_DBA_WEIGHT_SCHEDULE = FeeSchedule(AMAZON["dba_fees"]["weight"])
+
+
+# ─────────────────────────────────────────────────────────────
+# CALCULATION ENGINE
+# ─────────────────────────────────────────────────────────────
+def calc_ml_fixed_fee(sale_price: float) -> float:
+    """Calculate Mercado Livre fixed fee based on price range."""
+    return ML_FIXED_FEE_SCHEDULE.fee(sale_price)
+
+
+def calculate_mercado_livre(
+    cost: float,
+    ad_type: str,
+    category: str,
+    extra_cost: float,
+    shipping_cost: float, # Cost if Free Shipping applies (>= 79)
+    tax_pct: float,
+    fixed_expenses_per_unit: float,
+    desired_margin_pct: float,
+    other_pct: float,
+    include_fixed_fee: bool = True,
+) -> dict:
+    commission_pct = MERCADO_LIVRE["ad_types"][ad_type][category]
+
+    tax_factor = tax_pct / 100
+    commission_factor = commission_pct / 100
+    other_factor = other_pct / 100
+    margin_factor = desired_margin_pct / 100
+    
+    divisor = 1 - (commission_factor + tax_factor + margin_factor + other_factor)
+    
+    suggested_price = 0.0
+    
+    if divisor > 0.01:
+        # Below 79 the fixed fee tier applies (if charged); from 79 on there is
+        # no fixed fee but the seller pays shipping, and the price is at least 79.
+        suggested_price = ML_FIXED_FEE_SCHEDULE.solve_price(
+            cost + extra_cost + fixed_expenses_per_unit,
+            divisor,
+            above_fee=shipping_cost,
+            include_fees=include_fixed_fee,
+        )
+
+    final_price = round(suggested_price, 2)
+    
+    # Recalculate actuals
+    real_fixed_fee = calc_ml_fixed_fee(final_price) if include_fixed_fee else 0.0
+    real_shipping = shipping_cost if final_price >= 79.00 else 0.0
+    
+    commission = final_price * commission_factor
+    tax = final_price * tax_factor
+    other = final_price * other_factor
+    
+    total_fees = commission + real_fixed_fee + other
+    
+    # Total Cost = Product + Extra + FixedExp + Shipping + Fees + Tax
+    total_cost = cost + extra_cost + fixed_expenses_per_unit + real_shipping + total_fees + tax
+    profit = final_price - total_cost
+    
+    margin = (profit / final_price * 100) if final_price > 0 else 0
+    roi_base = cost + extra_cost + real_shipping + fixed_expenses_per_unit
+    roi = (profit / roi_base * 100) if roi_base > 0 else 0
+
+    return {
+        "profit": profit,
+        "margin": margin,
+        "roi": roi,
+        "total_fees": total_fees + tax,
+        "commission": commission,
+        "commission_pct": commission_pct,
+        "fixed_fee": real_fixed_fee,
+        "shipping_cost": real_shipping, # Add this for specific display if needed
+        "tax": tax,
+        "you_receive": final_price - total_fees - tax - real_shipping,
+        "suggested_price": final_price,
+        "total_cost": total_cost,
+    }
+
+
+def calculate_amazon(
+    cost: float,
+    logistics: str, # "dba" or "fbm"
+    category: str,
+    extra_cost: float,
+    shipping_cost: float,
+    weight_g: float,
+    tax_pct: float,
+    fixed_expenses_per_unit: float,
+    desired_margin_pct: float,
+    other_pct: float,
+    weight_schedule: FeeSchedule | None = None, # DBA weight bands; defaults to AMAZON["dba_fees"]["weight"]
+) -> dict:
+    commission_pct = AMAZON["categories"][category]
+    if weight_schedule is None:
+        weight_schedule = AMAZON_DBA_WEIGHT_SCHEDULE
+
+    def get_dba_fee(price, weight):
+        if price < AMAZON_DBA_WEIGHT_MIN_PRICE:
+            return AMAZON_DBA_PRICE_SCHEDULE.fee(price)
+        else:
+            return weight_schedule.fee(weight)
+
+    suggested_price = 0.0
+    tax_factor = tax_pct / 100
+    commission_factor = commission_pct / 100
+    other_factor = other_pct / 100
+    margin_factor = desired_margin_pct / 100
+    
+    divisor = 1 - (commission_factor + tax_factor + margin_factor + other_factor)
+    
+    if divisor <= 0.01:
+        suggested_price = 0.0
+    else:
+        if logistics == "dba":
+            # Price tiers below 79, weight-based fee (and a 79 floor) above.
+            suggested_price = AMAZON_DBA_PRICE_SCHEDULE.solve_price(
+                cost + extra_cost + fixed_expenses_per_unit,
+                divisor,
+                above_fee=weight_schedule.fee(weight_g),
+            )
+        else:
+            suggested_price = (cost + extra_cost + fixed_expenses_per_unit + shipping_cost) / divisor
+
+    final_price = round(suggested_price, 2)
+    
+    logistics_fee = 0.0
+    if logistics == "dba":
+        logistics_fee = get_dba_fee(final_price, weight_g)
+
+    commission = final_price * commission_factor
+    tax = final_price * tax_factor
+    other = final_price * other_factor
+    
+    total_fees = commission + logistics_fee + other
+    fbm_cost = shipping_cost if logistics == "fbm" else 0.0
+    
+    # Revenue - Expenses
+    profit = final_price - (cost + extra_cost + fixed_expenses_per_unit + fbm_cost + total_fees + tax)
+    
+    margin = (profit / final_price * 100) if final_price > 0 else 0
+    roi_base = cost + extra_cost + fbm_cost
+    roi = (profit / roi_base * 100) if roi_base > 0 else 0
+
+    return {
+        "profit": profit,
+        "margin": margin,
+        "roi": roi,
+        "total_fees": total_fees + tax,
+        "commission": commission,
+        "commission_pct": commission_pct,
+        "plan_fee": logistics_fee,
+        "tax": tax,
+        "you_receive": final_price - total_fees - tax,
+        "suggested_price": final_price,
+        "total_cost": roi_base + total_fees + tax + fixed_expenses_per_unit, 
+    }
+
+
+def calculate_shopee(
+    cost: float,
+    category: str,
+    seller_type: str,
+    free_shipping: bool,
+    extra_cost: float,
+    shipping_cost: float,
+    tax_pct: float,
+    fixed_expenses_per_unit: float,
+    desired_margin_pct: float,
+    other_pct: float,
+) -> dict:
+    commission_pct = SHOPEE["categories"][category] # Base commission
+    
+    if free_shipping:
+        commission_pct += 6.0 # Add 6% for free shipping program
+        
+    # Iterative Price Calc
+    tax_factor = tax_pct / 100
+    commission_factor = commission_pct / 100
+    other_factor = other_pct / 100
+    margin_factor = desired_margin_pct / 100
+    
+    # Try Standard Fee (4.00)
+    divisor_std = 1 - (commission_factor + tax_factor + margin_factor + other_factor)
+    suggested_price = 0.0
+    
+    if divisor_std > 0.01:
+        p_std = (cost + extra_cost + shipping_cost + fixed_expenses_per_unit + 4.00) / divisor_std
+        if p_std >= 8.00:
+            suggested_price = p_std
+        else:
+            # Try Small Item Fee (50% of Price)
+            # Price = (Costs) / (1 - VarFees - 0.5)
+            # VarFees includes Commission!
+            # Example: 14% comm + 50% fixed = 64% fees
+            divisor_small = 1 - (commission_factor + tax_factor + margin_factor + other_factor + 0.5)
+            if divisor_small > 0.01:
+                p_small = (cost + extra_cost + shipping_cost + fixed_expenses_per_unit) / divisor_small
+                suggested_price = p_small
+            else:
+                suggested_price = 0.0 
+    
+    final_price = round(suggested_price, 2)
+    
+    # Metrics
+    if final_price > 0 and final_price < 8.00:
+        real_fixed_fee = final_price * 0.5
+    else:
+        real_fixed_fee = 4.00
+        
+    commission = final_price * commission_factor
+    tax = final_price * tax_factor
+    other = final_price * other_factor
+    
+    total_fees = commission + real_fixed_fee + other
+    total_cost = cost + extra_cost + shipping_cost + fixed_expenses_per_unit + total_fees + tax
+    profit = final_price - total_cost
+    
+    margin = (profit / final_price * 100) if final_price > 0 else 0
+    roi_base = cost + extra_cost + shipping_cost + fixed_expenses_per_unit
+    roi = (profit / roi_base * 100) if roi_base > 0 else 0
+
+    return {
+        "profit": profit,
+        "margin": margin,
+        "roi": roi,
+        "total_fees": total_fees + tax,
+        "commission": commission,
+        "commission_pct": commission_pct,
+        "fixed_fee": real_fixed_fee,
+        "tax": tax,
+        "you_receive": final_price - total_fees - tax,
+        "suggested_price": final_price,
+        "total_cost": total_cost,
+    }
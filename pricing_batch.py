@@ -0,0 +1,395 @@
+import numpy as np
+import pandas as pd
+
+from pricing import (
+    AMAZON,
+    AMAZON_DBA_PRICE_SCHEDULE,
+    AMAZON_DBA_WEIGHT_MIN_PRICE,
+    AMAZON_DBA_WEIGHT_SCHEDULE,
+    MERCADO_LIVRE,
+    ML_FIXED_FEE_SCHEDULE,
+    ML_FREE_SHIPPING_MIN,
+    SHOPEE,
+)
+
+
+# ─────────────────────────────────────────────────────────────
+# BATCH PRICING ENGINE
+# ─────────────────────────────────────────────────────────────
+# Array versions of the calculate_* functions in pricing.py. They follow
+# the scalar code operation by operation, so every column matches the
+# dict returned for the same row bit for bit.
+BATCH_PARAMS = {
+    "mercado_livre": (
+        "cost", "ad_type", "category", "extra_cost", "shipping_cost", "tax_pct",
+        "fixed_expenses_per_unit", "desired_margin_pct", "other_pct", "include_fixed_fee",
+    ),
+    "amazon": (
+        "cost", "logistics", "category", "extra_cost", "shipping_cost", "weight_g", "tax_pct",
+        "fixed_expenses_per_unit", "desired_margin_pct", "other_pct",
+    ),
+    "shopee": (
+        "cost", "category", "seller_type", "free_shipping", "extra_cost", "shipping_cost",
+        "tax_pct", "fixed_expenses_per_unit", "desired_margin_pct", "other_pct",
+    ),
+}
+
+BATCH_DEFAULTS = {
+    "include_fixed_fee": True,
+}
+
+# Keyword-only settings that apply to the whole batch rather than per row.
+BATCH_OPTIONS = {
+    "amazon": {"weight_schedule": None},
+}
+
+BATCH_TEXT_PARAMS = {"ad_type", "category", "logistics", "seller_type"}
+BATCH_FLAG_PARAMS = {"include_fixed_fee", "free_shipping"}
+
+# Rows per block. Small enough that the temporaries of one block stay in
+# CPU cache, large enough that NumPy call overhead is negligible.
+BATCH_CHUNK_ROWS = 16384
+
+
+def round_money(values: np.ndarray) -> np.ndarray:
+    """Vectorized round(x, 2) that agrees with Python's builtin on every element."""
+    scaled = values * 100.0
+    floor = np.floor(scaled)
+    frac = scaled - floor
+    out = (floor + (frac > 0.5)) / 100.0
+    # Near a .xx5 tie the product above can land on the wrong side of the
+    # exact decimal value. Those rows are rare, so hand them to the builtin.
+    ambiguous = np.abs(frac - 0.5) <= np.abs(scaled) * 1e-12
+    if ambiguous.any():
+        out[ambiguous] = [round(v, 2) for v in values[ambiguous].tolist()]
+    return out
+
+
+def _factorize(keys: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    # factorize codes missing keys (None/NaN) as -1, which would index the
+    # last distinct key; raise the KeyError calculate_* gives for them instead
+    codes, uniques = pd.factorize(keys)
+    missing = codes < 0
+    if missing.any():
+        raise KeyError(keys.iloc[int(missing.argmax())])
+    return codes, uniques
+
+
+def _lookup_pct(keys: pd.Series, table: dict) -> np.ndarray:
+    # Look up each distinct key once, then fan the rates back out by code.
+    codes, uniques = _factorize(keys)
+    return np.array([table[key] for key in uniques], dtype=float)[codes]
+
+
+def _ratio_or_zero(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den * 100, 0.0)
+
+
+def _rates_mercado_livre(ad_type: pd.Series, category: pd.Series) -> dict:
+    ad_codes, ad_types = _factorize(ad_type)
+    cat_codes, categories = _factorize(category)
+    pair_codes = ad_codes * len(categories) + cat_codes
+    grid = np.full(len(ad_types) * len(categories), np.nan)
+    for p in np.flatnonzero(np.bincount(pair_codes, minlength=grid.size)):
+        grid[p] = MERCADO_LIVRE["ad_types"][ad_types[p // len(categories)]][categories[p % len(categories)]]
+    return {"commission_pct": grid[pair_codes]}
+
+
+def _rates_amazon(logistics: pd.Series, category: pd.Series) -> dict:
+    return {
+        "commission_pct": _lookup_pct(category, AMAZON["categories"]),
+        "is_dba": (logistics == "dba").to_numpy(),
+        "is_fbm": (logistics == "fbm").to_numpy(),
+    }
+
+
+def _rates_shopee(category: pd.Series, seller_type: pd.Series) -> dict:
+    return {"commission_pct": _lookup_pct(category, SHOPEE["categories"])}
+
+
+def _batch_mercado_livre(commission_pct, cost, extra_cost, shipping_cost, tax_pct,
+                         fixed_expenses_per_unit, desired_margin_pct, other_pct, include_fixed_fee):
+    tax_factor = tax_pct / 100
+    commission_factor = commission_pct / 100
+    other_factor = other_pct / 100
+    margin_factor = desired_margin_pct / 100
+
+    divisor = 1 - (commission_factor + tax_factor + margin_factor + other_factor)
+
+    suggested_price = np.where(
+        divisor > 0.01,
+        ML_FIXED_FEE_SCHEDULE.solve_prices(
+            cost + extra_cost + fixed_expenses_per_unit,
+            divisor,
+            above_fee=shipping_cost,
+            include_fees=include_fixed_fee,
+        ),
+        0.0,
+    )
+
+    final_price = round_money(suggested_price)
+    return _outcome_mercado_livre(final_price, commission_pct, cost, extra_cost, shipping_cost, tax_pct,
+                                  fixed_expenses_per_unit, other_pct, include_fixed_fee)
+
+
+def _outcome_mercado_livre(final_price, commission_pct, cost, extra_cost, shipping_cost, tax_pct,
+                           fixed_expenses_per_unit, other_pct, include_fixed_fee):
+    tax_factor = tax_pct / 100
+    commission_factor = commission_pct / 100
+    other_factor = other_pct / 100
+
+    real_fixed_fee = np.where(include_fixed_fee, ML_FIXED_FEE_SCHEDULE.fees_for(final_price), 0.0)
+    real_shipping = np.where(final_price >= ML_FREE_SHIPPING_MIN, shipping_cost, 0.0)
+
+    commission = final_price * commission_factor
+    tax = final_price * tax_factor
+    other = final_price * other_factor
+
+    total_fees = commission + real_fixed_fee + other
+    total_cost = cost + extra_cost + fixed_expenses_per_unit + real_shipping + total_fees + tax
+    profit = final_price - total_cost
+
+    roi_base = cost + extra_cost + real_shipping + fixed_expenses_per_unit
+    return {
+        "profit": profit,
+        "margin": _ratio_or_zero(profit, final_price),
+        "roi": _ratio_or_zero(profit, roi_base),
+        "total_fees": total_fees + tax,
+        "commission": commission,
+        "commission_pct": commission_pct,
+        "fixed_fee": real_fixed_fee,
+        "shipping_cost": real_shipping,
+        "tax": tax,
+        "you_receive": final_price - total_fees - tax - real_shipping,
+        "suggested_price": final_price,
+        "total_cost": total_cost,
+    }
+
+
+def _batch_amazon(commission_pct, is_dba, is_fbm, cost, extra_cost, shipping_cost, weight_g, tax_pct,
+                  fixed_expenses_per_unit, desired_margin_pct, other_pct, weight_schedule=None):
+    if weight_schedule is None:
+        weight_schedule = AMAZON_DBA_WEIGHT_SCHEDULE
+    w_fee = weight_schedule.fees_for(weight_g)
+
+    tax_factor = tax_pct / 100
+    commission_factor = commission_pct / 100
+    other_factor = other_pct / 100
+    margin_factor = desired_margin_pct / 100
+
+    divisor = 1 - (commission_factor + tax_factor + margin_factor + other_factor)
+
+    dba_price = AMAZON_DBA_PRICE_SCHEDULE.solve_prices(cost + extra_cost + fixed_expenses_per_unit, divisor, above_fee=w_fee)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_fbm = (cost + extra_cost + fixed_expenses_per_unit + shipping_cost) / divisor
+    suggested_price = np.where(divisor <= 0.01, 0.0, np.where(is_dba, dba_price, p_fbm))
+
+    final_price = round_money(suggested_price)
+    return _outcome_amazon(final_price, commission_pct, is_dba, is_fbm, cost, extra_cost, shipping_cost, w_fee,
+                           tax_pct, fixed_expenses_per_unit, other_pct)
+
+
+def _outcome_amazon(final_price, commission_pct, is_dba, is_fbm, cost, extra_cost, shipping_cost, w_fee,
+                    tax_pct, fixed_expenses_per_unit, other_pct):
+    tax_factor = tax_pct / 100
+    commission_factor = commission_pct / 100
+    other_factor = other_pct / 100
+
+    dba_fee = np.where(final_price < AMAZON_DBA_WEIGHT_MIN_PRICE, AMAZON_DBA_PRICE_SCHEDULE.fees_for(final_price), w_fee)
+    logistics_fee = np.where(is_dba, dba_fee, 0.0)
+
+    commission = final_price * commission_factor
+    tax = final_price * tax_factor
+    other = final_price * other_factor
+
+    total_fees = commission + logistics_fee + other
+    fbm_cost = np.where(is_fbm, shipping_cost, 0.0)
+
+    profit = final_price - (cost + extra_cost + fixed_expenses_per_unit + fbm_cost + total_fees + tax)
+
+    roi_base = cost + extra_cost + fbm_cost
+    return {
+        "profit": profit,
+        "margin": _ratio_or_zero(profit, final_price),
+        "roi": _ratio_or_zero(profit, roi_base),
+        "total_fees": total_fees + tax,
+        "commission": commission,
+        "commission_pct": commission_pct,
+        "plan_fee": logistics_fee,
+        "tax": tax,
+        "you_receive": final_price - total_fees - tax,
+        "suggested_price": final_price,
+        "total_cost": roi_base + total_fees + tax + fixed_expenses_per_unit,
+    }
+
+
+def _batch_shopee(commission_pct, free_shipping, cost, extra_cost, shipping_cost,
+                  tax_pct, fixed_expenses_per_unit, desired_margin_pct, other_pct):
+    commission_pct = np.where(free_shipping, commission_pct + 6.0, commission_pct)
+
+    tax_factor = tax_pct / 100
+    commission_factor = commission_pct / 100
+    other_factor = other_pct / 100
+    margin_factor = desired_margin_pct / 100
+
+    divisor_std = 1 - (commission_factor + tax_factor + margin_factor + other_factor)
+    divisor_small = 1 - (commission_factor + tax_factor + margin_factor + other_factor + 0.5)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_std = (cost + extra_cost + shipping_cost + fixed_expenses_per_unit + 4.00) / divisor_std
+        p_small = (cost + extra_cost + shipping_cost + fixed_expenses_per_unit) / divisor_small
+    suggested_price = np.select(
+        [~(divisor_std > 0.01), p_std >= 8.00, divisor_small > 0.01],
+        [0.0, p_std, p_small],
+        0.0,
+    )
+
+    final_price = round_money(suggested_price)
+    return _outcome_shopee(final_price, commission_pct, cost, extra_cost, shipping_cost, tax_pct,
+                           fixed_expenses_per_unit, other_pct)
+
+
+def _outcome_shopee(final_price, commission_pct, cost, extra_cost, shipping_cost, tax_pct,
+                    fixed_expenses_per_unit, other_pct):
+    # commission_pct already includes the free shipping surcharge
+    tax_factor = tax_pct / 100
+    commission_factor = commission_pct / 100
+    other_factor = other_pct / 100
+
+    real_fixed_fee = np.where((final_price > 0) & (final_price < 8.00), final_price * 0.5, 4.00)
+
+    commission = final_price * commission_factor
+    tax = final_price * tax_factor
+    other = final_price * other_factor
+
+    total_fees = commission + real_fixed_fee + other
+    total_cost = cost + extra_cost + shipping_cost + fixed_expenses_per_unit + total_fees + tax
+    profit = final_price - total_cost
+
+    roi_base = cost + extra_cost + shipping_cost + fixed_expenses_per_unit
+    return {
+        "profit": profit,
+        "margin": _ratio_or_zero(profit, final_price),
+        "roi": _ratio_or_zero(profit, roi_base),
+        "total_fees": total_fees + tax,
+        "commission": commission,
+        "commission_pct": commission_pct,
+        "fixed_fee": real_fixed_fee,
+        "tax": tax,
+        "you_receive": final_price - total_fees - tax,
+        "suggested_price": final_price,
+        "total_cost": total_cost,
+    }
+
+
+def _evaluate_mercado_livre(sale_price, commission_pct, cost, extra_cost, shipping_cost, tax_pct,
+                            fixed_expenses_per_unit, other_pct, include_fixed_fee):
+    return _outcome_mercado_livre(round_money(sale_price), commission_pct, cost, extra_cost, shipping_cost, tax_pct,
+                                  fixed_expenses_per_unit, other_pct, include_fixed_fee)
+
+
+def _evaluate_amazon(sale_price, commission_pct, is_dba, is_fbm, cost, extra_cost, shipping_cost, weight_g, tax_pct,
+                     fixed_expenses_per_unit, other_pct, weight_schedule=None):
+    if weight_schedule is None:
+        weight_schedule = AMAZON_DBA_WEIGHT_SCHEDULE
+    return _outcome_amazon(round_money(sale_price), commission_pct, is_dba, is_fbm, cost, extra_cost, shipping_cost,
+                           weight_schedule.fees_for(weight_g), tax_pct, fixed_expenses_per_unit, other_pct)
+
+
+def _evaluate_shopee(sale_price, commission_pct, free_shipping, cost, extra_cost, shipping_cost,
+                     tax_pct, fixed_expenses_per_unit, other_pct):
+    commission_pct = np.where(free_shipping, commission_pct + 6.0, commission_pct)
+    return _outcome_shopee(round_money(sale_price), commission_pct, cost, extra_cost, shipping_cost, tax_pct,
+                           fixed_expenses_per_unit, other_pct)
+
+
+BATCH_ENGINES = {
+    "mercado_livre": (_rates_mercado_livre, _batch_mercado_livre),
+    "amazon": (_rates_amazon, _batch_amazon),
+    "shopee": (_rates_shopee, _batch_shopee),
+}
+
+# Same fee logic at a given sale price instead of one solved from the margin
+EVALUATE_KERNELS = {
+    "mercado_livre": _evaluate_mercado_livre,
+    "amazon": _evaluate_amazon,
+    "shopee": _evaluate_shopee,
+}
+
+
+def _gather(df: pd.DataFrame, platform: str, params, constants: dict) -> dict:
+    # Column or constant for each parameter, with the per-row rates looked up
+    n = len(df)
+    text, arrays = {}, {}
+    for param in params:
+        if param in df.columns:
+            values = df[param]
+        elif param in constants:
+            values = constants[param]
+        elif param in BATCH_DEFAULTS:
+            values = BATCH_DEFAULTS[param]
+        else:
+            raise KeyError(f"Missing column or constant for '{param}'.")
+
+        if param in BATCH_TEXT_PARAMS:
+            text[param] = values
+        elif param in BATCH_FLAG_PARAMS:
+            arrays[param] = np.broadcast_to(np.asarray(values, dtype=bool), (n,))
+        else:
+            arrays[param] = np.broadcast_to(np.asarray(values, dtype=float), (n,))
+
+    rates = BATCH_ENGINES[platform][0]
+    if any(isinstance(values, pd.Series) for values in text.values()):
+        text = {k: v if isinstance(v, pd.Series) else pd.Series([v] * n, dtype=object) for k, v in text.items()}
+        arrays.update(rates(**text))
+    else:
+        # Every text parameter is a constant: look the rates up once
+        single = rates(**{k: pd.Series([v], dtype=object) for k, v in text.items()})
+        arrays.update({k: np.broadcast_to(v, (n,)) for k, v in single.items()})
+    return arrays
+
+
+def _run_blocks(kernel, arrays: dict, options: dict, index) -> pd.DataFrame:
+    # Fill one preallocated (columns, rows) array block by block; its
+    # transpose is laid out the way pandas stores a float frame, so the
+    # DataFrame below wraps it without another copy.
+    n = len(index)
+    keys = list(kernel(**{k: v[:1] for k, v in arrays.items()}, **options))
+    out = np.empty((len(keys), n))
+    for start in range(0, n, BATCH_CHUNK_ROWS):
+        block = kernel(**{k: v[start:start + BATCH_CHUNK_ROWS] for k, v in arrays.items()}, **options)
+        for j, key in enumerate(keys):
+            out[j, start:start + BATCH_CHUNK_ROWS] = block[key]
+    return pd.DataFrame(out.T, index=index, columns=keys, copy=False)
+
+
+def price_batch(df: pd.DataFrame, platform: str, **constants) -> pd.DataFrame:
+    """Price every row of `df` on one marketplace with array operations.
+
+    `platform` is "mercado_livre", "amazon" or "shopee". Columns are named
+    after the parameters of the matching calculate_* function; a parameter
+    that is the same for every row can be passed as a keyword instead.
+    Amazon also takes `weight_schedule`, a FeeSchedule of DBA weight bands.
+    Returns one column per key of the scalar result dict, on df's index.
+    """
+    if platform not in BATCH_ENGINES:
+        raise ValueError(f"Unknown platform {platform!r}. Use one of {sorted(BATCH_ENGINES)}.")
+    arrays = _gather(df, platform, BATCH_PARAMS[platform], constants)
+    options = {key: constants.get(key, default) for key, default in BATCH_OPTIONS.get(platform, {}).items()}
+    return _run_blocks(BATCH_ENGINES[platform][1], arrays, options, df.index)
+
+
+def evaluate_batch(df: pd.DataFrame, platform: str, **constants) -> pd.DataFrame:
+    """Outcome of selling every row of `df` at its own `sale_price`.
+
+    Takes the same columns/constants as price_batch, with `sale_price`
+    (rounded to cents) in place of `desired_margin_pct`, and runs the same
+    fee logic the calculator applies once it has settled on a price. The
+    "suggested_price" column is therefore the evaluated sale price.
+    """
+    if platform not in EVALUATE_KERNELS:
+        raise ValueError(f"Unknown platform {platform!r}. Use one of {sorted(EVALUATE_KERNELS)}.")
+    params = ("sale_price", *(p for p in BATCH_PARAMS[platform] if p != "desired_margin_pct"))
+    arrays = _gather(df, platform, params, constants)
+    options = {key: constants.get(key, default) for key, default in BATCH_OPTIONS.get(platform, {}).items()}
+    return _run_blocks(EVALUATE_KERNELS[platform], arrays, options, df.index)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from pricing import ML_FREE_SHIPPING_MIN
+from pricing_batch import evaluate_batch, price_batch
+
+
+# ─────────────────────────────────────────────────────────────
+# SENSITIVITY GRID
+# ─────────────────────────────────────────────────────────────
+# Swept (x, y) parameter pairs offered by the sensitivity view
+SENSITIVITY_AXES = {
+    "price_cost": ("sale_price", "cost"),
+    "margin_tax": ("desired_margin_pct", "tax_pct"),
+}
+
+SENSITIVITY_POINTS = 500
+
+GRID_RESULTS = ("profit", "margin", "roi", "suggested_price")
+
+
+def axis_values(param: str, inputs: dict, suggested_price: float, points: int = SENSITIVITY_POINTS) -> np.ndarray:
+    """Default sweep for one parameter around the current simulation.
+
+    Sale prices start at R$ 1.00 and always reach past the ML free
+    shipping threshold, so the 8.00/79.00 fee tiers show up on the map.
+    """
+    if param == "sale_price":
+        return np.linspace(1.0, max(2 * suggested_price, 1.5 * ML_FREE_SHIPPING_MIN), points)
+    if param == "cost":
+        return np.linspace(0.0, max(2 * inputs["cost"], 10.0), points)
+    if param == "desired_margin_pct":
+        return np.linspace(0.0, 60.0, points)
+    if param == "tax_pct":
+        return np.linspace(0.0, 30.0, points)
+    raise ValueError(f"No default sweep for {param!r}.")
+
+
+def sensitivity_grid(platform: str, x_param: str, x_values, y_param: str, y_values, **params) -> dict:
+    """Results over every (x, y) pair, as {key: array of shape (len(y), len(x))}.
+
+    The grid is flattened into one frame and evaluated in a single batch
+    call: evaluate_batch when one axis is the sale price, price_batch
+    (the margin-driven price) otherwise. `params` holds the remaining
+    calculate_* arguments; any that name a swept axis are ignored.
+    """
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float)
+    frame = pd.DataFrame({
+        x_param: np.tile(x_values, len(y_values)),
+        y_param: np.repeat(y_values, len(x_values)),
+    })
+    constants = {k: v for k, v in params.items() if k not in (x_param, y_param)}
+    if "sale_price" in (x_param, y_param):
+        constants.pop("desired_margin_pct", None)
+        result = evaluate_batch(frame, platform, **constants)
+    else:
+        result = price_batch(frame, platform, **constants)
+    shape = (len(y_values), len(x_values))
+    return {key: result[key].to_numpy().reshape(shape) for key in GRID_RESULTS}
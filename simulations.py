@@ -0,0 +1,310 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# ─────────────────────────────────────────────────────────────
+# SAVED SIMULATIONS
+# ─────────────────────────────────────────────────────────────
+# (column, display label, SQL type) of every stored field, in display order
+SIMULATION_FIELDS = (
+    ("created_at", "Data/Hora", "TEXT NOT NULL"),
+    ("product", "Produto", "TEXT NOT NULL"),
+    ("platform", "Plataforma", "TEXT NOT NULL"),
+    ("cost", "Custo (R$)", "REAL"),
+    ("sale_price", "Venda (R$)", "REAL"),
+    ("profit", "Lucro (R$)", "REAL"),
+    ("margin", "Margem (%)", "REAL"),
+    ("roi", "ROI (%)", "REAL"),
+    ("total_cost", "Custo Total (R$)", "REAL"),
+    ("fees", "Taxas (R$)", "REAL"),
+    ("tax", "Imposto (R$)", "REAL"),
+)
+
+SIMULATION_LABELS = {column: label for column, label, _ in SIMULATION_FIELDS}
+_COLUMNS_BY_LABEL = {label: column for column, label, _ in SIMULATION_FIELDS}
+
+
+class SimulationStore:
+    """Saved calculator simulations in SQLite, queried a page at a time.
+
+    Records are dicts keyed by the display labels in SIMULATION_FIELDS
+    ("Data/Hora" as "YYYY-MM-DD HH:MM:SS"). Every record belongs to an
+    `owner` key (a user, workspace or browser token), and every read and `clear`
+    only sees that owner's records. Owner with product, platform or
+    timestamp is indexed, so filtering by them and the default newest
+    first order read only the requested page.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        columns = ",\n".join(f"                {column} {sql_type}" for column, _, sql_type in SIMULATION_FIELDS)
+        self._conn.executescript(
+            f"""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS simulations (
+                id INTEGER PRIMARY KEY,
+                owner TEXT NOT NULL DEFAULT '',
+{columns}
+            );
+            """
+        )
+        # Files from before owners were tracked: their rows get owner '' and no session sees them
+        if "owner" not in {row[1] for row in self._conn.execute("PRAGMA table_info(simulations)")}:
+            self._conn.execute("ALTER TABLE simulations ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+        self._conn.executescript(
+            """
+            DROP INDEX IF EXISTS simulations_product;
+            DROP INDEX IF EXISTS simulations_platform;
+            DROP INDEX IF EXISTS simulations_created_at;
+            CREATE INDEX IF NOT EXISTS simulations_owner_product ON simulations (owner, product, created_at);
+            CREATE INDEX IF NOT EXISTS simulations_owner_platform ON simulations (owner, platform, created_at);
+            CREATE INDEX IF NOT EXISTS simulations_owner_created_at ON simulations (owner, created_at);
+            """
+        )
+        self._conn.commit()
+
+    def add(self, owner: str, record: dict) -> int:
+        """Store one record for `owner`; returns its id."""
+        columns = ["owner", *(column for column, label, _ in SIMULATION_FIELDS if label in record)]
+        values = [owner, *(record[SIMULATION_LABELS[column]] for column in columns[1:])]
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                f"INSERT INTO simulations ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values
+            )
+        return cur.lastrowid
+
+    @staticmethod
+    def _where(owner: str, product: str | None, platform: str | None) -> tuple[str, list]:
+        clauses, params = ["owner = ?"], [owner]
+        if product is not None:
+            clauses.append("product = ?")
+            params.append(product)
+        if platform is not None:
+            clauses.append("platform = ?")
+            params.append(platform)
+        return " WHERE " + " AND ".join(clauses), params
+
+    def count(self, owner: str, product: str | None = None, platform: str | None = None) -> int:
+        where, params = self._where(owner, product, platform)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM simulations{where}", params).fetchone()[0]
+
+    def page(self, owner: str, offset: int = 0, limit: int = 50, product: str | None = None,
+             platform: str | None = None, sort_by: str = "Data/Hora", descending: bool = True) -> pd.DataFrame:
+        """Records `offset`..`offset + limit` of `owner` matching the filters, sorted by a display label.
+
+        A `limit` of None returns every matching record (e.g. for exports).
+        """
+        if sort_by not in _COLUMNS_BY_LABEL:
+            raise ValueError(f"Unknown column {sort_by!r}.")
+        where, params = self._where(owner, product, platform)
+        direction = "DESC" if descending else "ASC"
+        query = (
+            f"SELECT {', '.join(column for column, _, _ in SIMULATION_FIELDS)} FROM simulations{where}"
+            f" ORDER BY {_COLUMNS_BY_LABEL[sort_by]} {direction}, id {direction}"
+        )
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._lock:
+            df = pd.read_sql_query(query, self._conn, params=params)
+        return df.rename(columns=SIMULATION_LABELS)
+
+    def distinct(self, owner: str, label: str) -> list:
+        """Sorted distinct values of an indexed field ("Produto" or "Plataforma") among `owner`'s records."""
+        column = _COLUMNS_BY_LABEL[label]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT {column} FROM simulations WHERE owner = ? ORDER BY {column}", (owner,)
+            )
+            return [v for (v,) in rows]
+
+    def version(self, owner: str) -> tuple:
+        """Changes whenever `owner`'s records are added or removed; cheap enough to check every rerun."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*), MAX(id) FROM simulations WHERE owner = ?", (owner,)
+            ).fetchone()
+
+    def purge(self, prefix: str, before: float | None = None) -> int:
+        """Delete every owner whose key starts with `prefix` and who saved nothing since `before` (epoch seconds).
+
+        With `before` None every such owner goes. Returns how many owners were removed.
+        """
+        query = "SELECT owner FROM simulations WHERE substr(owner, 1, ?) = ? GROUP BY owner"
+        params = [len(prefix), prefix]
+        if before is not None:
+            # created_at is local "YYYY-MM-DD HH:MM:SS", which sorts as text
+            query += " HAVING MAX(created_at) < ?"
+            params.append(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(before)))
+        with self._lock, self._conn:
+            owners = [owner for (owner,) in self._conn.execute(query, params)]
+            self._conn.executemany("DELETE FROM simulations WHERE owner = ?", [(owner,) for owner in owners])
+        return len(owners)
+
+    def clear(self, owner: str):
+        """Delete `owner`'s records; other owners' are untouched."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM simulations WHERE owner = ?", (owner,))
+
+
+# ─────────────────────────────────────────────────────────────
+# IN-MEMORY COLUMNAR VIEW
+# ─────────────────────────────────────────────────────────────
+_TEXT_COLUMNS = ("product", "platform")
+_NUMBER_COLUMNS = tuple(column for column, _, sql_type in SIMULATION_FIELDS if sql_type == "REAL")
+
+
+class SimulationBuffer:
+    """Append-only columnar copy of the saved simulations, one typed array per field.
+
+    The timestamp is datetime64[s], product and platform are int32 codes
+    into a shared list of names, the rest float64. Arrays grow by doubling,
+    so an append is amortized O(1) and never rebuilds earlier rows.
+    `frame()` wraps the filled part of the arrays in a DataFrame without
+    copying them, and filtering/sorting work on the arrays directly.
+    Written rows are never modified in place (appends go past them,
+    growing and `clear` switch to new arrays), so a frame stays valid.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._capacity = capacity
+        self._allocate()
+
+    def _allocate(self):
+        """Start over on fresh arrays (lock held, or not shared yet)."""
+        capacity = self._capacity
+        self._size = 0
+        self._created = np.empty(capacity, dtype="datetime64[s]")
+        self._codes = {column: np.empty(capacity, dtype=np.int32) for column in _TEXT_COLUMNS}
+        self._numbers = {column: np.empty(capacity) for column in _NUMBER_COLUMNS}
+        self._names = {column: [] for column in _TEXT_COLUMNS}
+        self._name_codes = {column: {} for column in _TEXT_COLUMNS}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, extra: int):
+        """Make room for `extra` more rows (lock held)."""
+        capacity = max(len(self._created), 1)
+        if self._size + extra <= capacity:
+            return
+        while capacity < self._size + extra:
+            capacity *= 2
+
+        def grow(array):
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            return grown
+
+        self._created = grow(self._created)
+        self._codes = {column: grow(array) for column, array in self._codes.items()}
+        self._numbers = {column: grow(array) for column, array in self._numbers.items()}
+
+    def _code(self, column: str, name) -> int:
+        codes = self._name_codes[column]
+        if name not in codes:
+            codes[name] = len(self._names[column])
+            self._names[column].append(name)
+        return codes[name]
+
+    def append(self, record: dict):
+        """Add one record keyed by display labels, as SimulationStore.add takes it."""
+        with self._lock:
+            self._reserve(1)
+            i = self._size
+            self._created[i] = np.datetime64(record[SIMULATION_LABELS["created_at"]].replace(" ", "T"), "s")
+            for column in _TEXT_COLUMNS:
+                self._codes[column][i] = self._code(column, record[SIMULATION_LABELS[column]])
+            for column in _NUMBER_COLUMNS:
+                value = record.get(SIMULATION_LABELS[column])
+                self._numbers[column][i] = np.nan if value is None else value
+            self._size += 1
+
+    def extend(self, df: pd.DataFrame):
+        """Add every row of a frame with display-label columns (e.g. SimulationStore.page(limit=None))."""
+        n = len(df)
+        with self._lock:
+            self._reserve(n)
+            rows = slice(self._size, self._size + n)
+            self._created[rows] = pd.to_datetime(df[SIMULATION_LABELS["created_at"]]).to_numpy(dtype="datetime64[s]")
+            for column in _TEXT_COLUMNS:
+                codes, names = pd.factorize(df[SIMULATION_LABELS[column]])
+                mapping = np.array([self._code(column, name) for name in names], dtype=np.int32)
+                self._codes[column][rows] = mapping[codes]
+            for column in _NUMBER_COLUMNS:
+                self._numbers[column][rows] = pd.to_numeric(df[SIMULATION_LABELS[column]], errors="coerce")
+            self._size += n
+
+    @classmethod
+    def from_store(cls, store: SimulationStore, owner: str) -> "SimulationBuffer":
+        """Buffer holding every record `owner` stored, in insertion order."""
+        df = store.page(owner, limit=None, sort_by="Data/Hora", descending=False)
+        buffer = cls(capacity=max(1024, 2 * len(df)))
+        buffer.extend(df)
+        return buffer
+
+    def clear(self):
+        """Drop every row. Frames handed out earlier keep their data: the old
+        arrays are left to them and new rows go to fresh ones."""
+        with self._lock:
+            self._allocate()
+
+    def frame(self) -> pd.DataFrame:
+        """All rows as a DataFrame over the buffer's own arrays (no copy), in SIMULATION_FIELDS order."""
+        with self._lock:
+            n = self._size
+            columns = {SIMULATION_LABELS["created_at"]: self._created[:n]}
+            for column in _TEXT_COLUMNS:
+                columns[SIMULATION_LABELS[column]] = pd.Categorical.from_codes(
+                    self._codes[column][:n], categories=list(self._names[column]), validate=False
+                )
+            for column in _NUMBER_COLUMNS:
+                columns[SIMULATION_LABELS[column]] = self._numbers[column][:n]
+        return pd.DataFrame(columns, copy=False)[list(SIMULATION_LABELS.values())]
+
+    def distinct(self, label: str) -> list:
+        """Sorted names seen for "Produto" or "Plataforma"."""
+        with self._lock:
+            return sorted(self._names[_COLUMNS_BY_LABEL[label]])
+
+    def select(self, product: str | None = None, platform: str | None = None, sort_by: str = "Data/Hora",
+               descending: bool = True) -> np.ndarray:
+        """Positions of the matching rows in display order.
+
+        Ties keep insertion order (newest first when descending), as in
+        SimulationStore.page.
+        """
+        if sort_by not in _COLUMNS_BY_LABEL:
+            raise ValueError(f"Unknown column {sort_by!r}.")
+        with self._lock:
+            n = self._size
+            mask = np.ones(n, dtype=bool)
+            for column, name in (("product", product), ("platform", platform)):
+                if name is not None:
+                    code = self._name_codes[column].get(name, -1)
+                    mask &= self._codes[column][:n] == code
+            positions = np.flatnonzero(mask)
+
+            column = _COLUMNS_BY_LABEL[sort_by]
+            if column == "created_at":
+                keys = self._created[:n][positions]
+            elif column in _TEXT_COLUMNS:
+                # Rank of each name in alphabetical order
+                ranks = np.argsort(np.argsort(np.array(self._names[column], dtype=object), kind="stable"))
+                keys = ranks[self._codes[column][:n][positions]]
+            else:
+                keys = self._numbers[column][:n][positions]
+        order = np.argsort(keys, kind="stable")
+        return positions[order[::-1]] if descending else positions[order]
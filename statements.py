@@ -0,0 +1,438 @@
+import codecs
+import csv
+import os
+import re
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+
+# ─────────────────────────────────────────────────────────────
+# BANK STATEMENT PARSING
+# ─────────────────────────────────────────────────────────────
+# Headers, footers and summary lines that never carry a transaction
+IGNORE_TERMS = (
+    "saldo", "limite", "período", "visualização", "extrato",
+    "lançamentos", "agência", "conta:", "banco", "itaú",
+    "uniclass", "total", "s a l d o", "automático", "provisão",
+)
+
+IGNORE_DESCRIPTIONS = frozenset(["saldo do dia", "saldo anterior", "s a l d o", "total", "saldo"])
+
+PAGES_PER_TASK = 8
+
+_IGNORE_RE = re.compile("|".join(map(re.escape, IGNORE_TERMS)))
+_DATE_RE = re.compile(r"\d{2}/\d{2}")
+# Characters dropped before counting letters/digits in a description
+_NOISE_TABLE = str.maketrans("", "", "R$.%,- ")
+
+# A money token, optionally wrapped in "R$" and signed:
+#   PT-BR  1.200,50 | 50,00 | -50,00   (single comma, no dot after it unless one precedes it)
+#   plain  1200.50 | 100 | .50
+_MONEY = (
+    r"(?:R\$)?-?(?:R\$)?"
+    r"(?:(?=[\d.,]*\d)\d*(?:,\d*|\.[\d.]*,[\d.]*)|\d+(?:\.\d*)?|\.\d+)"
+    r"(?:R\$)?"
+)
+# One pass over the line: leading date (DD/MM[/YY[YY]]), then a greedy
+# description so the value is the LAST money token on the line (lines like
+# "R$ 0,00 R$ 100,00" carry the amount at the end)
+_LINE_RE = re.compile(
+    r"^\s*(?P<date>\d{2}/\d{2}(?:/\d{2,4})?)?"
+    rf"(?P<description>.*\S)?\s+(?P<value>{_MONEY})(?!\S)"
+)
+
+
+def parse_money(token: str) -> float:
+    """Convert a money token matched by the tokenizer (PT-BR or US) to float."""
+    token = token.replace("R$", "")
+    if "," in token:
+        return float(token.replace(".", "").replace(",", "."))
+    return float(token)
+
+
+def parse_statement_line(line: str):
+    """Return (description, value) for a transaction line, or None."""
+    # 1. BLOCKLIST: Ignore headers, footers, and summary lines
+    if _IGNORE_RE.search(line.lower()):
+        return None
+
+    # 2. Date, description and the last money token on the line
+    match = _LINE_RE.match(line)
+    if match is None:
+        return None
+
+    # 3. DATE REQUIREMENT: Transactions must have a date (DD/MM), usually
+    # the leading one; otherwise look for it anywhere on the line
+    if match["date"] is None and not _DATE_RE.search(line):
+        return None
+
+    description = " ".join((match["description"] or "").split())
+
+    # Ignore common useless lines
+    if description.lower() in IGNORE_DESCRIPTIONS:
+        return None
+
+    # Filter out lines that are just a bunch of numbers/currencies
+    # Example "R$ 0,00 R$ 100,00" -> Description becomes "R$ 0,00"
+    desc_clean = description.translate(_NOISE_TABLE)
+    if desc_clean.isalpha():
+        digits, letters = 0, len(desc_clean)
+    else:
+        digits = sum(map(str.isdigit, desc_clean))
+        letters = sum(map(str.isalpha, desc_clean))
+
+    # Heuristic: < 3 real letters (excluding R$) OR mostly digits
+    if letters < 3 or (digits > 4 and letters < 5):
+        return None
+
+    return description, parse_money(match["value"])
+
+
+def parse_statement_text(text: str) -> list[tuple[str, float]]:
+    """Parse the extracted text of one page into (description, value) pairs."""
+    rows = []
+    for line in text.split('\n'):
+        row = parse_statement_line(line)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def _parse_pdf_pages(path: str, start: int, stop: int) -> list[list[tuple[str, float]]]:
+    """Worker: parse pages [start, stop) of the PDF at `path`, one list per page."""
+    import pdfplumber
+
+    pages = []
+    with pdfplumber.open(path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            pages.append(parse_statement_text(text) if text else [])
+            # Drop pdfminer layout objects as we go so a task holds one page at a time
+            page.close()
+    return pages
+
+
+def _spool_to_disk(source, suffix: str = ".pdf") -> tuple[str, bool]:
+    """Return a filesystem path for `source`, copying file-like objects to a temp file."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source), False
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, "wb") as tmp:
+        while chunk := source.read(1 << 20):
+            tmp.write(chunk)
+    return path, True
+
+
+def iter_pdf_transactions(source, workers: int | None = None, progress=None, pages_per_task: int = PAGES_PER_TASK):
+    """Yield {"Descrição", "Valor"} dicts from a PDF statement, page by page.
+
+    Pages are parsed in a process pool in blocks of `pages_per_task`, with at
+    most two blocks per worker in flight, so memory stays bounded whatever the
+    page count. Transactions come out in page order. `progress(done, total)` is
+    called after every page.
+    """
+    import pdfplumber
+
+    path, is_temp = _spool_to_disk(source)
+    try:
+        with pdfplumber.open(path) as pdf:
+            total = len(pdf.pages)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, -(-total // pages_per_task)))
+        blocks = iter(range(0, total, pages_per_task))
+
+        def emit(pages, done):
+            for rows in pages:
+                done += 1
+                for description, value in rows:
+                    yield {"Descrição": description, "Valor": value}
+                if progress is not None:
+                    progress(done, total)
+            return done
+
+        done = 0
+        if workers == 1:
+            for start in blocks:
+                done = yield from emit(_parse_pdf_pages(path, start, min(start + pages_per_task, total)), done)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for start in blocks:
+                pending.append(pool.submit(_parse_pdf_pages, path, start, min(start + pages_per_task, total)))
+                if len(pending) >= 2 * workers:
+                    done = yield from emit(pending.popleft().result(), done)
+            while pending:
+                done = yield from emit(pending.popleft().result(), done)
+    finally:
+        if is_temp:
+            os.remove(path)
+
+
+# ─────────────────────────────────────────────────────────────
+# CSV EXPORTS
+# ─────────────────────────────────────────────────────────────
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_CHUNK_ROWS = 100_000
+
+# Common bank columns, used to find the header row
+COMMON_HEADERS = (
+    "data", "date", "lançamento", "historico", "descrição", "description",
+    "valor", "amount", "value", "saldo", "balance", "documento",
+)
+
+_PT_BR_NUMBER_RE = re.compile(r"^-?\d{1,3}(?:\.\d{3})*,\d+$|^-?\d+,\d+$")
+_US_NUMBER_RE = re.compile(r"^-?\d+\.\d+$")
+
+
+def sniff_csv(head: bytes) -> dict:
+    """Detect encoding, header row, separator and decimal mark from the first bytes of a CSV."""
+    try:
+        # Incremental decode tolerates a multi-byte character cut at the end of the sample
+        text = codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        encoding = "utf-8"
+    except UnicodeDecodeError:
+        text = head.decode("latin-1")
+        encoding = "latin-1"
+
+    lines = text.split("\n")
+    skip_rows = 0
+    sep = None
+    for i, line in enumerate(lines[:20]):  # Check first 20 lines
+        line_lower = line.lower()
+        # At least 2 known columns found
+        if sum(1 for h in COMMON_HEADERS if h in line_lower) >= 2:
+            skip_rows = i
+            sep = ";" if ";" in line else ","
+            break
+
+    if sep is None:
+        try:
+            sep = csv.Sniffer().sniff("\n".join(lines[:20]), delimiters=",;\t|").delimiter
+        except csv.Error:
+            sep = ","
+
+    # PT-BR exports write 1.200,50; count which style the sampled fields use
+    pt_br = us = 0
+    for line in lines[skip_rows + 1:-1]:
+        for field in line.split(sep):
+            field = field.strip().strip('"')
+            if _PT_BR_NUMBER_RE.match(field):
+                pt_br += 1
+            elif _US_NUMBER_RE.match(field):
+                us += 1
+
+    return {
+        "encoding": encoding,
+        "skiprows": skip_rows,
+        "sep": sep,
+        "decimal": "," if pt_br > us else ".",
+    }
+
+
+def iter_csv_chunks(source, fmt: dict, chunksize: int = CSV_CHUNK_ROWS):
+    """Yield the CSV as DataFrames of `chunksize` rows, every column read as text."""
+    reader = pd.read_csv(
+        source,
+        sep=fmt["sep"],
+        skiprows=fmt["skiprows"],
+        encoding=fmt["encoding"],
+        dtype=str,
+        engine="c",
+        on_bad_lines="skip",
+        chunksize=chunksize,
+    )
+    with reader:
+        yield from reader
+
+
+# A whole field that is a number in the sniffed style, optionally signed and
+# with "R$". Dates such as 01.02.2024 or 01/02/2024 never match, nor do
+# zero-padded codes such as 00123.
+_NUMBER_FIELD_RE = {
+    decimal: rf" *(?:- *)?(?:R\$ *)?(?:- *)?(?:[1-9]\d{{0,2}}(?:\{thousands}\d{{3}})+|0|[1-9]\d*)(?:\{decimal}\d+)? *"
+    for decimal, thousands in ((",", "."), (".", ","))
+}
+
+
+def _number_mask(column: pd.Series, decimal: str) -> pd.Series:
+    """True where a text field is a number written with the sniffed decimal mark."""
+    return column.str.fullmatch(_NUMBER_FIELD_RE[decimal]).fillna(False).astype(bool)
+
+
+def _all_numbers(column: pd.Series, decimal: str) -> bool:
+    """Whether every non-blank field of a text column is such a number."""
+    filled = column.notna() & (column.str.strip() != "")
+    return bool(_number_mask(column, decimal)[filled].all())
+
+
+def _to_numbers(column: pd.Series, decimal: str) -> pd.Series:
+    """Floats from a text column; NaN wherever a field is not a number in the sniffed style."""
+    text = column.where(_number_mask(column, decimal))
+    if text.str.contains("R$", regex=False).any():
+        text = text.str.replace("R$", "", regex=False)
+    text = text.str.replace(" ", "", regex=False)
+    if decimal == ",":
+        text = text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    else:
+        text = text.str.replace(",", "", regex=False)
+    return text.astype(float)
+
+
+def read_statement_csv(source, progress=None, chunksize: int = CSV_CHUNK_ROWS) -> pd.DataFrame:
+    """Read a bank CSV export in chunks with the C engine.
+
+    Only the first CSV_SNIFF_BYTES are decoded to find the header row,
+    separator, encoding and decimal mark. Chunks are read as text, so their
+    dtypes agree. The value column (see find_statement_columns) is turned
+    into numbers chunk by chunk, fields not written in the sniffed style
+    becoming NaN. Any other column becomes numeric only if every field in
+    the file is such a number, so dates and codes keep their text.
+    `progress(rows, fraction, elapsed)` is called after every chunk, with
+    `fraction` the share of the file consumed so far.
+    """
+    source.seek(0, os.SEEK_END)
+    size = source.tell() or 1
+    source.seek(0)
+    fmt = sniff_csv(source.read(CSV_SNIFF_BYTES))
+    source.seek(0)
+
+    start = time.perf_counter()
+    chunks = []
+    rows = 0
+    value = None
+    numeric = {}
+    for chunk in iter_csv_chunks(source, fmt, chunksize):
+        if not chunks:
+            value = find_statement_columns(chunk.columns)[1]
+            numeric = dict.fromkeys(c for c in chunk.columns if c != value)
+        if value is not None:
+            chunk[value] = _to_numbers(chunk[value], fmt["decimal"])
+        for column in list(numeric):
+            if not _all_numbers(chunk[column], fmt["decimal"]):
+                del numeric[column]
+        chunks.append(chunk)
+        rows += len(chunk)
+        if progress is not None:
+            progress(rows, min(source.tell() / size, 1.0), time.perf_counter() - start)
+
+    if not chunks:
+        return pd.DataFrame()
+
+    df = pd.concat(chunks, ignore_index=True)
+    del chunks
+    for column in numeric:
+        if df[column].notna().any():
+            df[column] = _to_numbers(df[column], fmt["decimal"])
+    return df
+
+
+# ─────────────────────────────────────────────────────────────
+# MULTI-FILE UPLOADS
+# ─────────────────────────────────────────────────────────────
+# Normalized schema of a parsed statement
+STATEMENT_COLUMNS = ("Data", "Descrição", "Valor")
+
+_DESCRIPTION_HINTS = ("desc", "nome", "empresa", "historico")
+_VALUE_HINTS = ("valor", "value", "amount", "preço")
+_DATE_HINTS = ("data", "date", "dt", "periodo")
+
+
+def find_statement_columns(columns) -> tuple:
+    """(description, value, date) column names guessed from headers; None where not found."""
+    def first(hints):
+        return next((c for c in columns if any(h in str(c).lower() for h in hints)), None)
+
+    return first(_DESCRIPTION_HINTS), first(_VALUE_HINTS), first(_DATE_HINTS)
+
+
+def clean_values(column: pd.Series) -> pd.Series:
+    """Numbers from a value column written as text ("R$ 1.200,50"); unparseable entries become NaN."""
+    if pd.api.types.is_numeric_dtype(column):
+        return column
+    text = column.astype(str).str.replace("R$", "", regex=False).str.replace(".", "", regex=False)
+    return pd.to_numeric(text.str.replace(",", ".", regex=False).str.strip(), errors="coerce")
+
+
+def normalize_statement(df: pd.DataFrame) -> pd.DataFrame:
+    """Project a parsed statement onto STATEMENT_COLUMNS ("Data" is None when there is no date column)."""
+    description, value, date = find_statement_columns(df.columns)
+    if description is None or value is None:
+        raise ValueError("No description/value columns found.")
+    return pd.DataFrame({
+        "Data": df[date] if date is not None else None,
+        "Descrição": df[description],
+        "Valor": clean_values(df[value]),
+    })
+
+
+def parse_statement_path(path: str, name: str) -> dict:
+    """Worker: parse and normalize one statement file, timing it.
+
+    Runs inside a pool process, so PDFs take the serial page path instead
+    of starting a pool of their own.
+    """
+    start = time.perf_counter()
+    try:
+        if name.lower().endswith(".pdf"):
+            df = pd.DataFrame(list(iter_pdf_transactions(path, workers=1)), columns=["Descrição", "Valor"])
+        else:
+            with open(path, "rb") as f:
+                df = read_statement_csv(f)
+        df = normalize_statement(df) if not df.empty else pd.DataFrame(columns=list(STATEMENT_COLUMNS))
+        error = None
+    except Exception as e:
+        df, error = pd.DataFrame(columns=list(STATEMENT_COLUMNS)), str(e)
+    return {"name": name, "df": df, "seconds": time.perf_counter() - start, "error": error}
+
+
+def parse_statement_files(files, workers: int | None = None, progress=None) -> tuple[pd.DataFrame, list]:
+    """Parse several uploaded statements (objects with .name) in a process pool.
+
+    Each upload is spooled to a temp file so only its path crosses the
+    process boundary. Returns the files merged in upload order, normalized
+    to STATEMENT_COLUMNS plus "Arquivo", and one {"name", "rows", "seconds",
+    "error"} timing per file. `progress(done, total)` is called as files
+    finish.
+    """
+    files = list(files)
+    spooled = [_spool_to_disk(f, suffix=os.path.splitext(f.name)[1]) for f in files]
+    try:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(files)))
+
+        results = [None] * len(files)
+        if workers == 1:
+            for i, (f, (path, _)) in enumerate(zip(files, spooled)):
+                results[i] = parse_statement_path(path, f.name)
+                if progress is not None:
+                    progress(i + 1, len(files))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(parse_statement_path, path, f.name): i
+                    for i, (f, (path, _)) in enumerate(zip(files, spooled))
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    results[futures[future]] = future.result()
+                    if progress is not None:
+                        progress(done, len(files))
+    finally:
+        for path, is_temp in spooled:
+            if is_temp:
+                os.remove(path)
+
+    frames = [r["df"].assign(Arquivo=r["name"]) for r in results if not r["df"].empty]
+    merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[*STATEMENT_COLUMNS, "Arquivo"])
+    timings = [{"name": r["name"], "rows": len(r["df"]), "seconds": r["seconds"], "error": r["error"]} for r in results]
+    return merged, timings
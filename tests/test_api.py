@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import pytest
+
+import api
+from pricing import calculate_amazon, calculate_mercado_livre, calculate_shopee
+
+
+def post(path: str, body) -> tuple[int, dict]:
+    """POST `body` as JSON straight to the ASGI app (no pool: batches run in a thread)."""
+    api.app.state.pool = None
+    raw = body if isinstance(body, bytes) else json.dumps(body).encode()
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "POST", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "headers": [(b"content-type", b"application/json")], "scheme": "http",
+        "server": ("test", 80), "client": ("test", 1234), "root_path": "", "app": api.app,
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": raw, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(api.app(scope, receive, send))
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    payload = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return status, json.loads(payload)
+
+
+ITEM = {
+    "sku": "A1", "cost": 40.0, "category": "Outros", "extra_cost": 2.0, "shipping_cost": 5.0, "tax_pct": 6.0,
+    "fixed_expenses_per_unit": 1.5, "desired_margin_pct": 20.0, "other_pct": 1.0,
+}
+
+
+def test_single_sku_matches_calculator():
+    status, body = post("/v1/price/mercado_livre", {**ITEM, "ad_type": "Premium"})
+    expected = calculate_mercado_livre(**{k: v for k, v in ITEM.items() if k != "sku"}, ad_type="Premium")
+    assert status == 200
+    assert body == {"sku": "A1", **expected}
+
+
+@pytest.mark.parametrize(("platform", "extra", "calculate"), [
+    ("mercado_livre", {"ad_type": "Clássico"}, calculate_mercado_livre),
+    ("amazon", {"logistics": "fbm", "weight_g": 500.0}, calculate_amazon),
+    ("shopee", {"seller_type": "CNPJ", "free_shipping": True}, calculate_shopee),
+])
+def test_batch_rows_match_calculator(platform, extra, calculate):
+    items = [{**ITEM, "sku": f"S{i}", "cost": 10.0 + 7.5 * i} for i in range(20)]
+    status, body = post(f"/v1/price/{platform}", {"items": items, "defaults": extra})
+    assert status == 200 and body["count"] == 20
+    for item, row in zip(items, body["results"]):
+        kwargs = {k: v for k, v in item.items() if k != "sku"}
+        assert row == {"sku": item["sku"], **calculate(**kwargs, **extra)}
+
+
+@pytest.mark.parametrize(("body", "message"), [
+    ({**ITEM, "margin": 20}, "Unknown fields for amazon: ['margin']"),
+    ({"items": [ITEM, {**ITEM, "colour": "red"}]}, "Unknown fields for amazon: ['colour']"),
+    ({"items": [ITEM], "defaults": {"ad_type": "Premium"}}, "Unknown defaults for amazon: ['ad_type']"),
+    ({"items": [ITEM], "defaults": {"sku": "X"}}, "Unknown defaults for amazon: ['sku']"),
+    ({"items": [ITEM], "defaults": ["fbm"]}, "'defaults' must be an object."),
+    ({"items": "nope"}, "'items' must be a list of objects."),
+])
+def test_price_rejects_unknown_or_malformed_input(body, message):
+    assert post("/v1/price/amazon", body) == (422, {"error": message})
+
+
+def test_price_items_validates_without_the_handler():
+    with pytest.raises(api.APIError, match="colour"):
+        api.price_items("shopee", [{**ITEM, "colour": "red"}], {})
+    with pytest.raises(api.APIError, match="logistics"):
+        api.price_items("shopee", [ITEM], {"logistics": "fba"})
+
+
+@pytest.mark.parametrize(("platform", "field", "extra"), [
+    ("mercado_livre", "category", {"ad_type": "Premium"}),
+    ("mercado_livre", "ad_type", {}),
+    ("amazon", "logistics", {"weight_g": 500.0}),
+    ("shopee", "seller_type", {}),
+    ("shopee", "cost", {}),
+])
+def test_null_required_field_is_rejected_alone_and_in_a_batch(platform, field, extra):
+    item = {**ITEM, **extra, field: None}
+    error = {"error": f"'{field}' must be given and not null."}
+    assert post(f"/v1/price/{platform}", item) == (422, error)
+    assert post(f"/v1/price/{platform}", {"items": [ITEM | extra, item]}) == (422, error)
+
+
+def test_null_input_with_a_default_prices_as_omitted_alone_and_in_a_batch():
+    item = {**ITEM, "ad_type": "Clássico", "extra_cost": None, "tax_pct": None}
+    omitted = {k: v for k, v in item.items() if v is not None}
+    expected = post("/v1/price/mercado_livre", omitted)[1]
+    assert post("/v1/price/mercado_livre", item) == (200, expected)
+    status, body = post("/v1/price/mercado_livre", {"items": [item]})
+    assert status == 200 and body["results"] == [expected]
+
+
+def test_bad_requests():
+    assert post("/v1/price/ebay", ITEM)[0] == 404
+    assert post("/v1/price/amazon", b"{not json")[0] == 400
+    assert post("/v1/price/amazon", [ITEM])[0] == 400
+
+
+@pytest.mark.parametrize(("body", "message"), [
+    ({"items": [ITEM], "options": ["other_pct"]}, "'options' must be an object."),
+    ({"items": [ITEM], "options": {"ml_ad_type": "Premium"}}, "Unknown options: ['ml_ad_type']"),
+    ({"items": [ITEM], "metric": "volume"}, "Unknown metric 'volume'. Use one of ['margin', 'price', 'profit', 'roi']."),
+])
+def test_best_rejects_malformed_options(body, message):
+    assert post("/v1/best", body) == (422, {"error": message})
+
+
+def test_best_ranks_by_lowest_price():
+    status, body = post("/v1/best", {"items": [ITEM]})
+    assert status == 200 and body["count"] == 1
@@ -0,0 +1,131 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from ledger import LedgerStore
+from simulations import SimulationStore
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+STATEMENT = pd.DataFrame(
+    [("05/01/2024", "Padaria", -12.5, "Alimentação"), ("10/01/2024", "Cliente A", 1000.0, "Outros")],
+    columns=["Data", "Descrição", "Valor", "Categoria"],
+)
+
+
+@pytest.fixture
+def dbs(tmp_path, monkeypatch):
+    paths = {"ledger": str(tmp_path / "ledger.sqlite"), "simulations": str(tmp_path / "simulations.sqlite")}
+    monkeypatch.setenv("LEDGER_DB", paths["ledger"])
+    monkeypatch.setenv("SIMULATIONS_DB", paths["simulations"])
+    monkeypatch.delenv("WORKSPACE_ID", raising=False)
+    # Stores are st.cache_resource singletons; start each test on its own files
+    st.cache_resource.clear()
+    yield paths
+    st.cache_resource.clear()
+
+
+def session(token: str | None = None, view: str | None = None) -> AppTest:
+    at = AppTest.from_file(APP, default_timeout=60)
+    if token is not None:
+        at.query_params["w"] = token
+    at.run()
+    if view is not None:
+        at.radio(key="nav_radio").set_value(view).run()
+    assert not at.exception
+    return at
+
+
+def has_history(at: AppTest) -> bool:
+    return any("Histórico Consolidado" in expander.label for expander in at.expander)
+
+
+def test_new_browser_gets_a_token_in_the_url(dbs):
+    first, second = session(), session()
+    assert len(first.query_params["w"]) == 32
+    assert first.query_params["w"] != second.query_params["w"]
+
+
+def test_reload_with_the_same_token_sees_the_ledger_history(dbs):
+    token = session().query_params["w"]
+    LedgerStore(dbs["ledger"]).append(f"browser:{token}", STATEMENT, "Data", "Descrição", "Valor")
+
+    reloaded = session(token, view="Organização Financeira")
+    assert has_history(reloaded)
+    assert reloaded.query_params["w"] == token
+    assert not has_history(session(view="Organização Financeira"))
+
+
+def test_workspace_id_is_shared_by_every_visitor(dbs, monkeypatch):
+    monkeypatch.setenv("WORKSPACE_ID", "loja")
+    LedgerStore(dbs["ledger"]).append("workspace:loja", STATEMENT, "Data", "Descrição", "Valor")
+    at = session(view="Organização Financeira")
+    assert has_history(at)
+    assert "w" not in at.query_params
+
+
+def simulation(timestamp: str) -> dict:
+    return {"Data/Hora": timestamp, "Produto": "Caneca", "Plataforma": "Shopee", "Custo (R$)": 10.0,
+            "Venda (R$)": 30.0, "Lucro (R$)": 8.0, "Margem (%)": 26.7, "ROI (%)": 80.0}
+
+
+def test_unreachable_owners_are_purged_at_startup(dbs):
+    ledger = LedgerStore(dbs["ledger"])
+    simulations = SimulationStore(dbs["simulations"])
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    stale, recent = "browser:" + "0" * 32, "browser:" + "1" * 32
+    for owner, saved_at in (("session:old", now), (stale, "2024-01-05 10:00:00"), (recent, now),
+                            ("user:ana@example.com", "2024-01-05 10:00:00")):
+        simulations.add(owner, simulation(saved_at))
+    for owner in ("session:old", recent, "user:ana@example.com"):
+        ledger.append(owner, STATEMENT, "Data", "Descrição", "Valor")
+
+    session(view="Organização Financeira")
+    assert ledger.count("session:old") == 0 and simulations.count("session:old") == 0
+    assert simulations.count(stale) == 0
+    # Recent browser tokens and logged-in users are kept
+    assert ledger.count(recent) == 2 and simulations.count(recent) == 1
+    assert ledger.count("user:ana@example.com") == 2 and simulations.count("user:ana@example.com") == 1
+
+
+def ledger_exports_page():
+    import sys
+
+    import streamlit as st
+
+    sys.path.insert(0, st.session_state["repo"])
+    from app import render_ledger_exports
+
+    render_ledger_exports(("extrato.csv", 10))
+
+
+def test_ledger_exports_are_built_on_request_and_survive_reruns():
+    statement = STATEMENT.copy()
+    at = AppTest.from_function(ledger_exports_page, default_timeout=60)
+    at.session_state["repo"] = os.path.dirname(APP)
+    at.session_state["ledger_export_source"] = (("extrato.csv", 10), statement, "Data", "Descrição", "Valor")
+    at.run()
+    assert not at.exception
+    assert not at.get("download_button")
+
+    at.button(key="ledger_prepare_exports").click().run()
+    assert len(at.get("download_button")) >= 1
+    files = at.session_state["ledger_exports"]
+    at.run()
+    assert at.session_state["ledger_exports"] is files
+    assert len(at.get("download_button")) >= 1
+
+    # Different analyzed rows invalidate the files
+    at.session_state["ledger_export_source"] = (("extrato.csv", 10), statement.head(1), "Data", "Descrição", "Valor")
+    at.run()
+    assert not at.get("download_button")
+
+    # A different upload hides the section entirely
+    at.session_state["ledger_export_source"] = (("outro.csv", 5), statement, "Data", "Descrição", "Valor")
+    at.run()
+    assert not at.get("download_button")
+    assert not at.button
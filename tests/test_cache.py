@@ -0,0 +1,87 @@
+import threading
+
+import pandas as pd
+
+from cache import DataFrameCache, SharedCache
+
+
+def frame(n: int) -> pd.DataFrame:
+    return pd.DataFrame({"Data": [f"{i:02d}/01" for i in range(n)], "Valor": [float(i) for i in range(n)]})
+
+
+def not_called():
+    raise AssertionError("cached frame was recomputed")
+
+
+def test_evicted_frames_spill_to_parquet_and_come_back(tmp_path):
+    size = int(frame(100).memory_usage(deep=True).sum())
+    cache = DataFrameCache(max_bytes=size, spill_dir=str(tmp_path))
+    first = cache.get_or_compute("a", lambda: frame(100))
+    cache.get_or_compute("b", lambda: frame(100))
+
+    assert "a" in cache and len(cache) == 1
+    assert cache.stats()["spilled"] == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["a.parquet"]
+
+    again = cache.get_or_compute("a", not_called)
+    pd.testing.assert_frame_equal(again, first)
+    assert cache.stats()["spill_hits"] == 1
+
+
+def test_spill_is_written_without_holding_the_lock(tmp_path, monkeypatch):
+    size = int(frame(100).memory_usage(deep=True).sum())
+    cache = DataFrameCache(max_bytes=size, spill_dir=str(tmp_path))
+    cache.get_or_compute("a", lambda: frame(100))
+
+    held = []
+    to_parquet = pd.DataFrame.to_parquet
+
+    def spy(self, *args, **kwargs):
+        held.append(cache._lock.locked())
+        return to_parquet(self, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", spy)
+    cache.get_or_compute("b", lambda: frame(100))
+    assert held == [False]
+    assert cache.stats()["spilled"] == 1
+
+
+def test_clear_while_spilling_leaves_no_file(tmp_path, monkeypatch):
+    size = int(frame(100).memory_usage(deep=True).sum())
+    cache = DataFrameCache(max_bytes=size, spill_dir=str(tmp_path))
+    cache.get_or_compute("a", lambda: frame(100))
+
+    to_parquet = pd.DataFrame.to_parquet
+
+    def clear_then_write(self, *args, **kwargs):
+        cache.clear()
+        return to_parquet(self, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", clear_then_write)
+    cache.get_or_compute("b", lambda: frame(100))
+    assert "a" not in cache
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_shared_cache_computes_concurrent_misses_once():
+    cache = SharedCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(4)]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+    assert results == [42] * 4 and len(calls) == 1
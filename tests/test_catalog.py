@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog import (
+    CHANNELS,
+    _marketplace_categories,
+    best_marketplace,
+    evaluate_channels,
+    normalize_catalog,
+    price_catalog,
+)
+from pricing import calculate_amazon, calculate_mercado_livre, calculate_shopee
+from pricing_batch import evaluate_batch
+
+CALCULATORS = {"mercado_livre": calculate_mercado_livre, "amazon": calculate_amazon, "shopee": calculate_shopee}
+
+
+@pytest.fixture
+def catalog():
+    rng = np.random.default_rng(3)
+    n = 60
+    return normalize_catalog(pd.DataFrame({
+        "sku": [f"S{i}" for i in range(n)],
+        "custo": rng.uniform(2, 300, n).round(2),
+        "categoria": rng.choice(["Outros", "Eletrônicos", "Informática", "Beleza"], n),
+        "peso": rng.uniform(50, 8000, n).round(0),
+        "frete": rng.uniform(0, 30, n).round(2),
+        "imposto": rng.choice([0.0, 6.0], n),
+        "margem": rng.choice([0.0, 10.0, 25.0], n),
+        "preço de venda": rng.uniform(10, 800, n).round(2),
+    }))
+
+
+def channel_result(row, platform, options, seller_type="CPF"):
+    """calculate_* for one catalog row, with its category as the marketplace sees it."""
+    kwargs = dict(
+        cost=row.cost, extra_cost=row.extra_cost, shipping_cost=row.shipping_cost, tax_pct=row.tax_pct,
+        fixed_expenses_per_unit=0.0, desired_margin_pct=row.desired_margin_pct, other_pct=0.0,
+    )
+    if platform == "amazon":
+        kwargs["weight_g"] = row.weight_g
+    if platform == "shopee":
+        kwargs["seller_type"] = seller_type
+    return CALCULATORS[platform](category=row.category, **kwargs, **options)
+
+
+def test_evaluate_channels_matches_calculators(catalog):
+    results = evaluate_channels(catalog)
+    for j, (_, platform, options) in enumerate(CHANNELS):
+        rows = catalog.assign(category=_marketplace_categories(catalog, platform)[0])
+        for i, row in enumerate(rows.itertuples()):
+            expected = channel_result(row, platform, options)
+            assert results["suggested_price"][i, j] == expected["suggested_price"]
+            assert results["profit"][i, j] == expected["profit"]
+
+
+def test_price_metric_picks_cheapest_channel_for_target_margin(catalog):
+    best = best_marketplace(catalog, "price")
+    prices = evaluate_channels(catalog)["suggested_price"]
+    assert np.array_equal(best["Preço"].to_numpy(), prices.min(axis=1))
+    assert (best["Vantagem (Preço)"] >= 0).all()
+
+
+def test_profit_metric_compares_channels_at_the_same_sale_price(catalog):
+    best = best_marketplace(catalog, "profit")
+    assert np.array_equal(best["Preço"].to_numpy(), catalog["sale_price"].to_numpy())
+
+    profits = np.empty((len(catalog), len(CHANNELS)))
+    for j, (_, platform, options) in enumerate(CHANNELS):
+        frame = catalog.assign(category=_marketplace_categories(catalog, platform)[0])
+        options = {**options, "seller_type": "CPF"} if platform == "shopee" else options
+        profits[:, j] = evaluate_batch(frame, platform, fixed_expenses_per_unit=0.0, other_pct=0.0,
+                                       **options)["profit"].to_numpy()
+    names = np.array([name for name, _, _ in CHANNELS])
+    assert (best["Melhor Canal"].to_numpy() == names[profits.argmax(axis=1)]).all()
+    assert np.array_equal(best["Lucro"].to_numpy(), profits.max(axis=1))
+
+
+def test_evaluating_at_the_suggested_price_reproduces_price_batch(catalog):
+    at_price = catalog.assign(sale_price=evaluate_channels(catalog)["suggested_price"][:, 0])
+    margin = evaluate_channels(catalog)
+    evaluated = evaluate_channels(at_price, at_sale_price=True)
+    assert np.array_equal(evaluated["profit"][:, 0], margin["profit"][:, 0])
+
+
+def test_sale_price_metrics_need_a_sale_price(catalog):
+    with pytest.raises(ValueError, match="sale price"):
+        best_marketplace(catalog.drop(columns="sale_price"), "profit")
+    with pytest.raises(ValueError, match="Unknown metric"):
+        best_marketplace(catalog, "volume")
+
+
+def test_price_catalog_matches_calculators(catalog):
+    priced, _ = price_catalog(catalog, ml_ad_type="Premium", amazon_logistics="dba", shopee_free_shipping=True)
+    channels = {"ML": ("mercado_livre", {"ad_type": "Premium", "include_fixed_fee": True}),
+                "Amazon": ("amazon", {"logistics": "dba"}),
+                "Shopee": ("shopee", {"free_shipping": True})}
+    for label, (platform, options) in channels.items():
+        rows = catalog.assign(category=_marketplace_categories(catalog, platform)[0])
+        for i, row in enumerate(rows.itertuples()):
+            expected = channel_result(row, platform, options)
+            assert priced[f"Preço {label}"][i] == expected["suggested_price"]
+            assert priced[f"Lucro {label}"][i] == expected["profit"]
+            assert priced[f"Taxas {label}"][i] == expected["total_fees"]
@@ -0,0 +1,96 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from categories import CATEGORY_KEYWORDS, CategoryRule, RuleEngine, categorize, categorize_series
+
+
+def reference_categorize(rules, default, description, value, counterparty=None):
+    """Rules checked one by one, the first whose conditions all hold wins."""
+    text = str(description).lower()
+    for rule in rules:
+        if rule.keywords and not any(k in text for k in rule.keywords):
+            continue
+        if rule.regex is not None and not rule.regex.search(str(description)):
+            continue
+        if rule.counterparties:
+            name = " ".join(str(counterparty if counterparty is not None else description).lower().split())
+            if name not in rule.counterparties:
+                continue
+        if rule.min_value is not None and not value >= rule.min_value:
+            continue
+        if rule.max_value is not None and not value <= rule.max_value:
+            continue
+        return rule.category
+    return default
+
+
+def legacy_categorize(description):
+    text = str(description).lower()
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(k in text for k in keywords):
+            return category
+    return "Outros"
+
+
+def test_shared_keyword_with_value_guard():
+    engine = RuleEngine([
+        {"keywords": ["uber"], "max_value": -100, "category": "Viagem"},
+        {"keywords": ["uber"], "category": "Transporte"},
+    ])
+    df = pd.DataFrame({"desc": ["UBER TRIP", "UBER TRIP"], "value": [-20.0, -300.0]})
+    assert engine.categorize_frame(df, "desc", "value").tolist() == ["Transporte", "Viagem"]
+
+
+def test_overlapping_keyword_prefixes():
+    engine = RuleEngine([
+        {"keywords": ["uber eats"], "min_value": 0, "category": "Reembolso"},
+        {"keywords": ["uber"], "category": "Transporte"},
+        {"keywords": ["eats"], "category": "Alimentação"},
+    ])
+    df = pd.DataFrame({"desc": ["uber eats", "uber eats", "eats"], "value": [10.0, -10.0, -5.0]})
+    assert engine.categorize_frame(df, "desc", "value").tolist() == ["Reembolso", "Transporte", "Alimentação"]
+
+
+def test_rule_precedence_matches_reference():
+    rules = [
+        CategoryRule("Aluguel", regex="aluguel|locacao", max_value=0),
+        CategoryRule("Fornecedores", counterparty=["ACME LTDA"]),
+        CategoryRule("Grandes", keywords=["pix", "ted"], max_value=-500),
+        CategoryRule("Mídia", keywords=["ads", "google"]),
+        CategoryRule("Transferências", keywords=["pix", "ted", "transf"]),
+        CategoryRule("Receitas", min_value=0.01),
+    ]
+    engine = RuleEngine(rules)
+    rng = random.Random(7)
+    words = ["PIX", "TED", "google ads", "aluguel", "ACME LTDA", "transf", "mercado", "locacao sala"]
+    descriptions = [" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(400)]
+    descriptions[::37] = ["acme  ltda"] * len(descriptions[::37])
+    values = [round(rng.uniform(-1000, 1000), 2) for _ in descriptions]
+    df = pd.DataFrame({"desc": descriptions, "value": values})
+
+    got = engine.categorize_frame(df, "desc", "value").tolist()
+    expected = [reference_categorize(rules, "Outros", d, v) for d, v in zip(descriptions, values)]
+    assert got == expected
+    assert engine.last_stats["hits"].iloc[-len(rules):].sum() == sum(c != "Outros" for c in expected)
+
+
+def test_keyword_engine_matches_legacy_categorizer():
+    descriptions = pd.Series([
+        "PIX UBER DO BRASIL", "Google Ads", "iFood *Restaurante", "DAS Simples Nacional",
+        "CDB Banco Inter", "Mercado Livre", "sem categoria", None, "99 POP", "aws host",
+    ])
+    expected = [legacy_categorize(d) if d is not None else "Outros" for d in descriptions]
+    assert [categorize(d) for d in descriptions[:-3]] == expected[:-3]
+    assert categorize_series(descriptions).tolist() == expected
+    engine = RuleEngine.from_keywords()
+    got = engine.categorize_frame(pd.DataFrame({"desc": descriptions}), "desc")
+    assert got.tolist() == expected
+
+
+def test_value_bounds_without_value_column_never_match():
+    engine = RuleEngine([{"min_value": 0, "category": "Receitas"}])
+    df = pd.DataFrame({"desc": ["x", "y"]})
+    assert engine.categorize_frame(df, "desc").tolist() == ["Outros", "Outros"]
+    assert np.array_equal(engine.last_stats["hits"].to_numpy(), [0])
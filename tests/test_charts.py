@@ -0,0 +1,15 @@
+import pytest
+
+from bench_charts import CASES, figure_json
+from charts import build_breakeven_chart
+
+
+@pytest.mark.parametrize("name", CASES)
+@pytest.mark.parametrize("i", [0, 50, 125, 199])
+def test_template_builders_match_legacy_figures(name, i):
+    legacy, build = CASES[name]
+    assert figure_json(build(i)) == figure_json(legacy(i))
+
+
+def test_breakeven_without_margin_has_no_chart():
+    assert build_breakeven_chart(1500.0, 0.0) is None
@@ -0,0 +1,23 @@
+from enrichment import CategoryCache, Enricher, LocalBackend, make_backend
+
+
+def test_stats_cover_one_enricher_only(tmp_path):
+    cache = CategoryCache(str(tmp_path / "cache.sqlite"))
+    backend = LocalBackend({"padaria do ze": "Alimentação"})
+
+    first = Enricher(backend, cache, rate=0)
+    assert first.enrich(["Padaria do Ze", "loja x"]) == {"Padaria do Ze": "Alimentação"}
+    assert first.stats()["hits"] == 0 and first.stats()["misses"] == 2
+    assert first.stats()["looked_up"] == 2
+
+    # Another session's run: both descriptions now come from the shared cache
+    second = Enricher(backend, cache, rate=0)
+    assert second.enrich(["PADARIA  do ze", "loja x"]) == {"PADARIA  do ze": "Alimentação"}
+    stats = second.stats()
+    assert (stats["hits"], stats["misses"], stats["requests"]) == (2, 0, 0)
+    assert stats["hit_rate"] == 1.0 and stats["size"] == 2
+
+
+def test_backend_is_off_unless_configured():
+    assert make_backend(None) is None
+    assert make_backend("off") is None
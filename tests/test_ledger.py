@@ -0,0 +1,123 @@
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ledger import LedgerStore, summarize_ledger
+
+
+def statement(rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["Data", "Descrição", "Valor", "Categoria"])
+
+
+JANUARY = statement([
+    ("05/01/2024", "Padaria", -12.5, "Alimentação"),
+    ("05/01/2024", "Padaria", -12.5, "Alimentação"),  # two real purchases on the same day
+    ("10/01/2024", "Cliente A", 1000.0, "Outros"),
+    ("15/01/2024", "CDB", -300.0, "Investimento"),
+])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LedgerStore(str(tmp_path / "ledger.sqlite"))
+
+
+def test_identical_rows_of_one_statement_are_kept(store):
+    added = store.append("alice", JANUARY, "Data", "Descrição", "Valor")
+    assert added == {"inserted": 4, "duplicates": 0, "months": ["2024-01"]}
+    summary = store.summary("alice")
+    assert summary["total_expense"] == 25.0
+    assert summary["total_invested"] == 300.0
+    assert summary["total_income"] == 1000.0
+
+
+def test_reimported_and_overlapping_statements_are_deduplicated(store):
+    store.append("alice", JANUARY, "Data", "Descrição", "Valor")
+    assert store.append("alice", JANUARY, "Data", "Descrição", "Valor")["inserted"] == 0
+
+    overlap = statement([
+        ("05/01/2024", "Padaria", -12.5, "Alimentação"),
+        ("05/01/2024", "Padaria", -12.5, "Alimentação"),
+        ("05/01/2024", "Padaria", -12.5, "Alimentação"),  # a third purchase only this export has
+        ("02/02/2024", "Aluguel", -900.0, "Outros"),
+    ])
+    added = store.append("alice", overlap, "Data", "Descrição", "Valor")
+    assert (added["inserted"], added["duplicates"], added["months"]) == (2, 2, ["2024-01", "2024-02"])
+    assert store.count("alice") == 6
+    assert store.summary("alice", "2024-01", "2024-01")["total_expense"] == 37.5
+
+
+def test_owners_are_isolated(store):
+    store.append("alice", JANUARY, "Data", "Descrição", "Valor")
+    store.append("bob", JANUARY, "Data", "Descrição", "Valor")
+    assert store.count("bob") == 4
+
+    store.clear("alice")
+    assert store.count("alice") == 0 and store.months("alice") == []
+    assert store.months("bob") == ["2024-01"]
+    assert store.summary("bob")["total_income"] == 1000.0
+    assert len(store.transactions("bob")) == 4
+
+
+def test_recategorize_refreshes_only_the_owners_months(store):
+    store.append("alice", JANUARY, "Data", "Descrição", "Valor")
+    store.append("bob", JANUARY, "Data", "Descrição", "Valor")
+    months = store.recategorize("alice", lambda d: pd.Series("Outros", index=d.index))
+    assert months == ["2024-01"]
+    assert store.summary("alice")["total_invested"] == 0.0
+    assert store.summary("bob")["total_invested"] == 300.0
+
+
+def test_files_without_owner_column_are_migrated(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE transactions (key INTEGER PRIMARY KEY, month TEXT NOT NULL, date TEXT NOT NULL,
+            description TEXT, value REAL NOT NULL, category TEXT, source TEXT, added_at REAL NOT NULL);
+        CREATE TABLE monthly (month TEXT NOT NULL, kind TEXT NOT NULL, category TEXT NOT NULL,
+            total REAL NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (month, kind, category));
+        INSERT INTO transactions VALUES (1, '2024-01', '2024-01-01', 'x', -1.0, 'Outros', NULL, 0);
+        """
+    )
+    conn.commit()
+    conn.close()
+
+    store = LedgerStore(path)
+    assert store.months("alice") == []
+    store.append("alice", JANUARY, "Data", "Descrição", "Valor")
+    assert store.count("alice") == 4
+
+
+def test_summarize_ledger_matches_pandas():
+    rng = np.random.default_rng(5)
+    n = 2000
+    df = pd.DataFrame({
+        "Descrição": rng.choice(["a", "b", "c", None], n),
+        "Valor": rng.normal(0, 500, n).round(2),
+        "Categoria": rng.choice(["Investimento", "Alimentação", "Outros"], n),
+    })
+    summary = summarize_ledger(df, "Descrição", "Valor")
+    income = df["Valor"][df["Valor"] > 0].sum()
+    outflow = df[df["Valor"] < 0]
+    invested = -outflow["Valor"][outflow["Categoria"] == "Investimento"].sum()
+    expense = -outflow["Valor"][outflow["Categoria"] != "Investimento"].sum()
+    assert summary["total_income"] == pytest.approx(income)
+    assert summary["total_invested"] == pytest.approx(invested)
+    assert summary["total_expense"] == pytest.approx(expense)
+
+
+def test_purge_removes_only_inactive_owners_with_the_prefix(store):
+    for owner in ("browser:a", "browser:b", "user:c"):
+        store.append(owner, JANUARY, "Data", "Descrição", "Valor")
+    store.append("browser:b", statement([("01/02/2024", "Aluguel", -900.0, "Moradia")]), "Data", "Descrição", "Valor")
+
+    assert store.purge("browser:", before=time.time() - 3600) == 0
+    assert store.purge("browser:a") == 1
+    assert store.count("browser:a") == 0 and store.months("browser:a") == []
+    assert store.count("browser:b") == 5 and store.count("user:c") == 4
+    assert store.purge("browser:", before=time.time() + 1) == 1
+    assert store.count("browser:b") == 0 and store.count("user:c") == 4
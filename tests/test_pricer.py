@@ -0,0 +1,44 @@
+import io
+
+import pandas as pd
+import pytest
+
+import pricer
+from catalog import normalize_catalog, price_catalog, read_catalog
+
+CSV = (
+    "sku;custo;categoria;frete;imposto;margem\n"
+    + "".join(f"S{i};{10 + i * 3.25:.2f}".replace(".", ",") + ";Outros;5,00;6;20\n" for i in range(25))
+)
+
+
+@pytest.mark.parametrize(("text", "rows"), [
+    (CSV, 25),
+    (CSV.rstrip("\n"), 25),
+    ("Loja Exemplo\nExportado em 01/02\ndata;descrição;valor\n01/02;a;1,00\n02/02;b;2,00\n", 2),
+])
+def test_count_rows_skips_preamble_and_header(text, rows):
+    source = io.BytesIO(text.encode())
+    assert pricer._count_rows(source, parquet=False) == rows
+    assert source.tell() == 0
+
+
+def test_count_rows_reads_parquet_metadata(tmp_path):
+    path = tmp_path / "catalogo.parquet"
+    pd.DataFrame({"sku": ["a", "b", "c"], "custo": [1.0, 2.0, 3.0]}).to_parquet(path)
+    with open(path, "rb") as source:
+        assert pricer._count_rows(source, parquet=True) == 3
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_chunked_output_matches_price_catalog(tmp_path, jobs):
+    source = tmp_path / "catalogo.csv"
+    source.write_text(CSV)
+    output = tmp_path / "precos.parquet"
+    assert pricer.main([str(source), "-o", str(output), "--jobs", str(jobs), "--chunk-rows", "7", "-q"]) == 0
+
+    catalog = normalize_catalog(read_catalog(io.BytesIO(CSV.encode()), "catalogo.csv"))
+    catalog["sku"] = catalog["sku"].astype(str)
+    expected, _ = price_catalog(catalog)
+    pd.testing.assert_frame_equal(pd.read_parquet(output), expected)
+    assert not (tmp_path / "precos.parquet.partial").exists()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from pricing import (
+    AMAZON_DBA_PRICE_SCHEDULE,
+    AMAZON_DBA_WEIGHT_SCHEDULE,
+    ML_FIXED_FEE_SCHEDULE,
+    FeeSchedule,
+)
+
+SCHEDULES = {
+    "ml_fixed_fee": ML_FIXED_FEE_SCHEDULE,
+    "amazon_dba_price": AMAZON_DBA_PRICE_SCHEDULE,
+    "amazon_dba_weight": AMAZON_DBA_WEIGHT_SCHEDULE,
+    # A fee step larger than its price step: bands stop being monotone
+    "steep": FeeSchedule([(10.0, 1.0), (20.0, 30.0, False), (50.0, 2.0)], above=5.0),
+}
+
+
+def cases(seed: int = 7, n: int = 400):
+    rng = np.random.default_rng(seed)
+    base = np.concatenate([rng.uniform(0, 120, n), [0.0, 6.25, 12.5, 79.0]])
+    divisor = np.concatenate([rng.uniform(0.05, 1.0, n), [1.0, 0.5, 0.25, 0.8]])
+    return base, divisor
+
+
+def feasible(schedule, p, base, divisor, above_fee, include_fees):
+    i = schedule._band(p)
+    fee = above_fee if i == len(schedule) else (schedule.fees[i] if include_fees else 0.0)
+    return p * divisor >= base + fee - 1e-9 * max(1.0, base + fee)
+
+
+@pytest.mark.parametrize("name", SCHEDULES)
+@pytest.mark.parametrize(("above_fee", "include_fees"), [(None, True), (0.0, True), (12.0, False)])
+def test_solve_price_is_the_smallest_feasible_price(name, above_fee, include_fees):
+    schedule = SCHEDULES[name]
+    above = schedule.above if above_fee is None else above_fee
+    for base, divisor in zip(*cases()):
+        p = schedule.solve_price(base, divisor, above_fee, include_fees)
+        assert feasible(schedule, p, base, divisor, above, include_fees)
+        below = p - 1e-7 * max(1.0, p)
+        i = schedule._band(p)
+        # Prices raised past a closed lower bound step by a cent, so only
+        # the open-bound and unclamped cases are exact minima
+        if i == 0 or not schedule.closed[i - 1] or p != schedule.bounds[i - 1] + 0.01:
+            assert not feasible(schedule, below, base, divisor, above, include_fees)
+
+
+@pytest.mark.parametrize("name", SCHEDULES)
+@pytest.mark.parametrize(("above_fee", "include_fees"), [(None, True), (0.0, True), (12.0, False)])
+def test_solve_prices_matches_solve_price(name, above_fee, include_fees):
+    schedule = SCHEDULES[name]
+    base, divisor = cases()
+    expected = [schedule.solve_price(b, d, above_fee, include_fees) for b, d in zip(base, divisor)]
+    np.testing.assert_array_equal(schedule.solve_prices(base, divisor, above_fee, include_fees), expected)
+
+
+def test_fees_for_matches_fee_on_band_edges():
+    for schedule in SCHEDULES.values():
+        values = np.array([v + d for v in schedule.bounds for d in (-0.01, 0.0, 0.01)] + [np.nan])
+        np.testing.assert_array_equal(schedule.fees_for(values), [schedule.fee(v) for v in values])
@@ -0,0 +1,103 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricing import (
+    AMAZON,
+    MERCADO_LIVRE,
+    SHOPEE,
+    calculate_amazon,
+    calculate_mercado_livre,
+    calculate_shopee,
+)
+from pricing_batch import BATCH_PARAMS, price_batch
+
+CALCULATORS = {"mercado_livre": calculate_mercado_livre, "amazon": calculate_amazon, "shopee": calculate_shopee}
+
+# Every per-row option value each marketplace accepts
+OPTIONS = {
+    "mercado_livre": {"ad_type": list(MERCADO_LIVRE["ad_types"]), "include_fixed_fee": [True, False]},
+    "amazon": {"logistics": list(AMAZON["logistics"].values())},
+    "shopee": {"seller_type": ["CPF", "CNPJ"], "free_shipping": [True, False]},
+}
+CATEGORIES = {
+    "mercado_livre": list(MERCADO_LIVRE["ad_types"]["Clássico"]),
+    "amazon": list(AMAZON["categories"]),
+    "shopee": list(SHOPEE["categories"]),
+}
+
+
+def grid(platform: str, seed: int = 11) -> pd.DataFrame:
+    """Every option combination and category, with costs around the fee band edges."""
+    rng = np.random.default_rng(seed)
+    names = list(OPTIONS[platform])
+    combos = list(itertools.product(*OPTIONS[platform].values(), CATEGORIES[platform]))
+    rows = []
+    for cost in (0.5, 8.0, 18.0, 35.0, 52.0, 61.0, 79.0, 150.0, 420.0):
+        for combo in combos:
+            row = dict(zip(names, combo), category=combo[-1], cost=cost)
+            row.update(
+                extra_cost=float(rng.choice([0.0, 2.5])),
+                shipping_cost=round(float(rng.uniform(0, 40)), 2),
+                weight_g=float(rng.choice([100.0, 900.0, 4500.0, 12000.0])),
+                tax_pct=float(rng.choice([0.0, 6.0, 11.5])),
+                fixed_expenses_per_unit=float(rng.choice([0.0, 3.0])),
+                desired_margin_pct=float(rng.choice([0.0, 10.0, 25.0, 40.0])),
+                other_pct=float(rng.choice([0.0, 2.0])),
+            )
+            rows.append({k: row[k] for k in BATCH_PARAMS[platform]})
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("platform", CALCULATORS)
+def test_price_batch_matches_calculators_exactly(platform):
+    df = grid(platform)
+    priced = price_batch(df, platform)
+    assert len(priced) == len(df)
+    for row, result in zip(df.to_dict("records"), priced.to_dict("records")):
+        assert result == CALCULATORS[platform](**row), row
+
+
+@pytest.mark.parametrize("platform", CALCULATORS)
+def test_constants_equal_repeated_columns(platform):
+    df = grid(platform).head(200)
+    constant = {"tax_pct": 6.0, "other_pct": 1.5}
+    by_column = price_batch(df.assign(**constant), platform)
+    by_keyword = price_batch(df.drop(columns=list(constant)), platform, **constant)
+    pd.testing.assert_frame_equal(by_keyword, by_column)
+
+
+def test_price_batch_keeps_the_frame_index():
+    df = grid("shopee").head(10)
+    df.index = [f"sku{i}" for i in range(10)]
+    assert price_batch(df, "shopee").index.tolist() == df.index.tolist()
+
+
+def test_missing_parameter_and_unknown_platform():
+    df = grid("amazon").drop(columns="weight_g").head(3)
+    with pytest.raises(KeyError, match="weight_g"):
+        price_batch(df, "amazon")
+    with pytest.raises(ValueError, match="Unknown platform"):
+        price_batch(df, "ebay")
+
+
+@pytest.mark.parametrize(("platform", "column"), [
+    ("mercado_livre", "category"),
+    ("mercado_livre", "ad_type"),
+    ("amazon", "category"),
+    ("shopee", "category"),
+])
+def test_missing_text_key_raises_like_the_calculator(platform, column):
+    df = grid(platform).head(5)
+    # A missing key must not borrow another row's rate
+    df.loc[3, column] = np.nan
+    row = df.iloc[3].to_dict()
+    with pytest.raises(KeyError) as expected:
+        CALCULATORS[platform](**row)
+    with pytest.raises(KeyError) as raised:
+        price_batch(df, platform)
+    assert str(raised.value) == str(expected.value)
+    with pytest.raises(KeyError):
+        price_batch(df.iloc[[3]], platform)
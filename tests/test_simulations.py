@@ -0,0 +1,91 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from simulations import SIMULATION_FIELDS, SIMULATION_LABELS, SimulationBuffer, SimulationStore
+
+
+def record(i: int, product: str = "Fone", platform: str = "Shopee") -> dict:
+    return {
+        # Saved in time order, as the app does; several per minute share a timestamp
+        "Data/Hora": f"2024-01-{1 + i // 120:02d} 10:{i // 2 % 60:02d}:00",
+        "Produto": product,
+        "Plataforma": platform,
+        "Custo (R$)": 10.0 + i,
+        "Venda (R$)": 30.0 + i,
+        "Lucro (R$)": float(i % 7),
+        "Margem (%)": 5.0,
+        "ROI (%)": 12.5,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SimulationStore(str(tmp_path / "sims.sqlite"))
+
+
+def test_owners_only_see_and_clear_their_own_records(store):
+    store.add("alice", record(1))
+    store.add("alice", record(2, product="Capa"))
+    store.add("bob", record(3, platform="Amazon"))
+
+    assert store.count("alice") == 2 and store.count("bob") == 1
+    assert store.distinct("alice", "Produto") == ["Capa", "Fone"]
+    assert store.distinct("bob", "Plataforma") == ["Amazon"]
+    assert store.page("bob", limit=None)["Custo (R$)"].tolist() == [13.0]
+
+    before = store.version("bob")
+    store.clear("alice")
+    assert store.count("alice") == 0
+    assert store.count("bob") == 1 and store.version("bob") == before
+
+
+def test_files_without_owner_column_are_migrated(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    columns = ", ".join(f"{column} {sql_type}" for column, _, sql_type in SIMULATION_FIELDS)
+    conn.execute(f"CREATE TABLE simulations (id INTEGER PRIMARY KEY, {columns})")
+    conn.execute("INSERT INTO simulations (created_at, product, platform, cost) VALUES ('2024-01-01 00:00:00', 'x', 'y', 1)")
+    conn.commit()
+    conn.close()
+
+    store = SimulationStore(path)
+    assert store.count("alice") == 0
+    store.add("alice", record(1))
+    assert store.count("alice") == 1
+
+
+def test_buffer_matches_store_pages(store):
+    rng = np.random.default_rng(1)
+    for i in range(200):
+        store.add("alice", record(i, product=str(rng.choice(["A", "B", "C"])), platform=str(rng.choice(["ML", "Shopee"]))))
+    store.add("bob", record(999))
+    buffer = SimulationBuffer.from_store(store, "alice")
+    assert len(buffer) == 200
+
+    frame = buffer.frame()
+    for sort_by in ("Data/Hora", "Produto", "Lucro (R$)"):
+        for product in (None, "B"):
+            expected = store.page("alice", limit=None, product=product, sort_by=sort_by)
+            got = frame.take(buffer.select(product=product, sort_by=sort_by))
+            assert got["Custo (R$)"].tolist() == expected["Custo (R$)"].tolist()
+            assert got["Produto"].astype(str).tolist() == expected["Produto"].tolist()
+    assert list(frame.columns) == list(SIMULATION_LABELS.values())
+
+
+def test_frames_handed_out_survive_clear_and_append():
+    buffer = SimulationBuffer(capacity=4)
+    for i in range(3):
+        buffer.append(record(i, product="Fone"))
+    snapshot = buffer.frame()
+    before = snapshot.copy()
+
+    buffer.clear()
+    for i in range(3):
+        buffer.append(record(100 + i, product="Capa", platform="Amazon"))
+    buffer.append(record(200))  # grows past the initial capacity
+
+    assert snapshot.equals(before)
+    assert len(buffer) == 4 and buffer.distinct("Produto") == ["Capa", "Fone"]
+    assert buffer.frame()["Custo (R$)"].tolist() == [110.0, 111.0, 112.0, 210.0]
@@ -0,0 +1,90 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from statements import parse_money, parse_statement_line, read_statement_csv, sniff_csv
+
+
+def read(text: str, encoding: str = "utf-8", chunksize: int = 100_000) -> pd.DataFrame:
+    return read_statement_csv(io.BytesIO(text.encode(encoding)), chunksize=chunksize)
+
+
+# ─── sniffer ───
+
+def test_sniffs_latin1_semicolon_and_pt_br_decimal():
+    head = "Extrato Conta Corrente\nData;Histórico;Valor\n01/02/2024;Padaria;-1.200,50\n".encode("latin-1")
+    assert sniff_csv(head) == {"encoding": "latin-1", "skiprows": 1, "sep": ";", "decimal": ","}
+
+
+def test_sniffs_comma_separated_us_export():
+    head = b"date,description,amount\n2024-02-01,Coffee,-3.50\n2024-02-02,Salary,1200.00\n"
+    assert sniff_csv(head) == {"encoding": "utf-8", "skiprows": 0, "sep": ",", "decimal": "."}
+
+
+def test_multibyte_character_cut_at_the_sample_end_stays_utf8():
+    head = "Data;Descrição;Valor\n01/02/2024;Açaí;10,00\n".encode()
+    assert sniff_csv(head[:-len("í;10,00\n".encode()) + 1])["encoding"] == "utf-8"
+
+
+# ─── tokenizer ───
+
+@pytest.mark.parametrize(("line", "expected"), [
+    ("05/01 PIX RECEBIDO CLIENTE 1.200,50", ("PIX RECEBIDO CLIENTE", 1200.5)),
+    ("05/01/2024 Padaria do Bairro -12,50", ("Padaria do Bairro", -12.5)),
+    ("05/01 Uber trip 23.90", ("Uber trip", 23.9)),
+    ("05/01 Mercado Central R$ 0,00 R$ 89,90", ("Mercado Central R$ 0,00 R$", 89.9)),
+    ("SALDO DO DIA 1.000,00", None),
+    ("05/01 R$ 0,00 R$ 100,00", None),
+    ("PIX RECEBIDO 100,00", None),
+])
+def test_parse_statement_line(line, expected):
+    assert parse_statement_line(line) == expected
+
+
+@pytest.mark.parametrize(("token", "value"), [("1.200,50", 1200.5), ("-50,00", -50.0), ("R$1200.50", 1200.5), (".50", 0.5)])
+def test_parse_money(token, value):
+    assert parse_money(token) == value
+
+
+# ─── chunked CSV reader ───
+
+def test_dot_dates_keep_their_text_with_pt_br_values():
+    df = read("Data;Descrição;Valor\n01.02.2024;Padaria;-1.200,50\n02.02.2024;Cliente A;3.000,00\n")
+    assert df["Data"].tolist() == ["01.02.2024", "02.02.2024"]
+    assert df["Valor"].tolist() == [-1200.5, 3000.0]
+
+
+def test_latin1_semicolon_export_with_preamble_and_currency():
+    text = "Banco Exemplo - Extrato\nData;Histórico;Valor;Saldo\n01/02/2024;Pão de Açúcar;R$ -1.200,50;3.000,00\n"
+    df = read(text + "02/02/2024;Transferência;R$ 50,00;3.050,00\n", encoding="latin-1")
+    assert df.columns.tolist() == ["Data", "Histórico", "Valor", "Saldo"]
+    assert df["Histórico"].tolist() == ["Pão de Açúcar", "Transferência"]
+    assert df["Valor"].tolist() == [-1200.5, 50.0]
+    assert df["Saldo"].tolist() == [3000.0, 3050.0]
+
+
+def test_us_export_keeps_dots_as_decimals():
+    df = read('date,description,amount\n2024-02-01,Coffee,-3.50\n2024-02-02,Salary,"1,200.00"\n')
+    assert df["date"].tolist() == ["2024-02-01", "2024-02-02"]
+    assert df["amount"].tolist() == [-3.5, 1200.0]
+
+
+def test_unparseable_values_become_nan_and_codes_stay_text():
+    text = "Data;Descrição;Valor;Documento\n01/02/2024;A;10,00;00123\n02/02/2024;B;N/D;00456\n"
+    df = read(text)
+    assert np.isnan(df["Valor"][1]) and df["Valor"][0] == 10.0
+    assert df["Documento"].tolist() == ["00123", "00456"]
+
+
+def test_a_column_is_numeric_only_if_every_chunk_is():
+    rows = [f"0{i % 9 + 1}/02/2024;Loja {i};{i},50;{i}" for i in range(10)]
+    rows[-1] = rows[-1].rsplit(";", 1)[0] + ";ref-9"
+    df = read("Data;Descrição;Valor;Ref\n" + "\n".join(rows) + "\n", chunksize=3)
+    assert df["Valor"].tolist() == [i + 0.5 for i in range(10)]
+    assert df["Ref"].tolist() == [str(i) for i in range(9)] + ["ref-9"]
+
+
+def test_empty_file():
+    assert read("Data;Descrição;Valor\n").empty